@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+TODO Alarm Worker - Pending Query Index Benchmark
+=================================================
+
+Vygeneruje tabulky todo/todo_alarm o zadaném počtu řádků (SQLite stand-in)
+a změří latenci dotazů get_pending_alarms() a get_pending_alarms_count()
+pro tři varianty indexů:
+
+  - none     - žádný index na todo_alarm
+  - spec     - idx_notification_sent (notification_sent, alarm_datetime)
+  - pending  - idx_todo_alarm_pending (scripts/sql/add_todo_alarm_pending_index.sql)
+
+Data odpovídají provozu: většina řádků je odeslaná historie, fronta
+čekajících alarmů má stálou velikost (--pending) bez ohledu na velikost
+tabulky - latence s dobrým indexem proto nemá růst s historií.
+
+Použití:
+    python3 BACKEND-TODO-ALARM-INDEX-BENCH.py
+    python3 BACKEND-TODO-ALARM-INDEX-BENCH.py --sizes 10000,1000000 --json index-bench.json
+"""
+
+from datetime import datetime
+from pathlib import Path
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+WORKER_PATH = Path(__file__).with_name('BACKEND-TODO-ALARM-WORKER-EXAMPLE.py')
+
+INDEX_VARIANTS = {
+    'none': [],
+    'spec': ['CREATE INDEX idx_notification_sent ON todo_alarm (notification_sent, alarm_datetime)'],
+    'pending': [
+        'CREATE INDEX idx_todo_alarm_pending ON todo_alarm (notification_sent, is_completed, alarm_datetime, todo_id)'
+    ],
+}
+
+GENERATE_SQL = """
+    WITH RECURSIVE seq(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM seq WHERE x < :rows)
+    INSERT INTO todo (id, title, note, user_id, order_id, is_active)
+    SELECT x, 'Úkol ' || x, NULL, x % 500 + 1, NULL, x % 20 != 0 FROM seq;
+
+    WITH RECURSIVE seq(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM seq WHERE x < :rows)
+    INSERT INTO todo_alarm (id, todo_id, alarm_datetime, is_completed, notification_sent, notification_sent_at)
+    SELECT
+        x,
+        x,
+        CASE
+            WHEN x <= :pending THEN datetime('now', 'localtime', '-' || (x % 120) || ' minutes')
+            WHEN x % 100 = 0 THEN datetime('now', 'localtime', '+' || (x % 30 + 1) || ' days')
+            ELSE datetime('now', 'localtime', '-' || (x % 365 + 1) || ' days')
+        END,
+        x > :pending AND x % 50 = 0,
+        x > :pending AND x % 100 != 0,
+        CASE WHEN x > :pending AND x % 100 != 0 THEN datetime('now', 'localtime', '-' || (x % 365) || ' days') END
+    FROM seq;
+"""
+
+
+def load_worker():
+    """Načte modul workeru (název souboru není platný Python identifikátor)"""
+    spec = importlib.util.spec_from_file_location('todo_alarm_worker', WORKER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+worker = load_worker()
+
+
+def generate(path: str, rows: int, pending: int) -> float:
+    """Vytvoří stand-in databázi bez indexů na todo_alarm; vrací dobu generování"""
+    started = time.perf_counter()
+    worker.SQLITE_PATH = path
+    conn = worker.get_db_connection()
+    conn.executescript(worker.SQLITE_SCHEMA)
+    for index in ('idx_notification_sent', 'idx_todo_alarm_pending', 'idx_todo_alarm_claimed_by'):
+        conn.execute(f'DROP INDEX IF EXISTS {index}')
+
+    for statement in GENERATE_SQL.split(';'):
+        if statement.strip():
+            conn.execute(statement, {'rows': rows, 'pending': pending})
+    conn.commit()
+    conn.close()
+    return time.perf_counter() - started
+
+
+def time_query(conn, sql: str, repeat: int) -> float:
+    """Medián doby dotazu v ms (včetně načtení všech řádků)"""
+    now = datetime.now()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cursor = conn.cursor()
+        cursor.execute(sql, [now])
+        cursor.fetchall()
+        cursor.close()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def bench_size(tmp_dir: str, rows: int, pending: int, repeat: int) -> list:
+    path = os.path.join(tmp_dir, f'index-bench-{rows}.sqlite3')
+    generated = generate(path, rows, pending)
+    print(f"\n{rows:,} rows (generated in {generated:.1f} s)")
+
+    results = []
+    for variant, statements in INDEX_VARIANTS.items():
+        conn = worker.get_db_connection()
+        for index in ('idx_notification_sent', 'idx_todo_alarm_pending'):
+            conn.execute(f'DROP INDEX IF EXISTS {index}')
+        for statement in statements:
+            conn.execute(statement)
+        conn.execute('ANALYZE')
+        conn.commit()
+
+        problems = worker.explain_pending_queries(conn)
+        result = {
+            'rows': rows,
+            'index': variant,
+            'plan': 'FULL SCAN' if problems else 'index',
+            'pending_ms': time_query(conn, worker.PENDING_ALARMS_SQL + " ORDER BY ta.alarm_datetime ASC", repeat),
+            'count_ms': time_query(conn, worker.PENDING_COUNT_SQL, repeat),
+        }
+        conn.close()
+
+        print(f"  {variant:>8}: {result['plan']:>9}  get_pending_alarms {result['pending_ms']:9.2f} ms"
+              f"  get_pending_alarms_count {result['count_ms']:9.2f} ms")
+        results.append(result)
+
+    os.remove(path)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark indexů pro dotazy čekajících TODO alarmů')
+    parser.add_argument('--sizes', default='10000,1000000,10000000', help='Počty řádků todo_alarm (čárkou)')
+    parser.add_argument('--pending', type=int, default=500, help='Velikost fronty čekajících alarmů (výchozí 500)')
+    parser.add_argument('--repeat', type=int, default=5, help='Počet opakování dotazu, bere se medián')
+    parser.add_argument('--json', help='Zapsat výsledky do JSON souboru')
+    parser.add_argument('--tmp-dir', help='Adresář pro generované DB (10M řádků ~ 1 GB)')
+    args = parser.parse_args()
+
+    worker.DB_BACKEND = 'sqlite'
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    print(f"Pending-alarm query benchmark: sizes={sizes}, pending={args.pending}, median of {args.repeat}")
+    print("=" * 60)
+
+    results = []
+    # Adresář se smaže i s DB, na které benchmark spadl - chyba se nepřekryje
+    with tempfile.TemporaryDirectory(prefix='todo-alarm-index-', dir=args.tmp_dir) as tmp_dir:
+        for rows in sizes:
+            results.extend(bench_size(tmp_dir, rows, min(args.pending, rows), args.repeat))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'sqlite_version': worker.sqlite3.sqlite_version, 'results': results}, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
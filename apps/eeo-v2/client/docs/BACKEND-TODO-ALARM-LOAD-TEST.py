@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+TODO Alarm Worker - Load Test
+=============================
+
+Naplní lokální databázi frontou alarmů podle zvoleného scénáře, spustí
+process_todo_alarms() a změří propustnost, end-to-end zpoždění a počet
+DB round-trips. Data se generují z --seed, takže stejný příkaz dá stejnou
+frontu - výsledky dvou verzí workeru (JSON) jsou přímo porovnatelné.
+
+Scénáře (rozložení okamžiku, kdy se alarm smí odeslat = alarm_datetime
+minus NORMAL_PRIORITY_THRESHOLD_MINUTES; vše je k odeslání při startu):
+  - uniform       - rovnoměrně za poslední hodinu (běžný provoz cronu)
+  - monday-burst  - 80 % alarmů nastavených na "pondělí 8:00" (±2 min),
+                    zbytek rovnoměrně za poslední hodinu
+  - backlog       - rovnoměrně za posledních 24 h (obnova po výpadku)
+
+Zpoždění = notification_sent_at - max(čas možného odeslání, start
+process_todo_alarms()), tj. čekání alarmu ve frontě workeru během testu
+(bez doby seedování). MariaDB ukládá DATETIME po sekundách, přesnost
+zpoždění je tam proto 1 s.
+
+Použití:
+    python3 BACKEND-TODO-ALARM-LOAD-TEST.py
+    python3 BACKEND-TODO-ALARM-LOAD-TEST.py --scenario monday-burst --alarms 50000 --json before.json
+    python3 BACKEND-TODO-ALARM-LOAD-TEST.py --scenario monday-burst --alarms 50000 --compare before.json
+    ALARM_DB_NAME=eeo2025_test python3 BACKEND-TODO-ALARM-LOAD-TEST.py --backend mysql
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+WORKER_PATH = Path(__file__).with_name('BACKEND-TODO-ALARM-WORKER-EXAMPLE.py')
+SEED_CHUNK = 5000
+
+SCENARIOS = ('uniform', 'monday-burst', 'backlog')
+
+
+def load_worker():
+    """Načte modul workeru (název souboru není platný Python identifikátor)"""
+    spec = importlib.util.spec_from_file_location('todo_alarm_worker', WORKER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+worker = load_worker()
+
+
+def eligible_offsets(scenario: str, count: int, rng: random.Random) -> list:
+    """
+    Vrátí pro každý alarm počet sekund PŘED startem testu, kdy se smí odeslat.
+
+    Všechny hodnoty jsou >= 0, takže celá fronta je k odeslání hned.
+    """
+    if scenario == 'uniform':
+        return [rng.uniform(0, 3600) for _ in range(count)]
+    if scenario == 'backlog':
+        return [rng.uniform(0, 24 * 3600) for _ in range(count)]
+
+    # monday-burst: "8:00" = start testu, většina alarmů v úzkém okně kolem
+    offsets = []
+    for _ in range(count):
+        if rng.random() < 0.8:
+            offsets.append(min(abs(rng.gauss(0, 120)), 3600))
+        else:
+            offsets.append(rng.uniform(0, 3600))
+    return offsets
+
+
+def seed_database(scenario: str, alarm_count: int, history: int, seed: int, started: datetime):
+    """
+    Vyprázdní tabulky a založí frontu alarm_count čekajících alarmů
+    (ID 1..alarm_count) a history už odeslaných (historie tabulky).
+    """
+    rng = random.Random(seed)
+    lead = timedelta(minutes=worker.NORMAL_PRIORITY_THRESHOLD_MINUTES)
+
+    conn = worker.get_db_connection()
+    if worker.DB_BACKEND == 'sqlite':
+        worker.init_sqlite_schema(conn)
+
+    cursor = conn.cursor()
+    for table in ('notification', 'todo_alarm', 'todo'):
+        cursor.execute(f"DELETE FROM {table}")
+
+    offsets = eligible_offsets(scenario, alarm_count, rng)
+    total = alarm_count + history
+
+    for start in range(1, total + 1, SEED_CHUNK):
+        ids = range(start, min(start + SEED_CHUNK, total + 1))
+        cursor.executemany(
+            "INSERT INTO todo (id, title, note, user_id, order_id, is_active) VALUES (%s, %s, %s, %s, %s, TRUE)",
+            [(i, f"Úkol {i}", 'Poznámka k úkolu' if i % 3 else None, i % 500 + 1, i if i % 4 == 0 else None)
+             for i in ids]
+        )
+
+        pending = [i for i in ids if i <= alarm_count]
+        if pending:
+            cursor.executemany(
+                "INSERT INTO todo_alarm (id, todo_id, alarm_datetime, is_completed, notification_sent) "
+                "VALUES (%s, %s, %s, FALSE, FALSE)",
+                [(i, i, started + lead - timedelta(seconds=offsets[i - 1])) for i in pending]
+            )
+
+        sent = [i for i in ids if i > alarm_count]
+        if sent:
+            rows = []
+            for i in sent:
+                alarm_datetime = started - timedelta(days=rng.uniform(1, 365))
+                rows.append((i, i, alarm_datetime, i % 50 == 0, alarm_datetime - lead))
+            cursor.executemany(
+                "INSERT INTO todo_alarm (id, todo_id, alarm_datetime, is_completed, notification_sent, notification_sent_at) "
+                "VALUES (%s, %s, %s, %s, TRUE, %s)",
+                rows
+            )
+
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def measure_lag(alarm_count: int, started: datetime) -> dict:
+    """End-to-end zpoždění zpracovaných alarmů fronty v ms"""
+    lead = timedelta(minutes=worker.NORMAL_PRIORITY_THRESHOLD_MINUTES)
+
+    conn = worker.get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT alarm_datetime, notification_sent_at FROM todo_alarm WHERE id <= %s AND notification_sent = TRUE",
+        [alarm_count]
+    )
+    lags = sorted(
+        max(0.0, (sent_at - max(alarm_datetime - lead, started)).total_seconds() * 1000)
+        for alarm_datetime, sent_at in cursor.fetchall()
+    )
+    cursor.execute("SELECT COUNT(*) FROM notification")
+    notifications = cursor.fetchone()[0]
+    cursor.close()
+    conn.close()
+
+    return {
+        'sent': len(lags),
+        'notifications': notifications,
+        'p50_ms': percentile(lags, 0.5),
+        'p95_ms': percentile(lags, 0.95),
+        'p99_ms': percentile(lags, 0.99),
+        'max_ms': lags[-1] if lags else 0.0,
+    }
+
+
+def run_once(args, run: int) -> dict:
+    """Jeden běh: seed -> process_todo_alarms() -> měření"""
+    seed_database(args.scenario, args.alarms, args.history, args.seed, datetime.now())
+
+    # Čisté čítače pro tento běh (CountingConnection čte globální stage_timings)
+    worker.stage_timings = worker.StageTimings(enabled=True)
+    worker.template_cache.invalidate()
+
+    started = datetime.now()
+    run_started = time.perf_counter()
+    processed = worker.process_todo_alarms(batch_size=args.batch_size)
+    elapsed = time.perf_counter() - run_started
+
+    timings = worker.stage_timings
+    roundtrips = timings.db_roundtrips
+    lag = measure_lag(args.alarms, started)
+
+    result = {
+        'run': run,
+        'processed': processed,
+        'elapsed_s': round(elapsed, 4),
+        'throughput_per_s': round(processed / elapsed, 1) if elapsed else 0.0,
+        'lag': lag,
+        'db_roundtrips': roundtrips,
+        'roundtrips_per_alarm': round(roundtrips / processed, 4) if processed else None,
+        'batches': timings.batches,
+        'stages_ms': {name: round(total * 1000, 2) for name, total in sorted(timings.totals.items())},
+    }
+
+    print(f"  run {run}: {processed} alarms in {elapsed:.2f} s ({result['throughput_per_s']:,.0f} alarms/s), "
+          f"lag p50={lag['p50_ms']:.0f} ms p95={lag['p95_ms']:.0f} ms max={lag['max_ms']:.0f} ms, "
+          f"{roundtrips} round trips")
+
+    if lag['sent'] != args.alarms or lag['notifications'] != args.alarms:
+        print(f"  ✗ expected {args.alarms} sent alarms/notifications, "
+              f"got {lag['sent']}/{lag['notifications']}")
+    return result
+
+
+def worker_version() -> dict:
+    """Identifikace testované verze workeru (hash souboru + git commit, je-li k dispozici)"""
+    version = {'sha256': hashlib.sha256(WORKER_PATH.read_bytes()).hexdigest()[:16]}
+    try:
+        version['git_commit'] = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=WORKER_PATH.parent, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    return version
+
+
+def summarize(runs: list) -> dict:
+    """Mediány přes opakované běhy"""
+    return {
+        'throughput_per_s': statistics.median(r['throughput_per_s'] for r in runs),
+        'elapsed_s': statistics.median(r['elapsed_s'] for r in runs),
+        'lag_p50_ms': statistics.median(r['lag']['p50_ms'] for r in runs),
+        'lag_p95_ms': statistics.median(r['lag']['p95_ms'] for r in runs),
+        'lag_p99_ms': statistics.median(r['lag']['p99_ms'] for r in runs),
+        'db_roundtrips': statistics.median(r['db_roundtrips'] for r in runs),
+    }
+
+
+def compare(summary: dict, baseline_path: str):
+    """Vypíše změnu proti dřívějšímu JSON výsledku"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    if baseline.get('scenario') != summary['scenario']:
+        print(f"⚠️  Baseline scenario differs: {baseline.get('scenario')}")
+
+    print(f"Compared to {baseline_path} ({baseline.get('worker', {}).get('git_commit', '?')}):")
+    for key, value in summary['summary'].items():
+        before = baseline.get('summary', {}).get(key)
+        if not before:
+            continue
+        print(f"  {key:>17}: {before:>12,.1f} -> {value:>12,.1f}  ({(value - before) / before * 100:+.1f} %)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Load test TODO alarm workeru nad lokální databází')
+    parser.add_argument('--scenario', choices=SCENARIOS, default='uniform', help='Rozložení termínů (výchozí uniform)')
+    parser.add_argument('--alarms', type=int, default=20_000, help='Počet čekajících alarmů (výchozí 20000)')
+    parser.add_argument('--history', type=int, default=50_000, help='Počet už odeslaných alarmů v tabulce')
+    parser.add_argument('--seed', type=int, default=42, help='Seed generátoru - stejný seed = stejná fronta')
+    parser.add_argument('--batch-size', type=int, default=worker.ALARM_BATCH_SIZE, help='Velikost dávky workeru')
+    parser.add_argument('--repeat', type=int, default=3, help='Počet běhů, souhrn bere medián')
+    parser.add_argument('--backend', choices=['sqlite', 'mysql'], default='sqlite', help='DB backend (výchozí sqlite)')
+    parser.add_argument('--json', help='Zapsat výsledky do JSON souboru')
+    parser.add_argument('--compare', metavar='JSON', help='Porovnat s dřívějším výsledkem')
+    args = parser.parse_args()
+
+    worker.DB_BACKEND = args.backend
+    worker.INSTRUMENTATION_ENABLED = True
+    tmp_dir = None
+    if args.backend == 'sqlite':
+        tmp_dir = tempfile.mkdtemp(prefix='todo-alarm-load-')
+        worker.SQLITE_PATH = os.path.join(tmp_dir, 'load.sqlite3')
+    elif 'test' not in worker.DB_CONFIG['database']:
+        print(f"✗ Refusing to truncate '{worker.DB_CONFIG['database']}' - set ALARM_DB_NAME to a test database")
+        return 2
+
+    print(f"Load test: scenario={args.scenario}, alarms={args.alarms}, history={args.history}, "
+          f"seed={args.seed}, batch_size={args.batch_size}, backend={args.backend}")
+    print("=" * 60)
+
+    try:
+        runs = [run_once(args, run) for run in range(1, args.repeat + 1)]
+    finally:
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    result = {
+        'scenario': args.scenario,
+        'alarms': args.alarms,
+        'history': args.history,
+        'seed': args.seed,
+        'batch_size': args.batch_size,
+        'backend': args.backend,
+        'sqlite_version': worker.sqlite3.sqlite_version if args.backend == 'sqlite' else None,
+        'worker': worker_version(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'summary': summarize(runs),
+        'runs': runs,
+    }
+
+    print("=" * 60)
+    summary = result['summary']
+    print(f"Median: {summary['throughput_per_s']:,.0f} alarms/s, lag p95={summary['lag_p95_ms']:.0f} ms, "
+          f"{summary['db_roundtrips']:.0f} round trips")
+
+    if args.compare:
+        compare(result, args.compare)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"Results written to {args.json}")
+
+    failed = any(r['lag']['sent'] != args.alarms for r in runs)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
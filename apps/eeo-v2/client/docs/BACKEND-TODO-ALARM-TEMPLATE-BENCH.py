@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+TODO Alarm Worker - Template Render Benchmark
+=============================================
+
+Porovná vykreslení app_title/app_message pro N alarmů:
+  - naive:    get_notification_template() z DB pro každý alarm
+              + replace_placeholders() (str.replace přes celý dict)
+  - compiled: template_cache (jeden dotaz) + CompiledTemplate.render()
+
+Běží offline nad SQLite stand-inem workeru. Vypisuje čas vykreslení
+a počet DB dotazů pro obě varianty.
+
+Použití:
+    python3 BACKEND-TODO-ALARM-TEMPLATE-BENCH.py
+    python3 BACKEND-TODO-ALARM-TEMPLATE-BENCH.py --alarms 10000 --repeat 5
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+import argparse
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+
+WORKER_PATH = Path(__file__).with_name('BACKEND-TODO-ALARM-WORKER-EXAMPLE.py')
+
+# Delší šablona (e-mail ze specifikace) - ukazuje závislost na délce textu
+EMAIL_BODY = (
+    'Upozornění na nadcházející úkol:\n\n'
+    'Úkol: {todo_title}\nTermín: {alarm_datetime}\nDatum: {alarm_date}\nČas: {alarm_time}\n'
+    'Poznámka: {todo_note}\n\n'
+    'Prosím zkontrolujte a dokončete tento úkol včas. Detail: /todo/{todo_id}\n'
+) * 20
+
+
+def load_worker():
+    """Načte modul workeru (název souboru není platný Python identifikátor)"""
+    spec = importlib.util.spec_from_file_location('todo_alarm_worker', WORKER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+worker = load_worker()
+
+
+def make_alarms(count: int) -> list:
+    now = datetime.now()
+    return [
+        worker.TodoAlarm({
+            'id': i,
+            'todo_id': i,
+            'alarm_datetime': now + timedelta(minutes=i % 45 - 15),
+            'is_completed': False,
+            'todo_title': f'Kontaktovat dodavatele č. {i}',
+            'todo_note': 'Ověřit termín dodání a fakturační údaje',
+            'user_id': i % 50,
+        })
+        for i in range(1, count + 1)
+    ]
+
+
+def bench_naive(conn, alarms: list, now: datetime):
+    """Vrátí počet DB dotazů (conn je worker.CountingConnection)"""
+    before = worker.stage_timings.db_roundtrips
+    cursor = conn.cursor()
+    for alarm in alarms:
+        template_type, _ = worker.determine_notification_type(alarm, now)
+        placeholders = worker.prepare_placeholders(alarm)
+        row = worker.get_notification_templates(cursor, {template_type})[template_type]
+        worker.replace_placeholders(row['app_title'], placeholders)
+        worker.replace_placeholders(row['app_message'], placeholders)
+    return worker.stage_timings.db_roundtrips - before
+
+
+def bench_compiled(conn, alarms: list, now: datetime):
+    """Vrátí počet DB dotazů (conn je worker.CountingConnection)"""
+    before = worker.stage_timings.db_roundtrips
+    cursor = conn.cursor()
+    cache = worker.TemplateCache()
+    templates = cache.get(cursor, {worker.TEMPLATE_NORMAL, worker.TEMPLATE_HIGH, worker.TEMPLATE_EXPIRED})
+    for alarm in alarms:
+        template_type, _ = worker.determine_notification_type(alarm, now)
+        placeholders = worker.prepare_placeholders(alarm)
+        template = templates[template_type]
+        template['app_title'].render(placeholders)
+        template['app_message'].render(placeholders)
+    return worker.stage_timings.db_roundtrips - before
+
+
+def check_equivalence(alarms: list) -> bool:
+    """Ověří, že CompiledTemplate vykreslí totéž co replace_placeholders (explicitně - python -O asserty přeskakuje)"""
+    compiled = worker.CompiledTemplate(EMAIL_BODY)
+    for alarm in alarms[:100]:
+        placeholders = worker.prepare_placeholders(alarm)
+        if compiled.render(placeholders) != worker.replace_placeholders(EMAIL_BODY, placeholders):
+            print(f"❌ compiled != naive for alarm {alarm.id}", file=sys.stderr)
+            return False
+    return True
+
+
+def bench_render_only(alarms: list, repeat: int):
+    """Čisté vykreslení dlouhé šablony bez DB - str.replace vs. CompiledTemplate"""
+    placeholders = [worker.prepare_placeholders(alarm) for alarm in alarms]
+    compiled = worker.CompiledTemplate(EMAIL_BODY)
+
+    naive = best_of(repeat, lambda: [worker.replace_placeholders(EMAIL_BODY, p) for p in placeholders])
+    fast = best_of(repeat, lambda: [compiled.render(p) for p in placeholders])
+    return naive, fast
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run_benchmarks(conn, alarms: list, repeat: int):
+    now = datetime.now()
+
+    print(f"Template render benchmark: {len(alarms)} alarms, best of {repeat}")
+    print("=" * 60)
+
+    queries = {}
+    timings = {}
+    for name, fn in (('naive', bench_naive), ('compiled', bench_compiled)):
+        timings[name] = best_of(repeat, lambda: queries.__setitem__(name, fn(conn, alarms, now)))
+        print(f"{name:>9}: {timings[name] * 1000:8.1f} ms  {queries[name]:>6} queries  "
+              f"({len(alarms) / timings[name]:,.0f} alarms/s)")
+    print(f"  speedup: {timings['naive'] / timings['compiled']:.1f}x")
+
+    naive, fast = bench_render_only(alarms, repeat)
+    print("-" * 60)
+    print(f"Render only ({len(EMAIL_BODY)} B template, {len(worker.prepare_placeholders(alarms[0]))} placeholders):")
+    print(f"  str.replace: {naive * 1000:8.1f} ms")
+    print(f"  compiled:    {fast * 1000:8.1f} ms  ({naive / fast:.1f}x)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark vykreslení notifikačních šablon')
+    parser.add_argument('--alarms', type=int, default=10_000, help='Počet alarmů (výchozí 10000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Počet opakování, bere se nejlepší čas')
+    args = parser.parse_args()
+
+    alarms = make_alarms(args.alarms)
+    if not check_equivalence(alarms):
+        return 1
+
+    worker.DB_BACKEND = 'sqlite'
+    # Adresář se smaže i s DB, když benchmark spadne
+    with tempfile.TemporaryDirectory(prefix='todo-alarm-bench-') as tmp_dir:
+        worker.SQLITE_PATH = os.path.join(tmp_dir, 'bench.sqlite3')
+        conn = worker.CountingConnection(worker.SqliteConnection(worker.SQLITE_PATH))
+        try:
+            worker.init_sqlite_schema(conn)
+            run_benchmarks(conn, alarms, args.repeat)
+        finally:
+            conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,565 @@
+#!/usr/bin/env python3
+"""
+TODO Alarm Notifications - Async Worker Example
+===============================================
+
+Asyncio varianta workeru z BACKEND-TODO-ALARM-WORKER-EXAMPLE.py pro případ,
+kdy notifikace spouští i doručení po síti (e-mail, push).
+
+Pipeline má 4 stage propojené omezenými frontami (back-pressure):
+
+    claim ──▶ render ──▶ insert ──▶ deliver (N souběžných doručení)
+
+- claim:   lease claim dávky alarmů (claimed_by/claimed_at, viz
+           scripts/sql/add_todo_alarm_claim_columns.sql)
+- render:  typ notifikace + předkompilované šablony (bez DB dotazů)
+- insert:  multi-row INSERT notifikací a teprve POTOM označení alarmů
+           jako odeslaných - obojí v jedné transakci
+- deliver: doručení až po commitu, souběžnost omezená --concurrency
+
+DB přístup přes aiomysql pool (pro ALARM_DB_BACKEND=sqlite přes SQLite
+stand-in v thread poolu).
+
+DŮLEŽITÉ: Toto je pouze PŘÍKLAD! Přizpůsobte ho vaší architektuře.
+"""
+
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+import argparse
+import asyncio
+import importlib.util
+import logging
+import os
+import sys
+
+WORKER_PATH = Path(__file__).with_name('BACKEND-TODO-ALARM-WORKER-EXAMPLE.py')
+
+
+def load_worker():
+    """Načte synchronní worker (název souboru není platný Python identifikátor)"""
+    spec = importlib.util.spec_from_file_location('todo_alarm_worker', WORKER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+worker = load_worker()
+
+# ===================================================================
+# KONFIGURACE
+# ===================================================================
+
+# Kapacita front mezi stagemi - plná fronta zastaví předchozí stage
+ASYNC_QUEUE_SIZE = int(os.environ.get('ALARM_ASYNC_QUEUE_SIZE', 10))
+
+# Maximální počet souběžně doručovaných notifikací
+DELIVERY_CONCURRENCY = int(os.environ.get('ALARM_DELIVERY_CONCURRENCY', 20))
+
+# Velikost DB poolu
+DB_POOL_SIZE = int(os.environ.get('ALARM_DB_POOL_SIZE', 4))
+
+logger = logging.getLogger(__name__)
+
+
+# ===================================================================
+# DB POOL
+# ===================================================================
+
+class _StandinCursor:
+    """Async kurzor nad synchronním SQLite stand-inem (rozhraní aiomysql)"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self._cursor.close()
+
+    async def execute(self, sql: str, params=()):
+        await asyncio.to_thread(self._cursor.execute, sql, params)
+
+    async def fetchall(self):
+        return self._cursor.fetchall()
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+
+class _StandinConnection:
+    """Async připojení nad SQLite stand-inem (rozhraní aiomysql)"""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self) -> _StandinCursor:
+        return _StandinCursor(self._conn.cursor())
+
+    async def commit(self):
+        await asyncio.to_thread(self._conn.commit)
+
+    async def rollback(self):
+        await asyncio.to_thread(self._conn.rollback)
+
+
+class StandinPool:
+    """Pool SQLite stand-in připojení s rozhraním aiomysql.Pool"""
+
+    def __init__(self, size: int):
+        self._all = [_StandinConnection(worker.get_db_connection()) for _ in range(size)]
+        self._free: asyncio.Queue = asyncio.Queue()
+        for conn in self._all:
+            self._free.put_nowait(conn)
+
+    @asynccontextmanager
+    async def acquire(self):
+        conn = await self._free.get()
+        try:
+            yield conn
+        finally:
+            self._free.put_nowait(conn)
+
+    def close(self):
+        for conn in self._all:
+            conn._conn.close()
+
+    async def wait_closed(self):
+        pass
+
+
+async def create_pool(size: int = DB_POOL_SIZE):
+    """
+    Vytvoří async DB pool.
+
+    Returns:
+        aiomysql.Pool, nebo StandinPool pro ALARM_DB_BACKEND = 'sqlite'
+    """
+    if worker.DB_BACKEND == 'sqlite':
+        return StandinPool(size)
+
+    import aiomysql
+
+    config = dict(worker.DB_CONFIG)
+    config['db'] = config.pop('database')
+    return await aiomysql.create_pool(minsize=1, maxsize=size, autocommit=False, **config)
+
+
+async def verify_autoinc_settings(pool):
+    """Ověří souvislá ID multi-row INSERTu (viz worker.check_autoinc_settings)"""
+    if worker.DB_BACKEND == 'sqlite':
+        return
+
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(worker.AUTOINC_SETTINGS_SQL)
+            increment, lock_mode = await cursor.fetchone()
+        await conn.commit()
+
+    worker.check_autoinc_settings(int(increment), int(lock_mode))
+
+
+# ===================================================================
+# DORUČENÍ
+# ===================================================================
+
+async def deliver_notification(notification_id: int, row: tuple) -> bool:
+    """
+    Doručí notifikaci mimo aplikaci (e-mail, push).
+
+    Args:
+        notification_id: ID vytvořené notifikace
+        row: Hodnoty řádku notifikace (pořadí worker.NOTIFICATION_COLUMNS)
+
+    Returns:
+        True pokud doručeno
+    """
+    # TODO: Nahraďte svým e-mail/push klientem (aiosmtplib, httpx, ...)
+    logger.debug(f"Would deliver notification {notification_id} to user {row[0]}")
+    await asyncio.sleep(0)
+    return True
+
+
+# ===================================================================
+# STAGE PIPELINE
+# ===================================================================
+
+async def claim_batch(pool, batch_size: int, exclude_ids: Set[int] = None) -> Tuple[str, List]:
+    """
+    Claimne dávku alarmů lease UPDATEm (commitne se hned) a načte ji.
+
+    Args:
+        exclude_ids: Alarmy, které v tomto běhu selhaly - znovu se neclaimují
+
+    Returns:
+        Tuple (claim token, seznam TodoAlarm)
+    """
+    check_until = datetime.now() + timedelta(minutes=worker.NORMAL_PRIORITY_THRESHOLD_MINUTES)
+    claim_token = worker.new_claim_token()
+
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(*worker.build_lease_claim_sql(claim_token, check_until, batch_size, exclude_ids))
+            claimed = cursor.rowcount
+            await conn.commit()
+
+            if not claimed:
+                return claim_token, []
+
+            await cursor.execute(
+                worker.PENDING_ALARMS_SQL + " AND ta.claimed_by = %s ORDER BY ta.alarm_datetime ASC",
+                [check_until, claim_token]
+            )
+            rows = await cursor.fetchall()
+        await conn.commit()
+
+    return claim_token, [worker.TodoAlarm.from_row(row) for row in rows]
+
+
+async def load_templates(pool) -> Dict[str, Dict]:
+    """Načte a předkompiluje alarmové šablony (jeden dotaz na běh pipeline)"""
+    types = [worker.TEMPLATE_NORMAL, worker.TEMPLATE_HIGH, worker.TEMPLATE_EXPIRED]
+
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(f"""
+                SELECT type, app_title, app_message
+                FROM `{worker.TEMPLATES_TABLE}`
+                WHERE type IN ({', '.join(['%s'] * len(types))})
+                  AND active = 1
+            """, types)
+            rows = await cursor.fetchall()
+        await conn.commit()
+
+    return {
+        template_type: {
+            'app_title': worker.CompiledTemplate(app_title),
+            'app_message': worker.CompiledTemplate(app_message),
+        }
+        for template_type, app_title, app_message in rows
+    }
+
+
+async def claim_stage(pool, batch_size: int, render_queue: asyncio.Queue, failed_ids: Set[int]):
+    """Stage 1: claimuje dávky, dokud není fronta alarmů prázdná"""
+    while True:
+        claim_token, alarms = await claim_batch(pool, batch_size, failed_ids)
+        if alarms:
+            logger.info(f"Claimed {len(alarms)} alarms ({claim_token})")
+            await render_queue.put((claim_token, alarms))
+        if len(alarms) < batch_size:
+            break
+    await render_queue.put(None)
+
+
+async def release_claims(pool, alarm_ids: List[int], claim_token: str):
+    """Uvolní lease alarmů, které se nepodařilo vykreslit - další běh je zkusí hned, ne až po vypršení lease"""
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(*worker.build_release_claim_sql(alarm_ids, claim_token))
+            released = cursor.rowcount
+        await conn.commit()
+    logger.warning(f"Released claim {claim_token} on {released} of {len(alarm_ids)} failed alarms")
+
+
+async def render_stage(
+    pool,
+    templates: Dict,
+    render_queue: asyncio.Queue,
+    insert_queue: asyncio.Queue,
+    failed_ids: Set[int]
+):
+    """
+    Stage 2: sestaví řádky notifikací - chyba vyřadí jen daný alarm.
+
+    Claim vyřazeného alarmu se uvolní a alarm se přidá do failed_ids, aby ho
+    claim stage v tomto běhu nevzala znovu.
+    """
+    while (item := await render_queue.get()) is not None:
+        claim_token, alarms = item
+        now = datetime.now()
+        prepared = []
+        failed = []
+
+        for template_type, group in worker.classify_alarms(alarms, now).items():
+            notification_type = (template_type, worker.NOTIFICATION_PRIORITIES[template_type])
+            for alarm in group:
+                try:
+                    prepared.append((alarm, worker.build_notification_row(alarm, templates, now, notification_type)))
+                except Exception as e:
+                    logger.error(f"Error processing alarm {alarm.id}: {e}")
+                    failed.append(alarm.id)
+
+        if failed:
+            failed_ids.update(failed)
+            await release_claims(pool, failed, claim_token)
+        if prepared:
+            await insert_queue.put((claim_token, prepared))
+    await insert_queue.put(None)
+
+
+async def insert_stage(pool, insert_queue: asyncio.Queue, delivery_queue: asyncio.Queue) -> int:
+    """
+    Stage 3: vloží notifikace dávky a označí alarmy jako odeslané v jedné transakci.
+
+    Alarm se označí jako odeslaný jen tehdy, když jeho notifikace v téže
+    transakci opravdu vznikla. Selže-li hromadný zápis, dávka se zpracuje
+    po jednom přes process_single_alarm_async().
+
+    Returns:
+        Počet zpracovaných alarmů
+    """
+    processed = 0
+
+    while (item := await insert_queue.get()) is not None:
+        claim_token, prepared = item
+        rows = [row for _, row in prepared]
+
+        try:
+            async with pool.acquire() as conn:
+                try:
+                    async with conn.cursor() as cursor:
+                        await cursor.execute(*worker.build_insert_notifications_sql(rows))
+                        first_id = worker.first_inserted_id(cursor.lastrowid, len(rows))
+                        sent = [(alarm.id, first_id + i) for i, (alarm, _) in enumerate(prepared)]
+
+                        await cursor.execute(*worker.build_mark_sent_sql(sent, datetime.now(), claim_token))
+                        if cursor.rowcount != len(sent):
+                            raise worker.ClaimLostError(f"marked {cursor.rowcount} of {len(sent)} alarms")
+                    await conn.commit()
+                except BaseException:
+                    await conn.rollback()
+                    raise
+        except worker.ClaimLostError as e:
+            logger.warning(f"Claim {claim_token} lost ({e}), batch rolled back")
+            continue
+        except Exception as e:
+            logger.warning(f"Batch of {len(prepared)} alarms failed ({e}), falling back to per-alarm processing")
+            for alarm, row in prepared:
+                if await process_single_alarm_async(pool, alarm, row, claim_token, delivery_queue):
+                    processed += 1
+            continue
+
+        processed += len(sent)
+        for (_, notification_id), row in zip(sent, rows):
+            await delivery_queue.put((notification_id, row))
+
+    return processed
+
+
+async def delivery_stage(pool, delivery_queue: asyncio.Queue, flush_size: int) -> int:
+    """
+    Stage 4: jeden z N doručovacích workerů.
+
+    Doručené notifikace se značí is_sent = TRUE po dávkách (jeden UPDATE
+    na flush_size notifikací).
+
+    Returns:
+        Počet doručených notifikací
+    """
+    delivered: List[int] = []
+    delivered_total = 0
+
+    async def flush():
+        nonlocal delivered
+        ids, delivered = delivered, []
+        if not ids:
+            return
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(
+                    f"UPDATE notification SET is_sent = TRUE WHERE id IN ({', '.join(['%s'] * len(ids))})",
+                    ids
+                )
+            await conn.commit()
+
+    while (item := await delivery_queue.get()) is not None:
+        notification_id, row = item
+        try:
+            if await deliver_notification(notification_id, row):
+                delivered.append(notification_id)
+                delivered_total += 1
+        except Exception as e:
+            # Notifikace v aplikaci zůstává, jen is_sent zůstane FALSE
+            logger.error(f"Delivery of notification {notification_id} failed: {e}")
+
+        if len(delivered) >= flush_size:
+            await flush()
+
+    await flush()
+    return delivered_total
+
+
+async def close_queue(queue: asyncio.Queue, consumers: int):
+    """Pošle ukončovací None každému konzumentovi fronty"""
+    for _ in range(consumers):
+        await queue.put(None)
+
+
+async def wait_stages(wait_for: List[asyncio.Task], tasks: List[asyncio.Task]) -> list:
+    """
+    Počká na dokončení tasků wait_for a vrátí jejich výsledky.
+
+    Spadne-li kterýkoli task z tasks, ostatní se zruší a výjimka se propustí
+    dál - asyncio.gather by čekal na stage zaseknutou na frontě, kterou už
+    nikdo nevyprázdní.
+    """
+    pending = set(tasks)
+    try:
+        while not all(task.done() for task in wait_for):
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.cancelled() or task.exception() is not None:
+                    task.result()
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    return [task.result() for task in wait_for]
+
+
+# ===================================================================
+# HLAVNÍ FUNKCE
+# ===================================================================
+
+async def process_single_alarm_async(
+    pool,
+    alarm,
+    row: tuple,
+    claim_token: Optional[str],
+    delivery_queue: asyncio.Queue
+) -> bool:
+    """
+    Zpracuje jeden alarm - notifikace + označení v jedné transakci, pak doručení.
+
+    Returns:
+        True pokud úspěšné, False jinak
+    """
+    try:
+        async with pool.acquire() as conn:
+            try:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(*worker.build_insert_notifications_sql([row]))
+                    notification_id = worker.first_inserted_id(cursor.lastrowid, 1)
+
+                    await cursor.execute(
+                        *worker.build_mark_sent_sql([(alarm.id, notification_id)], datetime.now(), claim_token)
+                    )
+                    if not cursor.rowcount:
+                        logger.warning(f"Alarm {alarm.id} was processed by another worker, notification rolled back")
+                        await conn.rollback()
+                        return False
+                await conn.commit()
+            except BaseException:
+                await conn.rollback()
+                raise
+    except Exception as e:
+        logger.error(f"Error processing alarm {alarm.id}: {e}")
+        return False
+
+    await delivery_queue.put((notification_id, row))
+    return True
+
+
+async def process_todo_alarms_async(
+    batch_size: int = worker.ALARM_BATCH_SIZE,
+    concurrency: int = DELIVERY_CONCURRENCY,
+    queue_size: int = ASYNC_QUEUE_SIZE
+) -> int:
+    """
+    Zpracuje všechny čekající TODO alarmy asynchronní pipeline.
+
+    Args:
+        batch_size: Maximální počet alarmů v jedné dávce
+        concurrency: Maximální počet souběžných doručení
+        queue_size: Kapacita front mezi stagemi (v dávkách)
+
+    Returns:
+        Počet zpracovaných alarmů
+    """
+    logger.info(f"Starting async TODO alarm processing (batch_size={batch_size}, concurrency={concurrency})...")
+
+    pool = await create_pool()
+    try:
+        await verify_autoinc_settings(pool)
+        templates = await load_templates(pool)
+
+        render_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        insert_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        delivery_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size * batch_size)
+
+        deliverers = [
+            asyncio.create_task(delivery_stage(pool, delivery_queue, batch_size))
+            for _ in range(concurrency)
+        ]
+
+        failed_ids: Set[int] = set()
+        stages = [
+            asyncio.create_task(claim_stage(pool, batch_size, render_queue, failed_ids)),
+            asyncio.create_task(render_stage(pool, templates, render_queue, insert_queue, failed_ids)),
+            asyncio.create_task(insert_stage(pool, insert_queue, delivery_queue)),
+        ]
+        _, _, processed = await wait_stages(stages, stages + deliverers)
+
+        closing = [asyncio.create_task(close_queue(delivery_queue, len(deliverers)))] + deliverers
+        _, *delivered = await wait_stages(closing, closing)
+        delivered = sum(delivered)
+    finally:
+        pool.close()
+        await pool.wait_closed()
+
+    logger.info(f"Processed {processed} alarms successfully, delivered {delivered} notifications")
+    return processed
+
+
+# ===================================================================
+# MAIN ENTRY POINT
+# ===================================================================
+
+def main(argv: Optional[List[str]] = None):
+    """Hlavní vstupní bod pro async worker"""
+    parser = argparse.ArgumentParser(description='TODO Alarm Notification Worker (asyncio)')
+    parser.add_argument(
+        '--batch-size', type=int, default=worker.ALARM_BATCH_SIZE,
+        help=f'Počet alarmů v jedné dávce (výchozí {worker.ALARM_BATCH_SIZE})'
+    )
+    parser.add_argument(
+        '--concurrency', type=int, default=DELIVERY_CONCURRENCY,
+        help=f'Maximální počet souběžných doručení (výchozí {DELIVERY_CONCURRENCY})'
+    )
+    parser.add_argument(
+        '--queue-size', type=int, default=ASYNC_QUEUE_SIZE,
+        help=f'Kapacita front mezi stagemi v dávkách (výchozí {ASYNC_QUEUE_SIZE})'
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        processed = asyncio.run(process_todo_alarms_async(
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            queue_size=args.queue_size,
+        ))
+        logger.info(f"Statistics: processed={processed}")
+        return 0
+
+    except Exception as e:
+        logger.error(f"Fatal error in async TODO alarm worker: {e}")
+        return 1
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    sys.exit(main())
@@ -1,4 +1,3 @@
-```python
 """
 TODO Alarm Notifications - Background Worker Example
 =====================================================
@@ -9,9 +8,23 @@ pro automatické vytváření notifikací z TODO alarmů.
 DŮLEŽITÉ: Toto je pouze PŘÍKLAD! Přizpůsobte ho vaší architektuře.
 """
 
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterable, List, Dict, Optional, Set, Tuple
+import argparse
+import cProfile
+import heapq
+import itertools
 import logging
+import os
+import re
+import signal
+import socket
+import sqlite3
+import threading
+import time
 
 # ===================================================================
 # KONFIGURACE
@@ -21,11 +34,56 @@ ALARM_CHECK_INTERVAL_MINUTES = 5  # Jak často worker běží
 NORMAL_PRIORITY_THRESHOLD_MINUTES = 30  # 30 min před = normal
 HIGH_PRIORITY_THRESHOLD_MINUTES = 10    # 10 min před = high
 
+# Kolik alarmů se zpracuje v jedné transakci (claim + INSERT + UPDATE)
+ALARM_BATCH_SIZE = int(os.environ.get('ALARM_BATCH_SIZE', 200))
+
+# Daemon režim: jak často se znovu načte fronta nadcházejících alarmů
+DAEMON_REFRESH_SECONDS = int(os.environ.get('ALARM_DAEMON_REFRESH_SECONDS', 60))
+
+# Claim alarmů při běhu více instancí workeru:
+#   'skip_locked' - SELECT ... FOR UPDATE SKIP LOCKED (MariaDB 10.6+ / MySQL 8)
+#   'lease'       - sloupce claimed_by/claimed_at s expirací (funguje všude)
+ALARM_CLAIM_MODE = os.environ.get('ALARM_CLAIM_MODE', 'skip_locked')
+ALARM_LEASE_SECONDS = int(os.environ.get('ALARM_LEASE_SECONDS', 300))
+
 # Notifikační šablony
 TEMPLATE_NORMAL = 'alarm_todo_normal'
 TEMPLATE_HIGH = 'alarm_todo_high'
 TEMPLATE_EXPIRED = 'alarm_todo_expired'
 
+# Priorita notifikace podle typu šablony
+NOTIFICATION_PRIORITIES = {
+    TEMPLATE_NORMAL: 'normal',
+    TEMPLATE_HIGH: 'high',
+    TEMPLATE_EXPIRED: 'high',
+}
+
+TEMPLATES_TABLE = '25_notification_templates'
+
+# Jak dlouho se šablony drží v paměti, než se ověří změna v DB
+TEMPLATE_CACHE_TTL_SECONDS = int(os.environ.get('ALARM_TEMPLATE_CACHE_TTL_SECONDS', 300))
+
+# Metriky: textfile pro node_exporter (cron) a/nebo HTTP /metrics (daemon, 0 = vypnuto)
+METRICS_TEXTFILE = os.environ.get('ALARM_METRICS_TEXTFILE')
+METRICS_PORT = int(os.environ.get('ALARM_METRICS_PORT', 0))
+METRICS_DELAY_WINDOW = int(os.environ.get('ALARM_METRICS_DELAY_WINDOW', 10000))  # posledních N zpoždění pro p50/p95/p99
+
+# Měření fází hot path a DB round-trips (levné, výchozí zapnuto; 0 = vypnuto)
+INSTRUMENTATION_ENABLED = os.environ.get('ALARM_INSTRUMENTATION', '1') != '0'
+
+# DB backend: 'mysql' (produkce) nebo 'sqlite' (lokální stand-in pro testy/benchmarky)
+DB_BACKEND = os.environ.get('ALARM_DB_BACKEND', 'mysql')
+SQLITE_PATH = os.environ.get('ALARM_SQLITE_PATH', 'todo_alarms.sqlite3')
+
+# DB připojení (přepiš přes proměnné prostředí)
+DB_CONFIG = {
+    'host': os.environ.get('ALARM_DB_HOST', 'localhost'),
+    'user': os.environ.get('ALARM_DB_USER', 'erdms_user'),
+    'password': os.environ.get('ALARM_DB_PASS', ''),
+    'database': os.environ.get('ALARM_DB_NAME', 'eeo2025'),
+    'charset': 'utf8mb4',
+}
+
 # ===================================================================
 # LOGGER
 # ===================================================================
@@ -37,8 +95,31 @@ logger = logging.getLogger(__name__)
 # DATA MODEL (příklad, přizpůsobte svému ORM)
 # ===================================================================
 
+# Pořadí sloupců v SELECTu čekajících alarmů
+ALARM_COLUMNS = (
+    'id',
+    'todo_id',
+    'alarm_datetime',
+    'is_completed',
+    'notification_sent',
+    'todo_title',
+    'todo_note',
+    'user_id',
+    'order_id',
+)
+
+
 class TodoAlarm:
-    """Model TODO alarmu"""
+    """
+    Model TODO alarmu.
+
+    __slots__ místo per-instance __dict__ - u velkých front výrazně menší
+    paměť na alarm. Z řádků dotazu se staví přes from_row() bez mezilehlého
+    dictu; konstruktor z dictu zůstává pro ruční/testovací použití.
+    """
+
+    __slots__ = ALARM_COLUMNS
+
     def __init__(self, data: Dict):
         self.id = data['id']
         self.todo_id = data['todo_id']
@@ -50,149 +131,556 @@ class TodoAlarm:
         self.user_id = data.get('user_id')
         self.order_id = data.get('order_id')
 
+    @classmethod
+    def from_row(cls, row: tuple) -> 'TodoAlarm':
+        """Sestaví alarm přímo z řádku PENDING_ALARMS_SQL (pořadí ALARM_COLUMNS)"""
+        alarm = cls.__new__(cls)
+        (
+            alarm.id,
+            alarm.todo_id,
+            alarm.alarm_datetime,
+            alarm.is_completed,
+            alarm.notification_sent,
+            alarm.todo_title,
+            alarm.todo_note,
+            alarm.user_id,
+            alarm.order_id,
+        ) = row
+        return alarm
+
+
+# ===================================================================
+# DB PŘÍSTUP
+# ===================================================================
+
+PENDING_ALARMS_SQL = """
+    SELECT
+        ta.id,
+        ta.todo_id,
+        ta.alarm_datetime,
+        ta.is_completed,
+        ta.notification_sent,
+        t.title as todo_title,
+        t.note as todo_note,
+        t.user_id,
+        t.order_id
+    FROM todo_alarm ta
+    JOIN todo t ON ta.todo_id = t.id
+    WHERE ta.alarm_datetime <= %s
+      AND ta.notification_sent = FALSE
+      AND ta.is_completed = FALSE
+      AND t.is_active = TRUE
+"""
+
+PENDING_COUNT_SQL = """
+    SELECT COUNT(*) as count
+    FROM todo_alarm ta
+    JOIN todo t ON ta.todo_id = t.id
+    WHERE ta.alarm_datetime <= %s
+      AND ta.notification_sent = FALSE
+      AND ta.is_completed = FALSE
+      AND t.is_active = TRUE
+"""
+
+NOTIFICATION_COLUMNS = (
+    'user_id',
+    'template_type',
+    'priority',
+    'app_title',
+    'app_message',
+    'is_read',
+    'is_sent',
+    'related_entity',
+    'related_id',
+    'order_id',
+    'dt_created',
+)
+
+
+# Sekvence claimů v rámci procesu (součást claim tokenu)
+_claim_sequence = itertools.count(1)
+
+
+class ClaimLostError(Exception):
+    """Lease dávky mezitím vypršel a alarmy převzal jiný worker"""
+
+
+def get_db_connection():
+    """
+    Otevře nové DB připojení (bez autocommitu).
+
+    Returns:
+        pymysql Connection, nebo SqliteConnection pro DB_BACKEND = 'sqlite'
+        (při INSTRUMENTATION_ENABLED obalené CountingConnection)
+    """
+    if DB_BACKEND == 'sqlite':
+        conn = SqliteConnection(SQLITE_PATH)
+    else:
+        import pymysql
+
+        conn = pymysql.connect(autocommit=False, **DB_CONFIG)
+
+    return CountingConnection(conn) if INSTRUMENTATION_ENABLED else conn
+
+
+class CountingCursor:
+    """Obal kurzoru - každý execute/executemany je jeden DB round-trip"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, sql, *args):
+        stage_timings.db_roundtrips += 1
+        return self._cursor.execute(sql, *args)
+
+    def executemany(self, sql, *args):
+        stage_timings.db_roundtrips += 1
+        return self._cursor.executemany(sql, *args)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class CountingConnection:
+    """Obal připojení - počítá round-trips dotazů, commitů a rollbacků"""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self) -> CountingCursor:
+        return CountingCursor(self._conn.cursor())
+
+    def commit(self):
+        stage_timings.db_roundtrips += 1
+        return self._conn.commit()
+
+    def rollback(self):
+        stage_timings.db_roundtrips += 1
+        return self._conn.rollback()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def get_worker_id() -> str:
+    """Identita workeru pro claimed_by (host:pid, přepiš přes ALARM_WORKER_ID)"""
+    return os.environ.get('ALARM_WORKER_ID') or f"{socket.gethostname()}:{os.getpid()}"
+
+
+def get_claim_mode() -> str:
+    """SQLite nezná řádkové zámky, stand-in proto vždy používá lease"""
+    return 'lease' if DB_BACKEND == 'sqlite' else ALARM_CLAIM_MODE
+
 
 # ===================================================================
 # HLAVNÍ FUNKCE
 # ===================================================================
 
-def process_todo_alarms() -> int:
+def process_todo_alarms(batch_size: int = ALARM_BATCH_SIZE, conn=None) -> int:
     """
     Zpracuje všechny čekající TODO alarmy a vytvoří notifikace.
-    
+
+    Alarmy se zpracovávají po dávkách: jedna dávka = jeden claim SELECT,
+    jeden multi-row INSERT notifikací a jeden UPDATE alarmů v jedné transakci.
+
+    Args:
+        batch_size: Maximální počet alarmů v jedné dávce
+        conn: Sdílené DB připojení (daemon); bez něj se otevře a zavře vlastní
+
     Returns:
         Počet zpracovaných alarmů
     """
-    logger.info("Starting TODO alarm processing...")
-    
-    # 1. Načti alarmy k zpracování
-    pending_alarms = get_pending_alarms()
-    logger.info(f"Found {len(pending_alarms)} alarms to process")
-    
+    logger.info(f"Starting TODO alarm processing (batch_size={batch_size})...")
+
+    processed_count = 0
+    failed_ids: Set[int] = set()
+
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db_connection()
+    try:
+        verify_autoinc_settings(conn)
+        while True:
+            claimed, processed = process_alarm_batch(conn, batch_size, failed_ids)
+            processed_count += processed
+
+            # Neplná dávka = fronta je vyčerpaná
+            if claimed < batch_size:
+                break
+    finally:
+        if own_conn:
+            conn.close()
+
+    # Fronta je vyčerpaná - čekají jen alarmy, které v tomto běhu selhaly
+    metrics.record_run(len(failed_ids))
+
+    if failed_ids:
+        logger.warning(f"{len(failed_ids)} alarms failed and stay pending: {sorted(failed_ids)}")
+
+    logger.info(f"Processed {processed_count} alarms successfully")
+    return processed_count
+
+
+def process_alarm_batch(conn, batch_size: int, failed_ids: Set[int]) -> Tuple[int, int]:
+    """
+    Claimne a zpracuje jednu dávku alarmů v jedné transakci.
+
+    Chyba při přípravě jednoho alarmu (šablona, placeholdery) vyřadí jen
+    tento alarm. Pokud selže hromadný INSERT/UPDATE, transakce se vrátí
+    a dávka se zpracuje po jednom přes process_single_alarm().
+
+    Args:
+        conn: DB připojení
+        batch_size: Maximální počet alarmů v dávce
+        failed_ids: ID alarmů, které v tomto běhu selhaly (doplňuje se)
+
+    Returns:
+        Tuple (počet claimnutých alarmů, počet úspěšně zpracovaných)
+    """
+    now = datetime.now()
+    alarms: List[TodoAlarm] = []
+    prepared: List[Tuple[TodoAlarm, tuple]] = []
+    claim_token = None
+    processed = 0
+
+    stage_timings.begin_batch()
+    cursor = conn.cursor()
+    try:
+        # 1. Claim dávky (zámek řádků nebo lease až do commitu)
+        with stage_timings.stage('claim'):
+            claim_token, alarms = claim_alarm_batch(conn, cursor, batch_size, failed_ids)
+        if not alarms:
+            conn.commit()
+            return 0, 0
+
+        logger.info(f"Claimed {len(alarms)} alarms")
+        metrics.record_claim(len(alarms))
+
+        # 2. Šablony pro celou dávku z cache (dotaz jen při expiraci TTL)
+        with stage_timings.stage('templates'):
+            templates = template_cache.get(
+                cursor, {TEMPLATE_NORMAL, TEMPLATE_HIGH, TEMPLATE_EXPIRED}
+            )
+
+        # 3. Rozdělení dávky na expired/high/normal proti jednomu 'now'
+        with stage_timings.stage('classify'):
+            groups = classify_alarms(alarms, now)
+
+        # 4. Příprava řádků notifikací - chyba vyřadí jen daný alarm
+        with stage_timings.stage('render'):
+            for template_type, group in groups.items():
+                notification_type = (template_type, NOTIFICATION_PRIORITIES[template_type])
+                for alarm in group:
+                    try:
+                        prepared.append((alarm, build_notification_row(alarm, templates, now, notification_type)))
+                    except Exception as e:
+                        logger.error(f"Error processing alarm {alarm.id}: {e}")
+                        failed_ids.add(alarm.id)
+
+        # 5. Jeden INSERT + jeden UPDATE pro celou dávku
+        if prepared:
+            with stage_timings.stage('insert'):
+                first_id = insert_notifications(cursor, [row for _, row in prepared])
+            with stage_timings.stage('mark'):
+                marked = mark_alarms_as_sent(
+                    cursor,
+                    [(alarm.id, first_id + i) for i, (alarm, _) in enumerate(prepared)],
+                    now,
+                    claim_token
+                )
+            # Jiný počet = část dávky mezitím zpracoval někdo jiný -> žádné duplicity
+            if marked != len(prepared):
+                raise ClaimLostError(f"marked {marked} of {len(prepared)} alarms")
+
+        with stage_timings.stage('commit'):
+            conn.commit()
+        metrics.record_sent([alarm for alarm, _ in prepared], now)
+        processed = len(prepared)
+    except ClaimLostError as e:
+        conn.rollback()
+        logger.warning(f"Claim {claim_token} lost ({e}), batch rolled back")
+        metrics.claims_lost_total += 1
+    except Exception as e:
+        conn.rollback()
+        if not alarms:
+            raise
+        logger.warning(f"Batch of {len(alarms)} alarms failed ({e}), falling back to per-alarm processing")
+        retry = [alarm for alarm in alarms if alarm.id not in failed_ids]
+        processed = process_alarms_one_by_one(conn, retry, failed_ids, claim_token)
+    finally:
+        cursor.close()
+        if alarms:
+            stage_timings.end_batch(len(alarms), processed)
+
+    return len(alarms), processed
+
+
+def process_alarms_one_by_one(
+    conn,
+    alarms: List[TodoAlarm],
+    failed_ids: Set[int],
+    claim_token: Optional[str] = None
+) -> int:
+    """
+    Záložní cesta: zpracuje alarmy jednotlivě, každý ve vlastní transakci.
+
+    Returns:
+        Počet úspěšně zpracovaných alarmů
+    """
     processed_count = 0
-    
-    # 2. Zpracuj každý alarm
-    for alarm in pending_alarms:
+
+    for alarm in alarms:
         try:
-            if process_single_alarm(alarm):
+            if process_single_alarm(alarm, conn, claim_token):
                 processed_count += 1
+            else:
+                failed_ids.add(alarm.id)
         except Exception as e:
+            conn.rollback()
             logger.error(f"Error processing alarm {alarm.id}: {e}")
-            continue
-    
-    logger.info(f"Processed {processed_count} alarms successfully")
+            failed_ids.add(alarm.id)
+
     return processed_count
 
 
-def get_pending_alarms() -> List[TodoAlarm]:
+def get_pending_alarms(conn) -> List[TodoAlarm]:
     """
     Načte TODO alarmy, které čekají na zpracování.
-    
+
+    Args:
+        conn: DB připojení
+
     Returns:
         Seznam TodoAlarm objektů
     """
-    # PŘÍKLAD SQL - přizpůsobte svému DB přístupu
-    sql = """
-        SELECT 
-            ta.id,
-            ta.todo_id,
-            ta.alarm_datetime,
-            ta.is_completed,
-            ta.notification_sent,
-            t.title as todo_title,
-            t.note as todo_note,
-            t.user_id,
-            t.order_id
-        FROM todo_alarm ta
-        JOIN todo t ON ta.todo_id = t.id
-        WHERE ta.alarm_datetime <= %s
-          AND ta.notification_sent = FALSE
-          AND ta.is_completed = FALSE
-          AND t.is_active = TRUE
-        ORDER BY ta.alarm_datetime ASC
-    """
-    
+    sql = PENDING_ALARMS_SQL + " ORDER BY ta.alarm_datetime ASC"
+
     # Kontrola alarmů do 30 minut dopředu
     check_until = datetime.now() + timedelta(minutes=NORMAL_PRIORITY_THRESHOLD_MINUTES)
-    
-    # TODO: Nahraďte svým DB přístupem
-    # results = db.execute(sql, [check_until])
-    # return [TodoAlarm(row) for row in results]
-    
-    # Pro příklad:
-    return []
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql, [check_until])
+        return [TodoAlarm.from_row(row) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
 
 
-def process_single_alarm(alarm: TodoAlarm) -> bool:
+def claim_alarm_batch(
+    conn,
+    cursor,
+    batch_size: int,
+    exclude_ids: Set[int] = None
+) -> Tuple[Optional[str], List[TodoAlarm]]:
+    """
+    Claimne až batch_size nejstarších čekajících alarmů jedním dotazem.
+
+    Více instancí workeru tak dostane disjunktní dávky:
+      - skip_locked: řádky jsou zamčené (FOR UPDATE SKIP LOCKED) až do konce
+        transakce, zamčené řádky ostatní workery přeskočí,
+      - lease: UPDATE zapíše claimed_by/claimed_at a hned se commitne;
+        lease po ALARM_LEASE_SECONDS vyprší (spadlý worker).
+
+    Args:
+        conn: DB připojení
+        cursor: DB kurzor
+        batch_size: Maximální počet alarmů
+        exclude_ids: ID alarmů, které se v tomto běhu přeskakují
+
+    Returns:
+        Tuple (claim token nebo None, seznam TodoAlarm objektů)
+    """
+    check_until = datetime.now() + timedelta(minutes=NORMAL_PRIORITY_THRESHOLD_MINUTES)
+
+    if get_claim_mode() == 'skip_locked':
+        sql = PENDING_ALARMS_SQL
+        params: list = [check_until]
+        if exclude_ids:
+            sql += f" AND ta.id NOT IN ({', '.join(['%s'] * len(exclude_ids))})"
+            params.extend(sorted(exclude_ids))
+        sql += " ORDER BY ta.alarm_datetime ASC LIMIT %s FOR UPDATE SKIP LOCKED"
+        params.append(batch_size)
+
+        cursor.execute(sql, params)
+        return None, [TodoAlarm.from_row(row) for row in cursor.fetchall()]
+
+    claim_token = new_claim_token()
+    cursor.execute(*build_lease_claim_sql(claim_token, check_until, batch_size, exclude_ids))
+    claimed = cursor.rowcount
+    conn.commit()
+
+    if not claimed:
+        return claim_token, []
+
+    cursor.execute(
+        PENDING_ALARMS_SQL + " AND ta.claimed_by = %s ORDER BY ta.alarm_datetime ASC",
+        [check_until, claim_token]
+    )
+    return claim_token, [TodoAlarm.from_row(row) for row in cursor.fetchall()]
+
+
+def new_claim_token() -> str:
+    """Unikátní token jednoho lease claimu (host:pid:sekvence)"""
+    return f"{get_worker_id()}:{next(_claim_sequence)}"
+
+
+def build_lease_claim_sql(
+    claim_token: str,
+    check_until: datetime,
+    batch_size: int,
+    exclude_ids: Set[int] = None
+) -> Tuple[str, list]:
+    """
+    Sestaví UPDATE, který zapíše lease (claimed_by/claimed_at) na až
+    batch_size nejstarších volných nebo prošlých alarmů.
+
+    Returns:
+        Tuple (sql, params)
+    """
+    claimed_at = datetime.now()
+    lease_expired = claimed_at - timedelta(seconds=ALARM_LEASE_SECONDS)
+    exclude_sql = ''
+    exclude_params: list = []
+
+    if exclude_ids:
+        exclude_sql = f"AND id NOT IN ({', '.join(['%s'] * len(exclude_ids))})"
+        exclude_params = sorted(exclude_ids)
+
+    where_sql = f"""
+        alarm_datetime <= %s
+          AND notification_sent = FALSE
+          AND is_completed = FALSE
+          AND (claimed_by IS NULL OR claimed_at < %s)
+          AND EXISTS (SELECT 1 FROM todo t WHERE t.id = todo_alarm.todo_id AND t.is_active = TRUE)
+          {exclude_sql}
+        ORDER BY alarm_datetime ASC
+        LIMIT %s
+    """
+    if DB_BACKEND == 'sqlite':
+        # SQLite standardně nepodporuje UPDATE ... ORDER BY ... LIMIT
+        sql = f"UPDATE todo_alarm SET claimed_by = %s, claimed_at = %s WHERE id IN (SELECT id FROM todo_alarm WHERE {where_sql})"
+    else:
+        sql = f"UPDATE todo_alarm SET claimed_by = %s, claimed_at = %s WHERE {where_sql}"
+
+    return sql, [claim_token, claimed_at, check_until, lease_expired] + exclude_params + [batch_size]
+
+
+def process_single_alarm(alarm: TodoAlarm, conn, claim_token: Optional[str] = None) -> bool:
     """
     Zpracuje jeden TODO alarm - vytvoří notifikaci a označí jako zpracované.
-    
+
     Args:
         alarm: TodoAlarm objekt k zpracování
-        
+        conn: DB připojení
+        claim_token: Token lease claimu (režim 'lease')
+
     Returns:
         True pokud úspěšné, False jinak
     """
     logger.info(f"Processing alarm {alarm.id} for TODO {alarm.todo_id}")
-    
+
     # 1. Urči typ notifikace podle času
-    template_type, priority = determine_notification_type(alarm)
-    
+    with stage_timings.stage('classify'):
+        template_type, priority = determine_notification_type(alarm)
+
     # 2. Připrav placeholdery
     placeholders = prepare_placeholders(alarm)
-    
-    # 3. Vytvoř notifikaci
-    notification_id = create_notification(
-        user_id=alarm.user_id,
-        template_type=template_type,
-        priority=priority,
-        placeholders=placeholders,
-        related_entity='todo',
-        related_id=alarm.todo_id,
-        order_id=alarm.order_id
-    )
-    
+
+    # 3. Vytvoř notifikaci (včetně vykreslení šablony)
+    with stage_timings.stage('insert'):
+        notification_id = create_notification(
+            user_id=alarm.user_id,
+            template_type=template_type,
+            priority=priority,
+            placeholders=placeholders,
+            related_entity='todo',
+            related_id=alarm.todo_id,
+            order_id=alarm.order_id,
+            conn=conn
+        )
+
     if not notification_id:
         logger.error(f"Failed to create notification for alarm {alarm.id}")
+        conn.rollback()
         return False
-    
-    # 4. Označ alarm jako zpracovaný
-    mark_alarm_as_sent(alarm.id, notification_id)
-    
+
+    # 4. Označ alarm jako zpracovaný (pokud ho mezitím nezpracoval jiný worker)
+    with stage_timings.stage('mark'):
+        marked = mark_alarm_as_sent(alarm.id, notification_id, conn, claim_token)
+    if not marked:
+        logger.warning(f"Alarm {alarm.id} was processed by another worker, notification rolled back")
+        conn.rollback()
+        return False
+    with stage_timings.stage('commit'):
+        conn.commit()
+    metrics.record_sent([alarm], datetime.now())
+
     logger.info(f"Successfully processed alarm {alarm.id}, created notification {notification_id}")
     return True
 
 
-def determine_notification_type(alarm: TodoAlarm) -> tuple[str, str]:
+def determine_notification_type(alarm: TodoAlarm, now: datetime = None) -> tuple[str, str]:
     """
     Určí typ notifikační šablony na základě času do alarmu.
-    
+
     Args:
         alarm: TodoAlarm objekt
-        
+        now: Referenční čas (výchozí datetime.now())
+
     Returns:
         Tuple (template_type, priority)
     """
-    now = datetime.now()
-    time_diff = (alarm.alarm_datetime - now).total_seconds() / 60  # v minutách
-    
-    if time_diff < 0:
+    now = now or datetime.now()
+
+    if alarm.alarm_datetime < now:
         # Alarm už prošel
-        return TEMPLATE_EXPIRED, 'high'
-    elif time_diff < HIGH_PRIORITY_THRESHOLD_MINUTES:
+        template_type = TEMPLATE_EXPIRED
+    elif alarm.alarm_datetime < now + timedelta(minutes=HIGH_PRIORITY_THRESHOLD_MINUTES):
         # Méně než 10 minut
-        return TEMPLATE_HIGH, 'high'
+        template_type = TEMPLATE_HIGH
     else:
         # 10-30 minut
-        return TEMPLATE_NORMAL, 'normal'
+        template_type = TEMPLATE_NORMAL
+
+    return template_type, NOTIFICATION_PRIORITIES[template_type]
+
+
+def classify_alarms(alarms: Iterable[TodoAlarm], now: datetime) -> Dict[str, List[TodoAlarm]]:
+    """
+    Rozdělí dávku alarmů podle typu šablony v jednom průchodu.
+
+    Hranice se spočítají jednou z jediného 'now', takže všechny alarmy
+    dávky dostanou konzistentní prioritu a na alarm připadá jen porovnání
+    dvou datetime (stejná pravidla jako determine_notification_type).
+
+    Returns:
+        Dictionary {template_type: [TodoAlarm, ...]} - jen neprázdné skupiny
+    """
+    high_until = now + timedelta(minutes=HIGH_PRIORITY_THRESHOLD_MINUTES)
+    expired: List[TodoAlarm] = []
+    high: List[TodoAlarm] = []
+    normal: List[TodoAlarm] = []
+
+    for alarm in alarms:
+        due = alarm.alarm_datetime
+        if due < now:
+            expired.append(alarm)
+        elif due < high_until:
+            high.append(alarm)
+        else:
+            normal.append(alarm)
+
+    groups = {TEMPLATE_EXPIRED: expired, TEMPLATE_HIGH: high, TEMPLATE_NORMAL: normal}
+    return {template_type: group for template_type, group in groups.items() if group}
 
 
 def prepare_placeholders(alarm: TodoAlarm) -> Dict[str, str]:
     """
     Připraví placeholdery pro notifikační šablonu.
-    
+
     Args:
         alarm: TodoAlarm objekt
-        
+
     Returns:
         Dictionary s placeholdery
     """
@@ -206,6 +694,321 @@ def prepare_placeholders(alarm: TodoAlarm) -> Dict[str, str]:
     }
 
 
+# ===================================================================
+# ŠABLONY
+# ===================================================================
+
+class CompiledTemplate:
+    """
+    Šablona rozložená jednou předem na literály a názvy placeholderů.
+
+    render() pak jen poskládá části v jednom průchodu - bez opakovaného
+    hledání a kopírování celého textu pro každý placeholder. Neznámé
+    placeholdery zůstávají v textu beze změny (stejně jako u replace_placeholders).
+    """
+
+    __slots__ = ('source', '_literals', '_keys')
+
+    _PLACEHOLDER_RE = re.compile(r'\{(\w+)\}')
+
+    def __init__(self, source: str):
+        self.source = source
+        parts = self._PLACEHOLDER_RE.split(source)
+        # parts = [literál, klíč, literál, klíč, ..., literál]
+        self._literals = parts[0::2]
+        self._keys = parts[1::2]
+
+    @property
+    def placeholders(self) -> Set[str]:
+        """Názvy placeholderů v šabloně"""
+        return set(self._keys)
+
+    def render(self, placeholders: Dict[str, str]) -> str:
+        """Dosadí placeholdery do šablony"""
+        literals = self._literals
+        out = [literals[0]]
+        for i, key in enumerate(self._keys, 1):
+            value = placeholders.get(key)
+            out.append('{' + key + '}' if value is None else value)
+            out.append(literals[i])
+        return ''.join(out)
+
+
+class TemplateCache:
+    """
+    Cache předkompilovaných notifikačních šablon podle typu.
+
+    Po vypršení TTL se jedním levným dotazem (COUNT + MAX(dt_updated))
+    ověří, zda se tabulka šablon změnila; jen v tom případě se cache zahodí
+    a šablony se načtou znovu.
+    """
+
+    def __init__(self, ttl_seconds: float = TEMPLATE_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._templates: Dict[str, Dict[str, CompiledTemplate]] = {}
+        self._version = None
+        self._checked_at: Optional[float] = None
+
+    def invalidate(self):
+        """Zahodí všechny šablony (např. po ručním updatu tabulky)"""
+        self._templates = {}
+        self._version = None
+        self._checked_at = None
+
+    def get(self, cursor, template_types: Set[str]) -> Dict[str, Dict[str, CompiledTemplate]]:
+        """
+        Vrátí předkompilované šablony požadovaných typů.
+
+        Returns:
+            Dictionary {template_type: {'app_title': CompiledTemplate, 'app_message': CompiledTemplate}}
+        """
+        if self._checked_at is None or time.monotonic() - self._checked_at >= self.ttl_seconds:
+            self._check_version(cursor)
+
+        missing = [t for t in template_types if t not in self._templates]
+        if missing:
+            for template_type, row in get_notification_templates(cursor, set(missing)).items():
+                self._templates[template_type] = {
+                    'app_title': CompiledTemplate(row['app_title']),
+                    'app_message': CompiledTemplate(row['app_message']),
+                }
+
+        return {t: self._templates[t] for t in template_types if t in self._templates}
+
+    def _check_version(self, cursor):
+        cursor.execute(f"SELECT COUNT(*), MAX(dt_updated) FROM `{TEMPLATES_TABLE}`")
+        version = tuple(cursor.fetchone())
+        if version != self._version:
+            if self._version is not None:
+                logger.info("Notification templates changed, template cache invalidated")
+            self._templates = {}
+            self._version = version
+        self._checked_at = time.monotonic()
+
+
+template_cache = TemplateCache()
+
+
+def get_notification_template(cursor, template_type: str) -> Optional[Dict[str, CompiledTemplate]]:
+    """
+    Vrátí jednu notifikační šablonu (přes template_cache).
+
+    Returns:
+        Dictionary s předkompilovaným app_title a app_message, nebo None pokud neexistuje
+    """
+    return template_cache.get(cursor, {template_type}).get(template_type)
+
+
+def get_notification_templates(cursor, template_types: Set[str]) -> Dict[str, Dict[str, str]]:
+    """
+    Načte více notifikačních šablon jedním dotazem.
+
+    Returns:
+        Dictionary {template_type: {'app_title': ..., 'app_message': ...}}
+    """
+    types = sorted(template_types)
+    sql = f"""
+        SELECT type, app_title, app_message
+        FROM `{TEMPLATES_TABLE}`
+        WHERE type IN ({', '.join(['%s'] * len(types))})
+          AND active = 1
+    """
+    cursor.execute(sql, types)
+    return {
+        row[0]: {'app_title': row[1], 'app_message': row[2]}
+        for row in cursor.fetchall()
+    }
+
+
+def replace_placeholders(text: str, placeholders: Dict[str, str]) -> str:
+    """Nahradí {placeholder} tokeny v textu šablony (bez kompilace, pro jednorázové použití)"""
+    for key, value in placeholders.items():
+        text = text.replace('{' + key + '}', value)
+    return text
+
+
+def build_notification_row(
+    alarm: TodoAlarm,
+    templates: Dict[str, Dict[str, CompiledTemplate]],
+    now: datetime,
+    notification_type: Optional[Tuple[str, str]] = None
+) -> tuple:
+    """
+    Sestaví hodnoty jednoho řádku tabulky notification (pořadí NOTIFICATION_COLUMNS).
+
+    Args:
+        notification_type: Už určený (template_type, priority); jinak se určí podle now
+
+    Raises:
+        KeyError: pokud šablona pro daný typ neexistuje
+    """
+    template_type, priority = notification_type or determine_notification_type(alarm, now)
+    template = templates[template_type]
+    placeholders = prepare_placeholders(alarm)
+
+    return (
+        alarm.user_id,
+        template_type,
+        priority,
+        template['app_title'].render(placeholders),
+        template['app_message'].render(placeholders),
+        False,
+        False,
+        'todo',
+        alarm.todo_id,
+        alarm.order_id,
+        now,
+    )
+
+
+# ===================================================================
+# ZÁPIS DO DB
+# ===================================================================
+
+def insert_notifications(cursor, rows: List[tuple]) -> int:
+    """
+    Vloží notifikace jedním multi-row INSERTem.
+
+    MySQL/MariaDB vrací v lastrowid ID PRVNÍHO vloženého řádku a pro
+    jednoduchý multi-row INSERT přiděluje ID souvisle jen při
+    auto_increment_increment = 1 a innodb_autoinc_lock_mode = 0/1 (výchozí
+    v MariaDB) - ověřuje verify_autoinc_settings() při startu. SQLite vrací
+    ID posledního řádku.
+
+    Returns:
+        ID první vložené notifikace (další mají ID +1, +2, ...)
+    """
+    cursor.execute(*build_insert_notifications_sql(rows))
+    return first_inserted_id(cursor.lastrowid, len(rows))
+
+
+def build_insert_notifications_sql(rows: List[tuple]) -> Tuple[str, list]:
+    """Sestaví multi-row INSERT do tabulky notification - Tuple (sql, params)"""
+    row_placeholders = '(' + ', '.join(['%s'] * len(NOTIFICATION_COLUMNS)) + ')'
+    sql = f"""
+        INSERT INTO notification ({', '.join(NOTIFICATION_COLUMNS)})
+        VALUES {', '.join([row_placeholders] * len(rows))}
+    """
+    return sql, [value for row in rows for value in row]
+
+
+def first_inserted_id(lastrowid: int, count: int) -> int:
+    """Převede lastrowid multi-row INSERTu na ID prvního řádku (SQLite vrací poslední)"""
+    if DB_BACKEND == 'sqlite':
+        return lastrowid - count + 1
+    return lastrowid
+
+
+# Proměnné serveru, na kterých závisí souvislá ID multi-row INSERTu (první ID + i)
+AUTOINC_SETTINGS_SQL = "SELECT @@auto_increment_increment, @@innodb_autoinc_lock_mode"
+
+_autoinc_verified = False
+
+
+class AutoIncrementConfigError(RuntimeError):
+    """Server nepřiděluje ID jednoho INSERTu souvisle - ID notifikací by se přiřadila špatně"""
+
+
+def check_autoinc_settings(increment: int, lock_mode: int):
+    """
+    Ověří, že multi-row INSERT dostane souvislá ID.
+
+    auto_increment_increment > 1 (Galera, multi-primary) dělá mezery mezi ID
+    jednoho INSERTu, innodb_autoinc_lock_mode = 2 (interleaved) je může
+    proložit s jinými souběžnými INSERTy.
+
+    Raises:
+        AutoIncrementConfigError: pokud first_id + i neodpovídá vloženým řádkům
+    """
+    problems = []
+    if increment != 1:
+        problems.append(f"auto_increment_increment = {increment} (must be 1)")
+    if lock_mode == 2:
+        problems.append("innodb_autoinc_lock_mode = 2 (must be 0 or 1)")
+    if problems:
+        raise AutoIncrementConfigError(
+            "Notification IDs of a multi-row INSERT would not be consecutive: " + ', '.join(problems)
+        )
+
+
+def verify_autoinc_settings(conn):
+    """Jednou za proces ověří proměnné serveru (SQLite přiděluje ID vždy souvisle)"""
+    global _autoinc_verified
+    if _autoinc_verified or DB_BACKEND == 'sqlite':
+        return
+    cursor = conn.cursor()
+    try:
+        cursor.execute(AUTOINC_SETTINGS_SQL)
+        increment, lock_mode = cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.rollback()
+    check_autoinc_settings(int(increment), int(lock_mode))
+    _autoinc_verified = True
+
+
+def mark_alarms_as_sent(
+    cursor,
+    sent: List[Tuple[int, int]],
+    sent_at: datetime,
+    claim_token: Optional[str] = None
+) -> int:
+    """
+    Označí celou dávku alarmů jako zpracovanou jedním UPDATE.
+
+    Aktualizují se jen dosud neodeslané alarmy (a v režimu 'lease' jen ty,
+    které pořád drží náš claim) - volající porovná rowcount s délkou dávky.
+
+    Args:
+        cursor: DB kurzor (uvnitř otevřené transakce)
+        sent: Seznam (alarm_id, notification_id)
+        sent_at: Čas odeslání
+        claim_token: Token lease claimu (režim 'lease')
+
+    Returns:
+        Počet aktualizovaných řádků
+    """
+    cursor.execute(*build_mark_sent_sql(sent, sent_at, claim_token))
+    return cursor.rowcount
+
+
+def build_mark_sent_sql(
+    sent: List[Tuple[int, int]],
+    sent_at: datetime,
+    claim_token: Optional[str] = None
+) -> Tuple[str, list]:
+    """Sestaví UPDATE pro mark_alarms_as_sent() - Tuple (sql, params)"""
+    case_sql = ' '.join(['WHEN %s THEN %s'] * len(sent))
+    sql = f"""
+        UPDATE todo_alarm
+        SET notification_sent = TRUE,
+            notification_sent_at = %s,
+            last_notification_id = CASE id {case_sql} END
+        WHERE id IN ({', '.join(['%s'] * len(sent))})
+          AND notification_sent = FALSE
+    """
+    params: list = [sent_at]
+    params.extend(value for pair in sent for value in pair)
+    params.extend(alarm_id for alarm_id, _ in sent)
+
+    if claim_token:
+        sql += " AND claimed_by = %s"
+        params.append(claim_token)
+
+    return sql, params
+
+
+def build_release_claim_sql(alarm_ids: List[int], claim_token: str) -> Tuple[str, list]:
+    """Sestaví UPDATE, který uvolní lease alarmů (jen pokud ho pořád drží claim_token)"""
+    sql = f"""
+        UPDATE todo_alarm
+        SET claimed_by = NULL, claimed_at = NULL
+        WHERE id IN ({', '.join(['%s'] * len(alarm_ids))})
+          AND claimed_by = %s
+    """
+    return sql, list(alarm_ids) + [claim_token]
+
+
 def create_notification(
     user_id: int,
     template_type: str,
@@ -213,11 +1016,12 @@ def create_notification(
     placeholders: Dict[str, str],
     related_entity: str = None,
     related_id: int = None,
-    order_id: int = None
+    order_id: int = None,
+    conn=None
 ) -> Optional[int]:
     """
     Vytvoří notifikaci v databázi.
-    
+
     Args:
         user_id: ID uživatele
         template_type: Typ šablony (alarm_todo_normal/high/expired)
@@ -226,126 +1030,733 @@ def create_notification(
         related_entity: Související entita (todo)
         related_id: ID související entity
         order_id: ID objednávky (volitelné)
-        
+        conn: DB připojení (commit dělá volající)
+
     Returns:
         ID vytvořené notifikace, nebo None pokud se nezdařilo
     """
-    # PŘÍKLAD SQL - přizpůsobte svému DB přístupu
-    
-    # 1. Načti šablonu
-    # template = get_notification_template(template_type)
-    
-    # 2. Nahraď placeholdery v app_title a app_message
-    # app_title = replace_placeholders(template.app_title, placeholders)
-    # app_message = replace_placeholders(template.app_message, placeholders)
-    
-    # 3. Vytvoř notifikaci
-    sql = """
-        INSERT INTO notification (
+    cursor = conn.cursor()
+    try:
+        # 1. Načti šablonu
+        template = get_notification_template(cursor, template_type)
+        if not template:
+            logger.error(f"Notification template '{template_type}' not found")
+            return None
+
+        # 2. Nahraď placeholdery v app_title a app_message
+        app_title = template['app_title'].render(placeholders)
+        app_message = template['app_message'].render(placeholders)
+
+        # 3. Vytvoř notifikaci
+        return insert_notifications(cursor, [(
             user_id,
             template_type,
             priority,
             app_title,
             app_message,
-            is_read,
-            is_sent,
+            False,
+            False,
             related_entity,
             related_id,
             order_id,
-            dt_created
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-    """
-    
-    # TODO: Nahraďte svým DB přístupem
-    # notification_id = db.execute(sql, [...])
-    # return notification_id
-    
-    # Pro příklad:
-    logger.info(f"Would create notification: user={user_id}, type={template_type}, priority={priority}")
-    return 999  # Fake ID
+            datetime.now(),
+        )])
+    finally:
+        cursor.close()
 
 
-def mark_alarm_as_sent(alarm_id: int, notification_id: int) -> bool:
+def mark_alarm_as_sent(alarm_id: int, notification_id: int, conn, claim_token: Optional[str] = None) -> bool:
     """
     Označí alarm jako zpracovaný.
-    
+
     Args:
         alarm_id: ID alarmu
         notification_id: ID vytvořené notifikace
-        
+        conn: DB připojení (commit dělá volající)
+        claim_token: Token lease claimu (režim 'lease')
+
     Returns:
-        True pokud úspěšné
-    """
-    sql = """
-        UPDATE todo_alarm
-        SET notification_sent = TRUE,
-            notification_sent_at = %s,
-            last_notification_id = %s
-        WHERE id = %s
+        True pokud úspěšné, False pokud alarm mezitím zpracoval jiný worker
     """
-    
-    # TODO: Nahraďte svým DB přístupem
-    # db.execute(sql, [datetime.now(), notification_id, alarm_id])
-    
+    cursor = conn.cursor()
+    try:
+        marked = mark_alarms_as_sent(cursor, [(alarm_id, notification_id)], datetime.now(), claim_token)
+    finally:
+        cursor.close()
+
+    if not marked:
+        return False
+
     logger.info(f"Marked alarm {alarm_id} as sent (notification {notification_id})")
     return True
 
 
+# ===================================================================
+# LOKÁLNÍ STAND-IN (SQLite) - testy a benchmarky bez MariaDB
+# ===================================================================
+
+SQLITE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS todo (
+        id INTEGER PRIMARY KEY,
+        title TEXT,
+        note TEXT,
+        user_id INTEGER,
+        order_id INTEGER,
+        is_active BOOLEAN NOT NULL DEFAULT 1
+    );
+    CREATE TABLE IF NOT EXISTS todo_alarm (
+        id INTEGER PRIMARY KEY,
+        todo_id INTEGER NOT NULL,
+        alarm_datetime TIMESTAMP NOT NULL,
+        is_completed BOOLEAN NOT NULL DEFAULT 0,
+        notification_sent BOOLEAN NOT NULL DEFAULT 0,
+        notification_sent_at TIMESTAMP,
+        last_notification_id INTEGER,
+        claimed_by VARCHAR(64),
+        claimed_at TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS notification (
+        id INTEGER PRIMARY KEY,
+        user_id INTEGER,
+        template_type VARCHAR(100),
+        priority VARCHAR(20),
+        app_title VARCHAR(255),
+        app_message TEXT,
+        is_read BOOLEAN DEFAULT 0,
+        is_sent BOOLEAN DEFAULT 0,
+        related_entity VARCHAR(50),
+        related_id INTEGER,
+        order_id INTEGER,
+        dt_created TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS "25_notification_templates" (
+        id INTEGER PRIMARY KEY,
+        type VARCHAR(100) NOT NULL UNIQUE,
+        app_title VARCHAR(255) NOT NULL,
+        app_message TEXT NOT NULL,
+        active BOOLEAN DEFAULT 1,
+        dt_updated TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_notification_sent ON todo_alarm (notification_sent, alarm_datetime);
+    CREATE INDEX IF NOT EXISTS idx_todo_alarm_pending
+        ON todo_alarm (notification_sent, is_completed, alarm_datetime, todo_id);
+    CREATE INDEX IF NOT EXISTS idx_todo_alarm_claimed_by ON todo_alarm (claimed_by);
+"""
+
+# Šablony dle BACKEND-TODO-ALARM-NOTIFICATIONS-SPEC.md
+SQLITE_TEMPLATES = [
+    (TEMPLATE_NORMAL, 'Připomínka úkolu', '{todo_title} - termín {alarm_datetime}'),
+    (TEMPLATE_HIGH, '⚠️ URGENTNÍ úkol', '{todo_title} - VYŽADUJE POZORNOST!'),
+    (TEMPLATE_EXPIRED, '🔴 Prošlý termín úkolu', '{todo_title} - termín již prošel'),
+]
+
+
+class SqliteCursor:
+    """Adaptér sqlite3 kurzoru na paramstyle %s a `identifikátory` (jako pymysql)"""
+
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._cursor = cursor
+
+    def execute(self, sql: str, params=()):
+        return self._cursor.execute(sql.replace('%s', '?').replace('`', '"'), list(params))
+
+    def executemany(self, sql: str, seq_of_params):
+        return self._cursor.executemany(sql.replace('%s', '?').replace('`', '"'), seq_of_params)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class SqliteConnection:
+    """SQLite stand-in s rozhraním pymysql připojení (cursor/commit/rollback/close)"""
+
+    def __init__(self, path: str):
+        # check_same_thread=False: async stand-in pool volá připojení z thread poolu
+        self._conn = sqlite3.connect(
+            path, timeout=60, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False
+        )
+        self._conn.execute('PRAGMA journal_mode = WAL')
+
+    def cursor(self) -> SqliteCursor:
+        return SqliteCursor(self._conn.cursor())
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def init_sqlite_schema(conn):
+    """Vytvoří tabulky stand-inu a naplní alarmové šablony"""
+    conn.executescript(SQLITE_SCHEMA)
+    conn.executemany(
+        'INSERT OR IGNORE INTO "25_notification_templates" (type, app_title, app_message, dt_updated) VALUES (?, ?, ?, ?)',
+        [(template_type, title, message, datetime.now()) for template_type, title, message in SQLITE_TEMPLATES]
+    )
+    conn.commit()
+
+
+# ===================================================================
+# DAEMON REŽIM
+# ===================================================================
+
+class AlarmScheduler:
+    """
+    Fronta nadcházejících alarmů seřazená podle času odeslání.
+
+    Alarm se odesílá NORMAL_PRIORITY_THRESHOLD_MINUTES před alarm_datetime,
+    heap proto drží (alarm_datetime - threshold, alarm_id). Obsah se přenačítá
+    jen při refresh(); mezi refreshi se žádné dotazy neposílají.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def refresh(self, conn, horizon_seconds: float) -> int:
+        """
+        Načte čekající alarmy, jejichž čas odeslání nastane do horizon_seconds.
+
+        Returns:
+            Počet alarmů ve frontě
+        """
+        lead = timedelta(minutes=NORMAL_PRIORITY_THRESHOLD_MINUTES)
+        until = datetime.now() + lead + timedelta(seconds=horizon_seconds)
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT ta.id, ta.alarm_datetime
+                FROM todo_alarm ta
+                JOIN todo t ON ta.todo_id = t.id
+                WHERE ta.alarm_datetime <= %s
+                  AND ta.notification_sent = FALSE
+                  AND ta.is_completed = FALSE
+                  AND t.is_active = TRUE
+            """, [until])
+            self._heap = [(alarm_datetime - lead, alarm_id) for alarm_id, alarm_datetime in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+        # Čtení nesmí držet otevřený snapshot transakce přes celý spánek
+        conn.commit()
+
+        heapq.heapify(self._heap)
+        return len(self._heap)
+
+    def next_deadline(self) -> Optional[datetime]:
+        """Vrátí nejbližší čas odeslání, nebo None pokud je fronta prázdná"""
+        return self._heap[0][0] if self._heap else None
+
+    def is_due(self, now: datetime) -> bool:
+        """Je některý alarm ve frontě už k odeslání?"""
+        return bool(self._heap) and self._heap[0][0] <= now
+
+    def pop_due(self, now: datetime) -> int:
+        """
+        Odebere z fronty alarmy, jejichž čas odeslání už nastal.
+
+        Returns:
+            Počet odebraných alarmů
+        """
+        popped = 0
+        while self._heap and self._heap[0][0] <= now:
+            heapq.heappop(self._heap)
+            popped += 1
+        return popped
+
+
+def ensure_connection(conn):
+    """Ověří perzistentní připojení a případně ho obnoví (pymysql ping)"""
+    ping = getattr(conn, 'ping', None)
+    if ping:
+        ping(reconnect=True)
+
+
+def run_daemon(
+    batch_size: int = ALARM_BATCH_SIZE,
+    refresh_seconds: float = DAEMON_REFRESH_SECONDS,
+    stop_event: Optional[threading.Event] = None
+) -> int:
+    """
+    Dlouhoběžící režim workeru s jedním perzistentním DB připojením.
+
+    Worker spí přesně do nejbližšího termínu ve frontě AlarmScheduler nebo
+    do dalšího refreshe fronty (nastane-li dřív). Probuzení bez due alarmu
+    neposílá žádný dotaz.
+
+    Args:
+        batch_size: Maximální počet alarmů v jedné dávce
+        refresh_seconds: Interval přenačtení fronty z DB
+        stop_event: Event pro ukončení (výchozí se nastaví přes SIGTERM/SIGINT)
+
+    Returns:
+        Celkový počet zpracovaných alarmů
+    """
+    if stop_event is None:
+        stop_event = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+        signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+
+    logger.info(f"Daemon mode started (refresh={refresh_seconds}s, batch_size={batch_size})")
+
+    scheduler = AlarmScheduler()
+    processed_total = 0
+    next_refresh = time.monotonic()
+
+    conn = get_db_connection()
+    try:
+        verify_autoinc_settings(conn)
+        while not stop_event.is_set():
+            now = datetime.now()
+            refresh_due = time.monotonic() >= next_refresh
+
+            try:
+                if refresh_due or scheduler.is_due(now):
+                    ensure_connection(conn)
+                    processed_total += process_todo_alarms(batch_size=batch_size, conn=conn)
+                    scheduler.pop_due(now)
+
+                if refresh_due:
+                    queued = scheduler.refresh(conn, refresh_seconds)
+                    logger.debug(f"Scheduler refreshed: {queued} upcoming alarms")
+            except Exception as e:
+                # Výpadek DB nesmí shodit daemon - zkusí se to znovu při dalším refreshi
+                logger.error(f"Error in daemon tick: {e}")
+                metrics.errors_total += 1
+                refresh_due = True
+
+            metrics.upcoming = len(scheduler)
+            if METRICS_TEXTFILE:
+                metrics.write_textfile(METRICS_TEXTFILE)
+
+            if refresh_due:
+                next_refresh = time.monotonic() + refresh_seconds
+
+            # Spi do nejbližšího termínu, nejdéle do dalšího refreshe
+            sleep_for = next_refresh - time.monotonic()
+            deadline = scheduler.next_deadline()
+            if deadline is not None:
+                sleep_for = min(sleep_for, (deadline - datetime.now()).total_seconds())
+
+            stop_event.wait(max(0.0, sleep_for))
+    finally:
+        conn.close()
+
+    logger.info(f"Daemon mode stopped, processed {processed_total} alarms")
+    return processed_total
+
+
 # ===================================================================
 # MONITORING & STATISTIKY
 # ===================================================================
 
-def get_pending_alarms_count() -> int:
-    """Vrátí počet alarmů čekajících na zpracování"""
-    sql = """
-        SELECT COUNT(*) as count
-        FROM todo_alarm ta
-        JOIN todo t ON ta.todo_id = t.id
-        WHERE ta.alarm_datetime <= %s
-          AND ta.notification_sent = FALSE
-          AND ta.is_completed = FALSE
-          AND t.is_active = TRUE
+class WorkerMetrics:
+    """
+    Inkrementální metriky workeru - aktualizují se po každé dávce (O(dávka)),
+    žádné COUNT(*)/AVG() nad celou historií tabulky.
+
+    Zpoždění notifikace = čas odeslání minus okamžik, kdy mohla odejít
+    nejdřív (alarm_datetime - NORMAL_PRIORITY_THRESHOLD_MINUTES). Drží se
+    kumulativní histogram (Prometheus buckety) a klouzavé okno posledních
+    METRICS_DELAY_WINDOW hodnot pro p50/p95/p99.
+    """
+
+    DELAY_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+
+    def __init__(self, window_size: int = METRICS_DELAY_WINDOW):
+        self.processed_total = 0
+        self.claimed_total = 0
+        self.batches_total = 0
+        self.failed_total = 0
+        self.claims_lost_total = 0
+        self.errors_total = 0
+        self.pending = 0
+        self.upcoming = 0
+        self.last_run_timestamp: Optional[float] = None
+
+        self.delay_sum = 0.0
+        self.delay_count = 0
+        self.delay_bucket_counts = [0] * (len(self.DELAY_BUCKETS) + 1)
+        self.delay_window = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+
+    def record_claim(self, claimed: int):
+        """Zaznamená jednu claimnutou dávku"""
+        with self._lock:
+            self.batches_total += 1
+            self.claimed_total += claimed
+
+    def record_sent(self, alarms: Iterable[TodoAlarm], sent_at: datetime):
+        """Zaznamená úspěšně odeslané alarmy a jejich zpoždění"""
+        lead = timedelta(minutes=NORMAL_PRIORITY_THRESHOLD_MINUTES)
+        with self._lock:
+            for alarm in alarms:
+                delay = max(0.0, (sent_at - (alarm.alarm_datetime - lead)).total_seconds())
+                self.processed_total += 1
+                self.delay_sum += delay
+                self.delay_count += 1
+                self.delay_window.append(delay)
+                for i, bound in enumerate(self.DELAY_BUCKETS):
+                    if delay <= bound:
+                        self.delay_bucket_counts[i] += 1
+                        break
+                else:
+                    self.delay_bucket_counts[-1] += 1
+
+    def record_run(self, failed: int):
+        """Zaznamená konec průchodu frontou - čekají jen alarmy, které selhaly"""
+        with self._lock:
+            self.failed_total += failed
+            self.pending = failed
+            self.last_run_timestamp = time.time()
+
+    def delay_quantile(self, q: float) -> float:
+        """Kvantil zpoždění (v sekundách) z klouzavého okna"""
+        with self._lock:
+            window = sorted(self.delay_window)
+        if not window:
+            return 0.0
+        return window[min(len(window) - 1, int(q * len(window)))]
+
+    def render_prometheus(self) -> str:
+        """Metriky v textovém formátu Prometheus"""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP todo_alarm_{name} {help_text}")
+            lines.append(f"# TYPE todo_alarm_{name} {kind}")
+            for labels, value in samples:
+                lines.append(f"todo_alarm_{name}{labels} {value}")
+
+        metric('processed_total', 'counter', 'Alarms with a created notification', [('', self.processed_total)])
+        metric('claimed_total', 'counter', 'Alarms claimed by this worker', [('', self.claimed_total)])
+        metric('batches_total', 'counter', 'Claimed batches', [('', self.batches_total)])
+        metric('failed_total', 'counter', 'Alarms that failed and stayed pending', [('', self.failed_total)])
+        metric('claims_lost_total', 'counter', 'Batches rolled back after losing the claim', [('', self.claims_lost_total)])
+        metric('errors_total', 'counter', 'Daemon ticks that failed', [('', self.errors_total)])
+        metric('pending', 'gauge', 'Due alarms left pending after the last run', [('', self.pending)])
+        metric('upcoming', 'gauge', 'Alarms queued in the daemon scheduler', [('', self.upcoming)])
+        if self.last_run_timestamp:
+            metric('last_run_timestamp_seconds', 'gauge', 'End of the last run', [('', self.last_run_timestamp)])
+
+        cumulative = 0
+        buckets = []
+        for bound, count in zip(self.DELAY_BUCKETS + ('+Inf',), self.delay_bucket_counts):
+            cumulative += count
+            buckets.append((f'_bucket{{le="{bound}"}}', cumulative))
+        metric('notification_delay_seconds', 'histogram', 'Delay between earliest send time and sending', buckets)
+        lines.append(f"todo_alarm_notification_delay_seconds_sum {self.delay_sum}")
+        lines.append(f"todo_alarm_notification_delay_seconds_count {self.delay_count}")
+
+        metric(
+            'notification_delay_window_seconds', 'gauge',
+            f'Delay quantiles over the last {self.delay_window.maxlen} notifications',
+            [(f'{{quantile="{q}"}}', self.delay_quantile(q)) for q in (0.5, 0.95, 0.99)]
+        )
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path: str):
+        """Zapíše metriky pro node_exporter textfile collector (atomicky přes rename)"""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, path)
+
+
+metrics = WorkerMetrics()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics - Prometheus endpoint daemonu"""
+
+    def do_GET(self):
+        if self.path != '/metrics':
+            self.send_error(404)
+            return
+        body = metrics.render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"metrics: {format % args}")
+
+
+def start_metrics_server(port: int) -> ThreadingHTTPServer:
+    """Spustí /metrics endpoint na pozadí (daemon thread)"""
+    server = ThreadingHTTPServer(('', port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    logger.info(f"Metrics endpoint listening on :{port}/metrics")
+    return server
+
+
+class StageTimings:
     """
-    # TODO: Implementovat
-    return 0
+    Časy fází hot path workeru a počet DB round-trips.
+
+    Fáze: claim (výběr čekajících alarmů), templates (cache šablon),
+    classify (classify_alarms), render (placeholdery + šablona),
+    insert (create_notification / multi-row INSERT), mark (mark_alarm_as_sent),
+    commit. Měří se perf_counter() po fázích dávky, ne po řádcích, takže
+    režie zůstává zanedbatelná i v produkci. Po každé dávce se zapíše
+    strukturovaný řádek logu (logfmt), na konci main() souhrn.
+    """
+
+    def __init__(self, enabled: bool = INSTRUMENTATION_ENABLED):
+        self.enabled = enabled
+        self.totals: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.maxima: Dict[str, float] = {}
+        self.db_roundtrips = 0
+        self.batches = 0
+        self.claimed = 0
+        self.processed = 0
+        self._batch: Dict[str, float] = {}
+        self._batch_started = 0.0
+        self._batch_roundtrips = 0
+
+    def add(self, name: str, seconds: float):
+        """Přičte jedno měření fáze (k celkovým i k aktuální dávce)"""
+        if not self.enabled:
+            return
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if seconds > self.maxima.get(name, 0.0):
+            self.maxima[name] = seconds
+        self._batch[name] = self._batch.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str):
+        """Změří blok kódu jako fázi name"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def begin_batch(self):
+        self._batch = {}
+        self._batch_started = time.perf_counter()
+        self._batch_roundtrips = self.db_roundtrips
+
+    def end_batch(self, claimed: int, processed: int):
+        """Uzavře dávku a zapíše její strukturovaný řádek logu"""
+        if not self.enabled:
+            return
+        self.batches += 1
+        self.claimed += claimed
+        self.processed += processed
+        fields = [
+            f"claimed={claimed}",
+            f"processed={processed}",
+            f"total_ms={(time.perf_counter() - self._batch_started) * 1000:.2f}",
+        ]
+        fields.extend(f"{name}_ms={seconds * 1000:.2f}" for name, seconds in self._batch.items())
+        fields.append(f"db_roundtrips={self.db_roundtrips - self._batch_roundtrips}")
+        logger.info(f"alarm_batch {' '.join(fields)}")
+
+    def summary(self) -> List[str]:
+        """Souhrn za celý běh - jeden řádek na fázi"""
+        if not self.enabled:
+            return []
+        lines = [
+            f"alarm_stats batches={self.batches} claimed={self.claimed} "
+            f"processed={self.processed} db_roundtrips={self.db_roundtrips}"
+        ]
+        for name, total in sorted(self.totals.items(), key=lambda item: -item[1]):
+            calls = self.calls[name]
+            lines.append(
+                f"alarm_stage stage={name} calls={calls} total_ms={total * 1000:.2f} "
+                f"avg_ms={total * 1000 / calls:.3f} max_ms={self.maxima[name] * 1000:.2f}"
+            )
+        return lines
+
+
+stage_timings = StageTimings()
+
+
+def get_pending_alarms_count(conn) -> int:
+    """
+    Vrátí počet alarmů čekajících na zpracování (v celé DB, pro všechny workery).
+
+    Jeden COUNT přes index idx_todo_alarm_pending. Kolik alarmů nechal
+    čekat poslední běh tohoto procesu, drží bez dotazu metrics.pending.
+    """
+    check_until = datetime.now() + timedelta(minutes=NORMAL_PRIORITY_THRESHOLD_MINUTES)
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(PENDING_COUNT_SQL, [check_until])
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
 
 
 def get_average_notification_delay() -> float:
-    """Vrátí průměrné zpoždění notifikací v minutách"""
-    sql = """
-        SELECT AVG(TIMESTAMPDIFF(MINUTE, alarm_datetime, notification_sent_at)) as avg_delay
-        FROM todo_alarm
-        WHERE notification_sent = TRUE
-          AND notification_sent_at IS NOT NULL
+    """Vrátí průměrné zpoždění notifikací v minutách (klouzavé okno, bez dotazu)"""
+    with metrics._lock:
+        window = list(metrics.delay_window)
+    return sum(window) / len(window) / 60 if window else 0.0
+
+
+# ===================================================================
+# DIAGNOSTIKA QUERY PLÁNŮ
+# ===================================================================
+
+def explain_pending_queries(conn) -> List[str]:
+    """
+    Spustí EXPLAIN nad dotazy get_pending_alarms() a get_pending_alarms_count()
+    a zaloguje plány.
+
+    Za problém se považuje full scan tabulky (MySQL type ALL/index, SQLite
+    SCAN) - s miliony řádků v todo_alarm by dotaz rostl s historií tabulky.
+    Index pro oba dotazy: scripts/sql/add_todo_alarm_pending_index.sql
+
+    Returns:
+        Seznam nalezených problémů (prázdný = všechny dotazy jdou přes index)
     """
-    # TODO: Implementovat
-    return 0.0
+    check_until = datetime.now() + timedelta(minutes=NORMAL_PRIORITY_THRESHOLD_MINUTES)
+    queries = {
+        'get_pending_alarms': PENDING_ALARMS_SQL + " ORDER BY ta.alarm_datetime ASC",
+        'get_pending_alarms_count': PENDING_COUNT_SQL,
+    }
+    problems = []
+
+    cursor = conn.cursor()
+    try:
+        for name, sql in queries.items():
+            if DB_BACKEND == 'sqlite':
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql, [check_until])
+                steps = [row[3] for row in cursor.fetchall()]
+                full_scans = [step for step in steps if step.startswith('SCAN ')]
+            else:
+                cursor.execute('EXPLAIN ' + sql, [check_until])
+                columns = [column[0] for column in cursor.description]
+                rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                steps = [
+                    f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']} {row['Extra'] or ''}"
+                    for row in rows
+                ]
+                full_scans = [
+                    step for step, row in zip(steps, rows)
+                    if row['type'] in ('ALL', 'index')
+                ]
+
+            for step in steps:
+                logger.info(f"EXPLAIN {name}: {step}")
+            problems.extend(f"{name}: full scan - {step}" for step in full_scans)
+    finally:
+        cursor.close()
+        conn.rollback()
+
+    return problems
 
 
 # ===================================================================
 # MAIN ENTRY POINT
 # ===================================================================
 
-def main():
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Zpracuje argumenty příkazové řádky"""
+    parser = argparse.ArgumentParser(description='TODO Alarm Notification Worker')
+    parser.add_argument(
+        '--batch-size', type=int, default=ALARM_BATCH_SIZE,
+        help=f'Počet alarmů v jedné transakci (výchozí {ALARM_BATCH_SIZE})'
+    )
+    parser.add_argument(
+        '--daemon', action='store_true',
+        help='Běžet trvale s perzistentním připojením místo jednoho průchodu z cronu'
+    )
+    parser.add_argument(
+        '--refresh-seconds', type=float, default=DAEMON_REFRESH_SECONDS,
+        help=f'Daemon: interval přenačtení fronty alarmů (výchozí {DAEMON_REFRESH_SECONDS} s)'
+    )
+    parser.add_argument(
+        '--metrics-textfile', default=METRICS_TEXTFILE,
+        help='Zapisovat metriky do souboru pro node_exporter textfile collector'
+    )
+    parser.add_argument(
+        '--metrics-port', type=int, default=METRICS_PORT,
+        help='Daemon: port HTTP endpointu /metrics (0 = vypnuto)'
+    )
+    parser.add_argument(
+        '--profile', metavar='FILE',
+        help='Spustit pod cProfile a uložit statistiky (python3 -m pstats FILE)'
+    )
+    parser.add_argument(
+        '--explain', action='store_true',
+        help='Jen ověřit query plány čekajících alarmů (exit 2 při full scanu)'
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
     """Hlavní vstupní bod pro background worker"""
+    args = parse_args(argv)
+
+    if args.explain:
+        conn = get_db_connection()
+        try:
+            problems = explain_pending_queries(conn)
+        finally:
+            conn.close()
+
+        for problem in problems:
+            logger.error(f"FULL SCAN: {problem}")
+        if problems:
+            logger.error("Run scripts/sql/add_todo_alarm_pending_index.sql")
+            return 2
+        logger.info("Pending-alarm queries use indexes")
+        return 0
+
     try:
         logger.info("=" * 60)
         logger.info("TODO Alarm Notification Worker - Starting")
         logger.info("=" * 60)
-        
+
+        global METRICS_TEXTFILE
+        METRICS_TEXTFILE = args.metrics_textfile
+
+        profiler = cProfile.Profile() if args.profile else None
+        if profiler:
+            profiler.enable()
+
         # Zpracuj alarmy
-        processed = process_todo_alarms()
-        
-        # Statistiky
-        pending = get_pending_alarms_count()
-        logger.info(f"Statistics: processed={processed}, pending={pending}")
-        
+        try:
+            if args.daemon:
+                if args.metrics_port:
+                    start_metrics_server(args.metrics_port)
+                processed = run_daemon(batch_size=args.batch_size, refresh_seconds=args.refresh_seconds)
+            else:
+                processed = process_todo_alarms(batch_size=args.batch_size)
+        finally:
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(args.profile)
+                logger.info(f"Profile written to {args.profile}")
+
+        for line in stage_timings.summary():
+            logger.info(line)
+
+        # Statistiky (z inkrementálních metrik, bez dotazů do DB) - left_pending
+        # jsou alarmy, které v posledním běhu tohoto procesu selhaly
+        logger.info(
+            f"Statistics: processed={processed}, left_pending={metrics.pending}, "
+            f"delay p50={metrics.delay_quantile(0.5):.1f}s p95={metrics.delay_quantile(0.95):.1f}s "
+            f"p99={metrics.delay_quantile(0.99):.1f}s"
+        )
+        if METRICS_TEXTFILE:
+            metrics.write_textfile(METRICS_TEXTFILE)
+
         logger.info("=" * 60)
         logger.info("TODO Alarm Notification Worker - Finished")
         logger.info("=" * 60)
-        
+
         return 0
-    
+
     except Exception as e:
         logger.error(f"Fatal error in TODO alarm worker: {e}")
         return 1
@@ -357,7 +1768,7 @@ if __name__ == '__main__':
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
-    
+
     exit(main())
 
 
@@ -371,5 +1782,10 @@ if __name__ == '__main__':
 # Nebo použij systemd timer:
 # /etc/systemd/system/todo-alarm-worker.service
 # /etc/systemd/system/todo-alarm-worker.timer
+
+# Daemon režim (místo cronu) - alarmy se odesílají v řádu sekund:
+# /etc/systemd/system/todo-alarm-worker.service
+[Service]
+ExecStart=/usr/bin/python3 /path/to/todo_alarm_worker.py --daemon
+Restart=always
 """
-```
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+TODO Alarm Worker - Race Test
+=============================
+
+Ověří, že více paralelních instancí workeru nad jednou frontou todo_alarm
+nevytvoří duplicitní notifikace a každý alarm se zpracuje právě jednou.
+
+Výchozí běh: 8 procesů workeru, 100 000 alarmů, lokální SQLite stand-in
+(claim přes lease sloupce). S --backend mysql běží proti TESTOVACÍ MariaDB
+(ALARM_DB_NAME musí obsahovat 'test', tabulky se vyprázdní) a claim
+používá ALARM_CLAIM_MODE (výchozí SKIP LOCKED).
+
+Použití:
+    python3 BACKEND-TODO-ALARM-WORKER-RACE-TEST.py
+    python3 BACKEND-TODO-ALARM-WORKER-RACE-TEST.py --workers 8 --alarms 100000
+    ALARM_DB_NAME=eeo2025_test python3 BACKEND-TODO-ALARM-WORKER-RACE-TEST.py --backend mysql
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+import argparse
+import importlib.util
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+WORKER_PATH = Path(__file__).with_name('BACKEND-TODO-ALARM-WORKER-EXAMPLE.py')
+SEED_CHUNK = 5000
+
+
+def load_worker():
+    """Načte modul workeru (název souboru není platný Python identifikátor)"""
+    spec = importlib.util.spec_from_file_location('todo_alarm_worker', WORKER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+worker = load_worker()
+
+
+def prepare_database(alarm_count: int):
+    """Vyprázdní testovací tabulky a založí alarm_count splatných alarmů (1 alarm = 1 TODO)"""
+    conn = worker.get_db_connection()
+    if worker.DB_BACKEND == 'sqlite':
+        worker.init_sqlite_schema(conn)
+
+    cursor = conn.cursor()
+    for table in ('notification', 'todo_alarm', 'todo'):
+        cursor.execute(f"DELETE FROM {table}")
+
+    base = datetime.now() - timedelta(minutes=5)
+    for start in range(1, alarm_count + 1, SEED_CHUNK):
+        ids = range(start, min(start + SEED_CHUNK, alarm_count + 1))
+        cursor.executemany(
+            "INSERT INTO todo (id, title, note, user_id, order_id, is_active) VALUES (%s, %s, %s, %s, %s, TRUE)",
+            [(i, f"Úkol {i}", None, i % 500 + 1, None) for i in ids]
+        )
+        cursor.executemany(
+            "INSERT INTO todo_alarm (id, todo_id, alarm_datetime, is_completed, notification_sent) VALUES (%s, %s, %s, FALSE, FALSE)",
+            [(i, i, base + timedelta(seconds=i % 600)) for i in ids]
+        )
+
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+
+def run_worker(index: int, batch_size: int, results) -> None:
+    """Jedna instance workeru (samostatný proces s vlastním připojením)"""
+    started = time.perf_counter()
+    try:
+        processed = worker.process_todo_alarms(batch_size=batch_size)
+    except Exception as e:
+        print(f"✗ worker {index}: {e}")
+        processed = 0
+    results.put((index, processed, time.perf_counter() - started))
+
+
+def verify(alarm_count: int) -> list:
+    """
+    Zkontroluje výsledek závodu.
+
+    Returns:
+        Seznam nalezených problémů (prázdný = OK)
+    """
+    conn = worker.get_db_connection()
+    cursor = conn.cursor()
+
+    def scalar(sql):
+        cursor.execute(sql)
+        return cursor.fetchone()[0]
+
+    problems = []
+
+    notifications = scalar("SELECT COUNT(*) FROM notification")
+    if notifications != alarm_count:
+        problems.append(f"notification rows: {notifications}, expected {alarm_count}")
+
+    duplicates = scalar("""
+        SELECT COUNT(*) FROM (
+            SELECT related_id FROM notification GROUP BY related_id HAVING COUNT(*) > 1
+        ) d
+    """)
+    if duplicates:
+        problems.append(f"{duplicates} alarms have duplicate notifications")
+
+    unsent = scalar("SELECT COUNT(*) FROM todo_alarm WHERE notification_sent = FALSE")
+    if unsent:
+        problems.append(f"{unsent} alarms left unsent")
+
+    linked = scalar("""
+        SELECT COUNT(*)
+        FROM todo_alarm ta
+        JOIN notification n ON n.id = ta.last_notification_id AND n.related_id = ta.todo_id
+    """)
+    if linked != alarm_count:
+        problems.append(f"last_notification_id points to the right notification for {linked} of {alarm_count} alarms")
+
+    cursor.close()
+    conn.close()
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Race test paralelních instancí TODO alarm workeru')
+    parser.add_argument('--workers', type=int, default=8, help='Počet procesů workeru (výchozí 8)')
+    parser.add_argument('--alarms', type=int, default=100_000, help='Počet alarmů ve frontě (výchozí 100000)')
+    parser.add_argument('--batch-size', type=int, default=worker.ALARM_BATCH_SIZE, help='Velikost dávky workeru')
+    parser.add_argument('--backend', choices=['sqlite', 'mysql'], default='sqlite', help='DB backend (výchozí sqlite)')
+    args = parser.parse_args()
+
+    worker.DB_BACKEND = args.backend
+    if args.backend == 'sqlite':
+        tmp_dir = tempfile.mkdtemp(prefix='todo-alarm-race-')
+        worker.SQLITE_PATH = os.path.join(tmp_dir, 'race.sqlite3')
+    elif 'test' not in worker.DB_CONFIG['database']:
+        print(f"✗ Refusing to truncate '{worker.DB_CONFIG['database']}' - set ALARM_DB_NAME to a test database")
+        return 2
+
+    print(f"Race test: {args.workers} workers, {args.alarms} alarms, backend={args.backend}, claim={worker.get_claim_mode()}")
+    print("=" * 60)
+
+    prepare_database(args.alarms)
+
+    ctx = multiprocessing.get_context('fork')
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=run_worker, args=(i, args.batch_size, results))
+        for i in range(args.workers)
+    ]
+
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    per_worker = sorted(results.get() for _ in processes)
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    for index, processed, seconds in per_worker:
+        print(f"  worker {index}: {processed} alarms in {seconds:.2f} s")
+
+    total = sum(processed for _, processed, _ in per_worker)
+    print(f"Total: {total} alarms in {elapsed:.2f} s ({total / elapsed:.0f} alarms/s)")
+
+    problems = verify(args.alarms)
+    if args.backend == 'sqlite':
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    print("=" * 60)
+    if problems:
+        for problem in problems:
+            print(f"✗ {problem}")
+        return 1
+
+    print("✓ No duplicate notifications, every alarm processed exactly once")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
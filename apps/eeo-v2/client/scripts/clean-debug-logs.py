@@ -1,35 +1,35 @@
 #!/usr/bin/env python3
 """
 Skript pro opatrné odstranění debug console.log z OrderForm25.js
+
+Spouštět z kořene klienta (apps/eeo-v2/client):
+    python3 scripts/clean-debug-logs.py --dry-run
+    python3 scripts/clean-debug-logs.py 'src/forms/**/*.js'
 """
 
+from pathlib import Path
 import re
+import sys
 
-file_path = 'src/forms/OrderForm25.js'
+# Sdílený rewrite engine (scripts/python/rewrite_engine.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'python'))
+from codemod_runner import run
+from rewrite_engine import RewriteEngine
 
-# Načíst soubor
-with open(file_path, 'r', encoding='utf-8') as f:
-    content = f.read()
+DEFAULT_TARGETS = ['src/forms/OrderForm25.js']
 
 # Odstranit debug console.log s emoji (ale ponechat console.error a důležité logy)
+# Všechna pravidla běží v jednom průchodu; při shodě na stejné pozici vyhrává dřívější
+engine = RewriteEngine()
 # Pattern 1: Víceřádkové console.log s 🔍
-pattern1 = r"^\s*//\s*[🚨�]*\s*DEBUG:.*\n\s*console\.log\('🔍[^']*',\s*\{[^}]*?\}\);\n\n"
-content = re.sub(pattern1, '', content, flags=re.MULTILINE)
+engine.rule('debug-comment', r"^\s*//\s*[🚨�]*\s*DEBUG:.*\n\s*console\.log\('🔍[^']*',\s*\{[^}]*?\}\);\n\n", '', re.MULTILINE)
 
 # Pattern 2: console.log s emojis (bez console.error/warn)
-patterns_to_remove = [
-    r"^\s*console\.log\('🔍[^']*',\s*\{[\s\S]*?\}\);\s*\n",  # Multi-line object
-    r"^\s*console\.log\('✅[^']*\);\s*\n",  # Single line with ✅
-    r"^\s*console\.log\('🚀[^']*\);\s*\n",  # Single line with 🚀
-    r"^\s*console\.log\(`🔍[^`]*`[^\)]*\);\s*\n",  # Template literals
-    r"^\s*console\.log\('--------[^']*'\);\s*\n",  # Debug separators
-]
-
-for pattern in patterns_to_remove:
-    content = re.sub(pattern, '', content, flags=re.MULTILINE)
-
-# Zapsat zpět
-with open(file_path, 'w', encoding='utf-8') as f:
-    f.write(content)
-
-print("✅ Debug logy vyčištěny!")
+engine.rule('object-log', r"^\s*console\.log\('🔍[^']*',\s*\{[\s\S]*?\}\);\s*\n", '', re.MULTILINE)  # Multi-line object
+engine.rule('success-log', r"^\s*console\.log\('✅[^']*\);\s*\n", '', re.MULTILINE)  # Single line with ✅
+engine.rule('rocket-log', r"^\s*console\.log\('🚀[^']*\);\s*\n", '', re.MULTILINE)  # Single line with 🚀
+engine.rule('template-log', r"^\s*console\.log\(`🔍[^`]*`[^\)]*\);\s*\n", '', re.MULTILINE)  # Template literals
+engine.rule('separator-log', r"^\s*console\.log\('--------[^']*'\);\s*\n", '', re.MULTILINE)  # Debug separators
+
+if __name__ == '__main__':
+    sys.exit(run(engine, 'Odstranění debug console.log s emoji', DEFAULT_TARGETS))
@@ -4,94 +4,369 @@ Remove debug console logs from JavaScript files
 Keeps console.error for critical errors
 """
 
+import argparse
+import hashlib
+import json
 import os
 import re
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# Methods stripped by remove_console_logs (console.error is always kept)
+REMOVED_METHODS = ('log', 'warn', 'debug')
+
+# Files recorded as clean by a previous run (path -> sha256/size/mtime); ignored by git
+CACHE_FILE = Path('.cache') / 'remove-debug-logs.json'
+
+# One token per match; strings must close on the same line, so a stray quote in
+# JSX text (e.g. <p>Don't</p>) only falls through to the single-char 'punct' case
+TOKEN_RE = re.compile(r"""
+    \s*(?:
+    (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*")
+  | (?P<template>`)
+  | (?P<ident>[A-Za-z_$][\w$]*)
+  | (?P<number>\d[\w.]*)
+  | (?P<bracket>[()\[\]{}])
+  | (?P<slash>/)
+  | (?P<punct>[^\s\w$'"`()\[\]{}/]+|.)
+    )
+""", re.VERBOSE | re.DOTALL)
+
+TEMPLATE_CHUNK_RE = re.compile(r'(?:[^`\\$]|\\.|\$(?!\{))*(`|\$\{|\Z)', re.DOTALL)
+REGEX_LITERAL_RE = re.compile(r'/(?![*/])(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*')
+CONSOLE_CALL_RE = re.compile(r'\s*\.\s*(log|warn|debug|error)\s*\(')
+
+# Whitespace and comments up to the next code token
+SKIP_TO_CODE_RE = re.compile(r'(?:\s+|//[^\n]*|/\*.*?(?:\*/|\Z))*', re.DOTALL)
+
+# A line starting with one of these continues the previous statement (no ASI before it)
+ASI_HAZARD_CHARS = set('([`/+-')
+
+# After these a '/' starts a regex literal, not a division
+REGEX_KEYWORDS = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw', 'case', 'do', 'else', 'yield', 'await'}
+
+
+def tokenize(content):
+    """Yield (kind, start, end) for every significant JS token in one linear pass
+
+    Strings, template literals (including nested ${...}), regex literals and
+    comments are consumed whole, so their content never looks like code.
+    Whitespace and comments are skipped.
+    """
+    pos = 0
+    length = len(content)
+    braces = []          # '{' or '${' for every open brace - tells where a template resumes
+    regex_allowed = True
+    match_token = TOKEN_RE.match
+
+    while pos < length:
+        m = match_token(content, pos)
+        if m is None:
+            break  # trailing whitespace
+        kind = m.lastgroup
+        start, pos = m.start(kind), m.end()
+
+        if kind == 'comment':
+            continue
+
+        if kind == 'template' or (kind == 'bracket' and content[start] == '}' and braces and braces[-1] == '${'):
+            if kind == 'bracket':
+                braces.pop()
+            chunk = TEMPLATE_CHUNK_RE.match(content, pos)
+            pos = chunk.end()
+            if chunk.group(1) == '${':
+                braces.append('${')
+            yield 'template', start, pos
+            regex_allowed = chunk.group(1) == '${'
+            continue
+
+        if kind == 'slash':
+            literal = REGEX_LITERAL_RE.match(content, start) if regex_allowed else None
+            if literal:
+                pos = literal.end()
+                yield 'regex', start, pos
+                regex_allowed = False
+                continue
+            kind = 'punct'
+        elif kind == 'bracket':
+            char = content[start]
+            if char == '{':
+                braces.append('{')
+            elif char == '}' and braces:
+                braces.pop()
+            regex_allowed = char in '([{};'
+            yield kind, start, pos
+            continue
+
+        if kind == 'ident':
+            regex_allowed = content[start:pos] in REGEX_KEYWORDS
+        else:
+            regex_allowed = kind == 'punct'
+        yield kind, start, pos
+
+
+def find_console_calls(content):
+    """Find console calls; returns (removable spans, counts)
+
+    A span (start, close, stmt_end, semicolon_at) covers a whole
+    `console.log/warn/debug(...)` expression statement (balanced parentheses,
+    optional `;`). Calls that are not standalone statements - `x => console.log(x)`,
+    `if (a) console.log(b)`, `a && console.warn(c)` - can't be removed without
+    changing the code around them and are only counted as skipped.
+
+    semicolon_at is set when the previous statement ends without `;` and the
+    code after the call starts with `(`, `[`, a template literal, `/`, `+` or
+    `-`: removing the call alone would join the two into one expression
+    (`a` + `(c)` -> `a(c)`), so a `;` has to be inserted at that offset.
+    """
+    counts = {method: 0 for method in REMOVED_METHODS}
+    counts.update(error=0, skipped=0)
+    spans = []
+    tokens = tokenize(content)
+    prev_kind, prev_start, prev_end = None, 0, 0
+    removed_until = 0    # end of the last removable statement - its `;` token is not a predecessor
+
+    for kind, start, end in tokens:
+        if start < removed_until:
+            continue
+        call = None
+        if kind == 'ident' and end - start == 7 and content.startswith('console', start) \
+                and not (prev_end and content[prev_end - 1] == '.'):
+            call = CONSOLE_CALL_RE.match(content, end)
+        if not call or call.group(1) == 'error':
+            if call:
+                counts['error'] += 1
+            prev_kind, prev_start, prev_end = kind, start, end
+            continue
+
+        method = call.group(1)
+        prev_text = content[prev_start:prev_end]
+
+        # Consume tokens up to the matching ')'
+        depth = 1
+        close = None
+        for kind, token_start, token_end in tokens:
+            if token_start < call.end() or kind != 'bracket':
+                continue
+            char = content[token_start]
+            if char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+                if depth == 0:
+                    close = token_end
+                    break
+        if close is None:
+            counts['skipped'] += 1
+            break
+
+        line_start = content.rfind('\n', 0, start) + 1
+        at_line_start = not content[line_start:start].strip()
+        stmt_end = close
+        while stmt_end < len(content) and content[stmt_end] in ' \t':
+            stmt_end += 1
+        has_semicolon = content.startswith(';', stmt_end)
+        if has_semicolon:
+            stmt_end += 1
+        follows = content[stmt_end:stmt_end + 1]
+
+        statement_start = (
+            prev_kind is None
+            or (prev_kind == 'bracket' and prev_text in '{}')
+            or (prev_kind == 'punct' and (prev_text.endswith(';') or (prev_text == ':' and at_line_start and has_semicolon)))
+            # ASI: a new line after a finished expression (not after `if (...)` or `else`)
+            or (at_line_start and (prev_kind in ('number', 'string', 'template', 'regex') or prev_text == ']'
+                                   or (prev_kind == 'ident' and prev_text not in REGEX_KEYWORDS)))
+        )
+        statement_end = has_semicolon or follows in ('', '\n', '\r', '}')
+        next_code = content[SKIP_TO_CODE_RE.match(content, stmt_end).end():][:1]
+        if not has_semicolon and next_code in ASI_HAZARD_CHARS:
+            # `console.log(a)` + newline + `(b)` is one expression - not a statement of its own
+            statement_end = False
+        if statement_start and statement_end:
+            counts[method] += 1
+            prev_ends_statement = prev_kind is None or prev_text.endswith(';') or prev_text in ('{', ':')
+            semicolon_at = prev_end if next_code in ASI_HAZARD_CHARS and not prev_ends_statement else None
+            spans.append((start, close, stmt_end, semicolon_at))
+            # The call disappears - the next statement follows the token before it
+            removed_until = stmt_end
+            continue
+        counts['skipped'] += 1
+        prev_kind, prev_start, prev_end = 'punct', stmt_end - 1, stmt_end
+
+    return spans, counts
+
+
 def remove_console_logs(content):
-    """Remove console.log, console.warn, console.debug statements"""
-    
-    # Pattern for console statements (single and multi-line)
-    patterns = [
-        # console.log(...);
-        r'console\.log\([^;]*\);?\s*\n?',
-        # console.warn(...);
-        r'console\.warn\([^;]*\);?\s*\n?',
-        # console.debug(...);
-        r'console\.debug\([^;]*\);?\s*\n?',
-        # Multi-line console.log with nested parentheses
-        r'console\.(log|warn|debug)\s*\([^)]*(?:\([^)]*\)[^)]*)*\);?\s*\n?',
-        # Try-catch with only console inside
-        r'try\s*\{\s*console\.(log|warn|debug)\([^}]*\}\s*catch[^}]*\}\s*\n?',
-    ]
-    
-    for pattern in patterns:
-        content = re.sub(pattern, '', content, flags=re.MULTILINE | re.DOTALL)
-    
-    # Remove lines that are only whitespace after removal
-    lines = content.split('\n')
-    cleaned_lines = []
-    prev_empty = False
-    
-    for line in lines:
-        stripped = line.strip()
-        # Remove excessive empty lines
-        if not stripped:
-            if not prev_empty:
-                cleaned_lines.append(line)
-                prev_empty = True
+    """Remove console.log, console.warn, console.debug statements; returns (content, counts)
+
+    Calls that fill their line(s) are removed with the whole line, including a
+    trailing // comment; a blank line left doubled by the removal is dropped.
+    """
+    spans, counts = find_console_calls(content)
+    if not spans:
+        return content, counts
+
+    out = []
+    # Offsets in kept code where the previous statement needs a `;` (see find_console_calls)
+    semicolons = sorted({span[3] for span in spans if span[3] is not None})
+    next_semicolon = 0
+
+    def emit(chunk_start, chunk_end):
+        nonlocal next_semicolon
+        while next_semicolon < len(semicolons) and semicolons[next_semicolon] <= chunk_end:
+            at = semicolons[next_semicolon]
+            out.append(content[chunk_start:at] + ';')
+            chunk_start = at
+            next_semicolon += 1
+        out.append(content[chunk_start:chunk_end])
+
+    pos = 0
+    for start, _, stmt_end, _ in spans:
+        if start < pos:
+            continue  # nested inside a span that is already removed
+        line_start = content.rfind('\n', 0, start) + 1
+        line_end = content.find('\n', stmt_end)
+        if line_end < 0:
+            line_end = len(content)
+        rest = content[stmt_end:line_end].strip()
+        if line_start >= pos and not content[line_start:start].strip() and (not rest or rest.startswith('//')):
+            emit(pos, line_start)
+            pos = min(line_end + 1, len(content))
+            # Don't leave a blank line doubled or right after an opening brace
+            previous_line = content[content.rfind('\n', 0, line_start - 1) + 1:line_start - 1].strip() if line_start else 'x'
+            next_end = content.find('\n', pos)
+            if (not previous_line or previous_line.endswith('{')) and next_end >= 0 and not content[pos:next_end].strip():
+                pos = next_end + 1
         else:
-            cleaned_lines.append(line)
-            prev_empty = False
-    
-    return '\n'.join(cleaned_lines)
+            keep_to = start
+            while keep_to > pos and content[keep_to - 1] in ' \t':
+                keep_to -= 1
+            emit(pos, keep_to)
+            pos = stmt_end
+    emit(pos, len(content))
+    return ''.join(out), counts
+
+def script_version():
+    """Hash of this script - changed rules invalidate the whole cache"""
+    return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+
+def file_entry(file_path, digest):
+    stat = os.stat(file_path)
+    return {'sha256': digest, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def load_cache(cache_path, version):
+    """Cached clean files for this script version ({} when missing, corrupt or outdated)"""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data.get('files', {}) if data.get('version') == version else {}
+
+def save_cache(cache_path, version, files):
+    """Write the cache atomically (temp file + rename)"""
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(cache_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': version, 'files': files}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, cache_path)
+
+def check_cache(file_path, entry):
+    """Return the (refreshed) entry when the file is still clean, else None
+
+    Unchanged size + mtime skips the file without reading it; a touched file
+    is hashed and skipped if its content is the same as at the last clean run.
+    """
+    if not entry:
+        return None
+    stat = os.stat(file_path)
+    if stat.st_size == entry['size'] and stat.st_mtime_ns == entry['mtime_ns']:
+        return entry
+    if stat.st_size != entry['size']:
+        return None
+    digest = hashlib.sha256(Path(file_path).read_bytes()).hexdigest()
+    return file_entry(file_path, digest) if digest == entry['sha256'] else None
 
 def process_file(file_path):
-    """Process a single JavaScript file"""
-    print(f"📝 Processing: {file_path}")
+    """Process a single JavaScript file; returns a result dict (runs in worker processes)"""
+    result = {'path': str(file_path), 'changed': False, 'lines_saved': 0, 'error': None, 'cache': None,
+              'counts': {method: 0 for method in (*REMOVED_METHODS, 'error', 'skipped')}}
     
     try:
-        # Read file
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        # Read raw bytes once - the cache hashes exactly what is on disk (CRLF, BOM
+        # included), the same bytes check_cache() hashes on the next run
+        raw = Path(file_path).read_bytes()
+        content = raw.decode('utf-8')
         
-        original_lines = len(content.split('\n'))
+        # Remove console logs (one tokenizer pass also counts them)
+        cleaned, counts = remove_console_logs(content)
+        result['counts'] = counts
         
-        # Count console statements before
-        log_count = len(re.findall(r'console\.log\(', content))
-        warn_count = len(re.findall(r'console\.warn\(', content))
-        debug_count = len(re.findall(r'console\.debug\(', content))
-        error_count = len(re.findall(r'console\.error\(', content))
-        
-        if log_count + warn_count + debug_count == 0:
-            print(f"   ✓ No debug logs found")
-            return
+        if cleaned == content:
+            result['cache'] = file_entry(file_path, hashlib.sha256(raw).hexdigest())
+            return result
         
         # Create backup
         backup_path = f"{file_path}.bak"
-        with open(backup_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        
-        # Remove console logs
-        cleaned = remove_console_logs(content)
+        with open(backup_path, 'wb') as f:
+            f.write(raw)
         
-        # Write cleaned content
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(cleaned)
+        # Write cleaned content (line endings kept as they were)
+        data = cleaned.encode('utf-8')
+        with open(file_path, 'wb') as f:
+            f.write(data)
         
-        final_lines = len(cleaned.split('\n'))
-        removed = original_lines - final_lines
-        
-        print(f"   ✓ Removed: {log_count} logs, {warn_count} warns, {debug_count} debugs")
-        print(f"   ✓ Kept: {error_count} errors")
-        print(f"   ✓ Lines reduced: {removed}")
+        result['changed'] = True
+        result['lines_saved'] = content.count('\n') - cleaned.count('\n')
+        result['cache'] = file_entry(file_path, hashlib.sha256(data).hexdigest())
         
     except Exception as e:
-        print(f"   ❌ Error: {str(e)}")
+        result['error'] = str(e)
+    
+    return result
+
+def print_result(result):
+    """Print the report for one file (always from the parent process, in stable order)"""
+    counts = result['counts']
+    print(f"📝 Processing: {result['path']}")
+    if result['error']:
+        print(f"   ❌ Error: {result['error']}")
+        return
+    if not result['changed']:
+        print(f"   ✓ No debug logs found")
+    else:
+        print(f"   ✓ Removed: {counts['log']} logs, {counts['warn']} warns, {counts['debug']} debugs")
+        print(f"   ✓ Kept: {counts['error']} errors")
+    if counts['skipped']:
+        print(f"   ⚠️  Skipped: {counts['skipped']} calls that are not standalone statements")
+    if result['changed']:
+        print(f"   ✓ Lines reduced: {result['lines_saved']}")
+
+def run_files(js_files, jobs):
+    """Process files, in a process pool when jobs > 1; results come back in js_files order"""
+    if jobs <= 1:
+        return [process_file(file_path) for file_path in js_files]
+    
+    # Largest files first, so a big file (OrderForm25.js) doesn't end up as the last straggler
+    by_size = sorted(js_files, key=lambda f: f.stat().st_size, reverse=True)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = dict(zip(by_size, executor.map(process_file, by_size)))
+    return [results[file_path] for file_path in js_files]
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description='Remove console.log/warn/debug from src/**/*.js')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Number of worker processes (0 = one per CPU, default 1)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Process every file, ignoring {CACHE_FILE}')
+    args = parser.parse_args()
+    jobs = args.jobs or os.cpu_count() or 1
+    
     src_path = Path('src')
     
     if not src_path.exists():
@@ -101,26 +376,55 @@ def main():
     print("🧹 Removing debug console logs from project...")
     print("")
     
-    # Find all .js files
-    js_files = list(src_path.rglob('*.js'))
+    # Find all .js files (sorted - output order doesn't depend on the filesystem or on --jobs)
+    js_files = sorted(src_path.rglob('*.js'))
     
     # Filter out test files
     js_files = [f for f in js_files if not (f.name.endswith('.test.js') or f.name.endswith('.spec.js'))]
     
-    print(f"Found {len(js_files)} JavaScript files to process")
+    started = time.perf_counter()
+    version = script_version()
+    cache = {} if args.no_cache else load_cache(CACHE_FILE, version)
+    clean_files = {}
+    pending = []
+    for file_path in js_files:
+        entry = check_cache(file_path, cache.get(str(file_path)))
+        if entry:
+            clean_files[str(file_path)] = entry
+        else:
+            pending.append(file_path)
+    
+    print(f"Found {len(js_files)} JavaScript files, {len(pending)} to process" + (f" ({jobs} jobs)" if jobs > 1 else ""))
+    if clean_files:
+        print(f"⏭️  Skipped {len(clean_files)} unchanged clean files (cache: {CACHE_FILE})")
     print("")
     
-    processed = 0
-    for file_path in js_files:
-        process_file(file_path)
-        processed += 1
+    results = run_files(pending, jobs)
+    for result in results:
+        if result['cache']:
+            clean_files[result['path']] = result['cache']
+    save_cache(CACHE_FILE, version, clean_files)
+    elapsed = time.perf_counter() - started
+    
+    totals = {method: 0 for method in (*REMOVED_METHODS, 'error', 'skipped')}
+    for result in results:
+        print_result(result)
+        for key, value in result['counts'].items():
+            totals[key] += value
+    
+    changed = sum(1 for result in results if result['changed'])
+    failed = sum(1 for result in results if result['error'])
+    lines_saved = sum(result['lines_saved'] for result in results)
     
     print("")
-    print(f"✅ Processed {processed} files!")
+    print(f"✅ Processed {len(results)} files in {elapsed:.1f}s! ({changed} changed, {failed} errors)")
+    print(f"   Removed: {totals['log']} logs, {totals['warn']} warns, {totals['debug']} debugs; "
+          f"kept {totals['error']} errors; skipped {totals['skipped']}; lines reduced: {lines_saved}")
     print("")
-    print("ℹ️  Backups created with .bak extension")
-    print("ℹ️  Review changes and remove backups when satisfied:")
-    print("   find src -name '*.bak' -delete")
+    if changed:
+        print("ℹ️  Backups created with .bak extension")
+        print("ℹ️  Review changes and remove backups when satisfied:")
+        print("   find src -name '*.bak' -delete")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,236 @@
+"""
+Command-line runner for codemods built on rewrite_engine.RewriteEngine
+
+    python3 scripts/python/fix_response_checks.py [--dry-run] [TARGET ...]
+
+TARGET is a file, a directory (all *.js / *.jsx under it) or a glob pattern
+(`src/**/*.js`). Without targets the script's default files are used.
+
+  - --dry-run writes nothing; a unified diff goes to stdout (can be applied
+    with `patch -p0`), per-rule match counts go to stderr
+  - write mode replaces each changed file atomically (temp file in the same
+    directory + rename), so an interrupted run never leaves a half-written file
+  - the diff is built directly from the match spans, hunk by hunk, so memory
+    and time stay proportional to the changes, not to the file size
+  - exit code 1 when nothing matched at all
+"""
+
+from pathlib import Path
+import argparse
+import glob
+import os
+import shutil
+import sys
+import tempfile
+
+from rewrite_engine import format_counts, splice
+
+DIRECTORY_SUFFIXES = ('.js', '.jsx')
+
+
+def expand_targets(targets):
+    """Files for the given paths / directories / globs, sorted and without duplicates"""
+    files = set()
+    for target in targets:
+        path = Path(target)
+        if path.is_dir():
+            files.update(f for f in path.rglob('*') if f.suffix in DIRECTORY_SUFFIXES and f.is_file())
+        elif path.is_file():
+            files.add(path)
+        else:
+            files.update(Path(f) for f in glob.glob(target, recursive=True) if os.path.isfile(f))
+    return sorted(files)
+
+
+def read_text(path):
+    # newline='' keeps \r\n as is - the file is rewritten byte for byte outside the edits
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return f.read()
+
+
+def atomic_write(path, content):
+    """Write via a temp file in the same directory + os.replace (keeps file permissions)"""
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(prefix=f'.{path.name}.', suffix='.tmp', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _diff_lines(text, at_eof=False):
+    """Lines of a region for diff output
+
+    Only a region that ends at the end of the file may lack a final newline;
+    it gets the usual marker.
+    """
+    lines = text.splitlines(keepends=True)
+    if at_eof and lines and not lines[-1].endswith('\n'):
+        lines[-1] += '\n\\ No newline at end of file\n'
+    return lines
+
+
+def _change_blocks(content, edits):
+    """Merge edits into blocks of whole old lines: [(line_start, line_end, new_text)]"""
+    blocks = []
+    for start, end, replacement, _ in edits:
+        line_start = content.rfind('\n', 0, start) + 1
+        if end > line_start and content[end - 1] == '\n':
+            line_end = end
+        else:
+            line_end = content.find('\n', end)
+            line_end = len(content) if line_end < 0 else line_end + 1
+        if blocks and line_start < blocks[-1][1]:
+            block_start, block_end, pieces, cursor = blocks[-1]
+            pieces += [content[cursor:start], replacement]
+            blocks[-1] = [block_start, max(block_end, line_end), pieces, end]
+        else:
+            blocks.append([line_start, line_end, [content[line_start:start], replacement], end])
+    blocks = [(s, e, ''.join(pieces) + content[cursor:e]) for s, e, pieces, cursor in blocks]
+
+    # A replacement that joins lines (`,\n` -> `, `) leaves new text without a
+    # final newline; extend the block through the following old lines (and
+    # blocks) until it ends with one or reaches the end of the file
+    merged = []
+    i = 0
+    while i < len(blocks):
+        s, e, text = blocks[i]
+        i += 1
+        while text and not text.endswith('\n') and e < len(content):
+            if i < len(blocks) and blocks[i][0] == e:
+                e, text = blocks[i][1], text + blocks[i][2]
+                i += 1
+            else:
+                next_end = content.find('\n', e)
+                next_end = len(content) if next_end < 0 else next_end + 1
+                e, text = next_end, text + content[e:next_end]
+        merged.append((s, e, text))
+    return merged
+
+
+def _context_start(content, pos, lines, limit):
+    """Start of the line `lines` lines before pos (not before limit)"""
+    for _ in range(lines):
+        if pos <= limit:
+            break
+        pos = content.rfind('\n', limit, pos - 1) + 1 or limit
+    return max(pos, limit)
+
+
+def _context_end(content, pos, lines):
+    for _ in range(lines):
+        if pos >= len(content):
+            break
+        nl = content.find('\n', pos)
+        pos = len(content) if nl < 0 else nl + 1
+    return pos
+
+
+def iter_unified_diff(path, content, edits, context=3):
+    """Yield unified diff lines for content with edits applied, hunk by hunk
+
+    Only the changed regions plus context are materialized; line numbers are
+    counted incrementally, so a 26k-line file with a few edits costs about
+    as much as the edits themselves.
+    """
+    blocks = _change_blocks(content, edits)
+    if not blocks:
+        return
+    yield f'--- {path}\n'
+    yield f'+++ {path}\n'
+
+    # Group blocks whose gap is at most 2 * context lines into one hunk
+    hunks = [[blocks[0]]]
+    for block in blocks[1:]:
+        if block[0] <= _context_end(content, hunks[-1][-1][1], 2 * context):
+            hunks[-1].append(block)
+        else:
+            hunks.append([block])
+
+    line_no = 1        # old line number at `counted`
+    counted = 0
+    delta = 0          # new line numbers - old line numbers so far
+    previous_end = 0
+    for hunk in hunks:
+        hunk_start = _context_start(content, hunk[0][0], context, previous_end)
+        hunk_end = _context_end(content, hunk[-1][1], context)
+        line_no += content.count('\n', counted, hunk_start)
+        counted = hunk_start
+
+        body = []
+        old_len = new_len = 0
+        pos = hunk_start
+        for block_start, block_end, new_text in hunk:
+            for line in _diff_lines(content[pos:block_start]):
+                body.append(' ' + line)
+                old_len += 1
+                new_len += 1
+            at_eof = block_end == len(content)
+            for line in _diff_lines(content[block_start:block_end], at_eof):
+                body.append('-' + line)
+                old_len += 1
+            for line in _diff_lines(new_text, at_eof):
+                body.append('+' + line)
+                new_len += 1
+            pos = block_end
+        for line in _diff_lines(content[pos:hunk_end], hunk_end == len(content)):
+            body.append(' ' + line)
+            old_len += 1
+            new_len += 1
+
+        old_start = line_no if old_len else line_no - 1
+        new_start = line_no + delta if new_len else line_no + delta - 1
+        yield f'@@ -{old_start},{old_len} +{new_start},{new_len} @@\n'
+        yield from body
+        delta += new_len - old_len
+        previous_end = hunk_end
+
+
+def run(engine, description, default_targets=(), argv=None):
+    """Parse arguments and run the engine over the targets; returns the exit code"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('targets', nargs='*',
+                        help=f"Files, directories or globs (default: {' '.join(map(str, default_targets)) or '-'})")
+    parser.add_argument('--dry-run', action='store_true', help='Write nothing, print a unified diff')
+    parser.add_argument('--context', type=int, default=3, help='Diff context lines (default 3)')
+    args = parser.parse_args(argv)
+
+    files = expand_targets(args.targets or default_targets)
+    if not files:
+        print("❌ No files match the given targets", file=sys.stderr)
+        return 2
+
+    totals = engine.count([])
+    changed = 0
+    for path in files:
+        content = read_text(path)
+        edits = engine.edits(content)
+        for name, count in engine.count(edits).items():
+            totals[name] += count
+        # A match whose replacement is the same text is counted but changes nothing
+        edits = [edit for edit in edits if content[edit[0]:edit[1]] != edit[2]]
+        if not edits:
+            continue
+        changed += 1
+        if args.dry_run:
+            sys.stdout.writelines(iter_unified_diff(path, content, edits, args.context))
+        else:
+            atomic_write(path, splice(content, edits))
+        print(f"📝 {path}: {len(edits)} matches", file=sys.stderr)
+
+    print(format_counts(totals), file=sys.stderr)
+    unused = [name for name, count in totals.items() if not count]
+    if unused:
+        print(f"⚠️  Rules without a match: {', '.join(unused)}", file=sys.stderr)
+    if not changed:
+        print(f"⚠️  No matches in {len(files)} files - nothing to change", file=sys.stderr)
+        return 1
+    action = 'would change' if args.dry_run else 'changed'
+    print(f"✅ {changed} of {len(files)} files {action}", file=sys.stderr)
+    return 0
@@ -1,40 +1,50 @@
 #!/usr/bin/env python3
-import re
+"""
+Nahradí ruční kontroly response.data?.status za checkResponse()
+
+Spouštět z kořene klienta (apps/eeo-v2/client):
+    python3 scripts/python/fix_response_checks.py --dry-run
+    python3 scripts/python/fix_response_checks.py 'src/services/*.js'
+"""
 
-# Načteme soubor
-with open('/home/holovsky/dokumenty/Jazyky/react/wObj/r-app-zzs-eeo-25/src/services/apiv2Dictionaries.js', 'r') as f:
-    content = f.read()
+import re
+import sys
 
-# Pattern pro náhradu response kontrol
-patterns = [
-    # Základní pattern s Array.isArray
-    (
-        r'if \(response\.data\?\.status === \'ok\' && Array\.isArray\(response\.data\?\.data\)\) \{\s*return response\.data\.data;\s*\}\s*throw new Error\(\'Invalid response format\'\);',
-        'const data = checkResponse(response, operation);\n    return Array.isArray(data.data) ? data.data : [];'
-    ),
-    # Pattern bez Array.isArray
-    (
-        r'if \(response\.data\?\.status === \'ok\' && response\.data\?\.data\) \{\s*return response\.data\.data;\s*\}\s*throw new Error\(\'Invalid response format\'\);',
-        'const data = checkResponse(response, operation);\n    return data.data || null;'
-    ),
-    # Pattern pouze s status ok
-    (
-        r'if \(response\.data\?\.status === \'ok\'\) \{\s*return response\.data\.data;\s*\}\s*throw new Error\(\'Invalid response format\'\);',
-        'const data = checkResponse(response, operation);\n    return data.data || null;'
-    ),
-    # Pattern returning whole response.data
-    (
-        r'if \(response\.data\?\.status === \'ok\'\) \{\s*return response\.data;\s*\}\s*throw new Error\(\'Invalid response format\'\);',
-        'const data = checkResponse(response, operation);\n    return data;'
-    )
-]
+from codemod_runner import run
+from rewrite_engine import RewriteEngine
 
-# Aplikujeme náhrady
-for pattern, replacement in patterns:
-    content = re.sub(pattern, replacement, content, flags=re.MULTILINE | re.DOTALL)
+DEFAULT_TARGETS = ['src/services/apiv2Dictionaries.js']
 
-# Uložíme zpět
-with open('/home/holovsky/dokumenty/Jazyky/react/wObj/r-app-zzs-eeo-25/src/services/apiv2Dictionaries.js', 'w') as f:
-    f.write(content)
+# Pravidla pro náhradu response kontrol (při shodě na stejné pozici vyhrává dřívější)
+engine = RewriteEngine()
+# Základní pattern s Array.isArray
+engine.rule(
+    'array-data',
+    r'if \(response\.data\?\.status === \'ok\' && Array\.isArray\(response\.data\?\.data\)\) \{\s*return response\.data\.data;\s*\}\s*throw new Error\(\'Invalid response format\'\);',
+    'const data = checkResponse(response, operation);\n    return Array.isArray(data.data) ? data.data : [];',
+    re.MULTILINE | re.DOTALL
+)
+# Pattern bez Array.isArray
+engine.rule(
+    'data',
+    r'if \(response\.data\?\.status === \'ok\' && response\.data\?\.data\) \{\s*return response\.data\.data;\s*\}\s*throw new Error\(\'Invalid response format\'\);',
+    'const data = checkResponse(response, operation);\n    return data.data || null;',
+    re.MULTILINE | re.DOTALL
+)
+# Pattern pouze s status ok
+engine.rule(
+    'status-ok-data',
+    r'if \(response\.data\?\.status === \'ok\'\) \{\s*return response\.data\.data;\s*\}\s*throw new Error\(\'Invalid response format\'\);',
+    'const data = checkResponse(response, operation);\n    return data.data || null;',
+    re.MULTILINE | re.DOTALL
+)
+# Pattern returning whole response.data
+engine.rule(
+    'status-ok-response',
+    r'if \(response\.data\?\.status === \'ok\'\) \{\s*return response\.data;\s*\}\s*throw new Error\(\'Invalid response format\'\);',
+    'const data = checkResponse(response, operation);\n    return data;',
+    re.MULTILINE | re.DOTALL
+)
 
-print("✅ Dokončeno: Nahrazeny response kontroly za checkResponse() funkci")
\ No newline at end of file
+if __name__ == '__main__':
+    sys.exit(run(engine, 'Nahrazení response kontrol za checkResponse()', DEFAULT_TARGETS))
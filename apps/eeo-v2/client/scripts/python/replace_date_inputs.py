@@ -1,13 +1,18 @@
 #!/usr/bin/env python3
 """
 Script to replace all date inputs with DatePicker component in OrderForm25.js
+
+Run from the client root (apps/eeo-v2/client):
+    python3 scripts/python/replace_date_inputs.py --dry-run
 """
 
 import re
+import sys
+
+from codemod_runner import run
+from rewrite_engine import RewriteEngine
 
-# Read the file
-with open('src/forms/OrderForm25.js', 'r', encoding='utf-8') as f:
-    content = f.read()
+DEFAULT_TARGETS = ['src/forms/OrderForm25.js']
 
 # Pattern to match date input blocks
 # Matches: InputWithIcon with Calendar icon and Input type="date"
@@ -27,11 +32,8 @@ def replace_date_input(match):
                             placeholder="Vyberte datum"
                           />'''
 
-# Apply replacements
-new_content = re.sub(pattern, replace_date_input, content, flags=re.DOTALL)
-
-# Write back
-with open('src/forms/OrderForm25.js', 'w', encoding='utf-8') as f:
-    f.write(new_content)
+engine = RewriteEngine()
+engine.rule('date-input', pattern, replace_date_input, re.DOTALL)
 
-print("✅ Date inputs replaced successfully!")
+if __name__ == '__main__':
+    sys.exit(run(engine, 'Replace date inputs with DatePicker', DEFAULT_TARGETS))
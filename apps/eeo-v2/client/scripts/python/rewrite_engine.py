@@ -0,0 +1,139 @@
+"""
+Single-pass multi-pattern rewrite engine shared by the client codemod scripts
+
+Rules register a regex pattern and a replacement (a template string with
+\\1 / \\g<name> references, or a callable taking the match). All rules are
+combined into one alternation and the file is scanned once:
+
+  - matches never overlap - the scan goes left to right and continues after
+    the end of each match
+  - when several rules match at the same position, the rule registered
+    first wins (same priority as applying the rules one after another)
+  - each rule keeps its own flags (re.M / re.S / re.I) and group numbering
+  - unlike sequential re.sub calls, a rule never sees the output of
+    another rule
+
+Usage:
+    engine = RewriteEngine()
+    engine.rule('status-ok', r"if \\(response\\.data\\?\\.status === 'ok'\\) \\{", 'if (ok) {')
+    new_content, counts = engine.apply(content)
+"""
+
+import re
+
+# Flags that can be scoped to one alternative of the combined pattern
+SCOPED_FLAGS = ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's'), (re.VERBOSE, 'x'))
+
+# Backreferences inside a pattern would point at the wrong group once combined
+PATTERN_BACKREF_RE = re.compile(r'\\[1-9]|\(\?P=')
+
+
+class Rule:
+    """One pattern -> replacement rule"""
+
+    def __init__(self, name, pattern, replacement, flags=0):
+        self.name = name
+        self.pattern = pattern
+        self.replacement = replacement
+        self.flags = flags
+        self.regex = re.compile(pattern, flags)
+
+    def scoped_pattern(self):
+        """The pattern with its flags inlined, e.g. (?ms:...)"""
+        letters = ''.join(letter for flag, letter in SCOPED_FLAGS if self.flags & flag)
+        return f'(?{letters}:{self.pattern})' if letters else f'(?:{self.pattern})'
+
+    def replace(self, match):
+        if callable(self.replacement):
+            return self.replacement(match)
+        return match.expand(self.replacement)
+
+
+class RewriteEngine:
+    """Rule set applied to a file in one combined scan"""
+
+    def __init__(self, rules=()):
+        self.rules = []
+        self._combined = None
+        for rule in rules:
+            self.add(rule)
+
+    def add(self, rule):
+        if any(existing.name == rule.name for existing in self.rules):
+            raise ValueError(f"Duplicate rule name: {rule.name}")
+        if PATTERN_BACKREF_RE.search(rule.pattern):
+            raise ValueError(f"Rule {rule.name}: backreferences inside the pattern are not supported")
+        self.rules.append(rule)
+        self._combined = None
+        return rule
+
+    def rule(self, name, pattern, replacement, flags=0):
+        """Register a rule (rules registered earlier win ties)"""
+        return self.add(Rule(name, pattern, replacement, flags))
+
+    @property
+    def combined(self):
+        if self._combined is None:
+            try:
+                self._combined = re.compile('|'.join(
+                    f'(?P<_r{i}>{rule.scoped_pattern()})' for i, rule in enumerate(self.rules)
+                ))
+            except re.error as e:
+                # e.g. two rules defining the same (?P<name>...) group
+                raise ValueError(f"Rules can't be combined: {e}") from e
+        return self._combined
+
+    def iter_matches(self, content):
+        """Yield (rule, match) for every non-overlapping match, left to right
+
+        match is the rule's own match object, so its groups and replacement
+        references work exactly as with rule.regex alone.
+        """
+        rules = self.rules
+        for combined_match in self.combined.finditer(content):
+            rule = rules[int(combined_match.lastgroup[2:])]
+            # Re-match the winning rule alone at the same position (cheap - only on hits);
+            # lookbehind and ^ still see the text before pos
+            match = rule.regex.match(content, combined_match.start())
+            yield rule, match
+
+    def edits(self, content):
+        """Non-overlapping edits [(start, end, replacement, rule name)], left to right"""
+        return [
+            (match.start(), match.end(), rule.replace(match), rule.name)
+            for rule, match in self.iter_matches(content)
+        ]
+
+    def count(self, edits):
+        """{rule name: hit count} for a list of edits (every rule listed, also with 0)"""
+        counts = {rule.name: 0 for rule in self.rules}
+        for *_, name in edits:
+            counts[name] += 1
+        return counts
+
+    def apply(self, content):
+        """Rewrite content; returns (new_content, {rule name: hit count})"""
+        if not self.rules:
+            return content, {}
+        edits = self.edits(content)
+        return splice(content, edits), self.count(edits)
+
+
+def splice(content, edits):
+    """Apply sorted non-overlapping edits in one pass into a single output buffer"""
+    if not edits:
+        return content
+    out = []
+    pos = 0
+    for start, end, replacement, _ in edits:
+        out.append(content[pos:start])
+        out.append(replacement)
+        pos = end
+    out.append(content[pos:])
+    return ''.join(out)
+
+
+def format_counts(counts):
+    """Per-rule hit counts as aligned lines for script output"""
+    width = max((len(name) for name in counts), default=0)
+    return '\n'.join(f"   {name:<{width}}  {count:>5}" for name, count in counts.items())
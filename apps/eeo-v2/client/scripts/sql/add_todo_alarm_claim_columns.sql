@@ -0,0 +1,20 @@
+-- ============================================================================
+-- TODO ALARM WORKER - Claim sloupce pro běh více instancí workeru
+-- ============================================================================
+--
+-- Umožňuje spustit více instancí TODO alarm workeru současně (více procesů
+-- nebo serverů), aniž by vznikaly duplicitní notifikace.
+--
+-- Worker claimuje dávky alarmů dvěma způsoby (ALARM_CLAIM_MODE):
+-- - 'skip_locked' - SELECT ... FOR UPDATE SKIP LOCKED (MariaDB 10.6+ / MySQL 8),
+--                   nepotřebuje žádné nové sloupce
+-- - 'lease'       - zapíše claimed_by/claimed_at; lease vyprší po
+--                   ALARM_LEASE_SECONDS (spadlý worker) - vyžaduje tento skript
+--
+-- Viz: apps/eeo-v2/client/docs/BACKEND-TODO-ALARM-WORKER-EXAMPLE.py
+-- ============================================================================
+
+ALTER TABLE todo_alarm
+  ADD COLUMN claimed_by VARCHAR(64) NULL COMMENT 'Claim token workeru (host:pid:sekvence)',
+  ADD COLUMN claimed_at DATETIME NULL COMMENT 'Čas claimu - lease vyprší po ALARM_LEASE_SECONDS',
+  ADD INDEX idx_todo_alarm_claimed_by (claimed_by);
@@ -0,0 +1,27 @@
+-- ============================================================================
+-- TODO ALARM WORKER - Covering index pro dotazy čekajících alarmů
+-- ============================================================================
+--
+-- Index odpovídá predikátům get_pending_alarms() a get_pending_alarms_count()
+-- v apps/eeo-v2/client/docs/BACKEND-TODO-ALARM-WORKER-EXAMPLE.py:
+--
+--   WHERE ta.notification_sent = FALSE     -- rovnost
+--     AND ta.is_completed = FALSE          -- rovnost
+--     AND ta.alarm_datetime <= ?           -- rozsah + ORDER BY
+--   JOIN todo t ON ta.todo_id = t.id       -- todo_id v indexu = bez čtení řádku
+--
+-- InnoDB sekundární index obsahuje i PRIMARY KEY (id), takže oba dotazy
+-- čtou z todo_alarm jen index (range scan přes čekající alarmy), bez ohledu
+-- na to, kolik milionů odeslaných alarmů je v historii. Tabulka todo se
+-- dohledává přes PRIMARY KEY (eq_ref).
+--
+-- Ověření:  python3 BACKEND-TODO-ALARM-WORKER-EXAMPLE.py --explain
+--           (exit 2 = některý dotaz padá na full scan)
+-- ============================================================================
+
+ALTER TABLE todo_alarm
+  ADD INDEX idx_todo_alarm_pending (notification_sent, is_completed, alarm_datetime, todo_id);
+
+-- Původní idx_notification_sent (notification_sent, alarm_datetime) je tímto
+-- indexem pro worker nahrazen. Po ověření přes --explain ho lze odstranit:
+-- ALTER TABLE todo_alarm DROP INDEX idx_notification_sent;
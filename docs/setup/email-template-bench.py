@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark hromadného vykreslení notifikačních e-mailů
+
+Simuluje změnu stavu objednávek, která se rozešle N příjemcům (schvalovatelé
+normal/urgent + autoři), nad šablonami z update-email-templates.py
+(APPROVER_NORMAL a odvozené varianty). Porovnává:
+  - naive:    pro každého příjemce vyhledání sekce ve spojeném email_body
+              (jako get_email_template_by_recipient v PHP) + str.replace
+              pro každý placeholder
+  - compiled: EmailRenderCache z email-template-render.py - tělo se rozloží
+              jednou, příjemci se jen skládají z předem rozdělených segmentů
+
+Obě varianty běží nad původním i minifikovaným tělem. Vypisuje propustnost
+(e-maily/s), špičku alokované paměti během vykreslení (tracemalloc), paměť
+držených výsledků a přechodné alokace (špička - držené výsledky). Běží
+offline - data příjemců se generují deterministicky (--seed), volitelně lze
+předat vlastní fixture spojeného email_body přes --body.
+
+Použití:
+    python3 email-template-bench.py
+    python3 email-template-bench.py --recipients 2000 --repeat 5 --json email-bench.json
+    python3 email-template-bench.py --body email_body.html
+"""
+
+from pathlib import Path
+import argparse
+import importlib.util
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+SETUP_DIR = Path(__file__).resolve().parent
+TEMPLATE_TYPE = 'order_status_ke_schvaleni'
+RECIPIENT_MARKERS = ('APPROVER_NORMAL', 'APPROVER_URGENT', 'SUBMITTER')
+
+FIRST_NAMES = ('Jan', 'Petr', 'Eva', 'Jana', 'Martin', 'Lucie', 'Tomáš', 'Kateřina', 'Pavel', 'Veronika')
+LAST_NAMES = ('Novák', 'Svobodová', 'Dvořák', 'Černá', 'Procházka', 'Kučerová', 'Veselý', 'Horáková')
+SUBJECTS = (
+    'Nákup zdravotnického materiálu', 'Servis sanitních vozidel', 'Licence kancelářského softwaru',
+    'Oprava klimatizace výjezdové základny', 'Pohonné hmoty - čtvrtletní dodávka', 'Školení řidičů',
+)
+CENTRES = ('101 - Ředitelství', '210 - ZZS Kladno', '220 - ZZS Beroun', '230 - ZZS Mělník', '310 - Operační středisko')
+FUNDING = ('Rozpočet organizace', 'Dotace MZ', 'Investiční fond', 'Provozní prostředky')
+
+
+def load_module(name, filename):
+    """Načte skript z docs/setup (název souboru není platný Python identifikátor)"""
+    spec = importlib.util.spec_from_file_location(name, SETUP_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+templates = load_module('update_email_templates', 'update-email-templates.py')
+render = load_module('email_template_render', 'email-template-render.py')
+
+
+def make_recipients(count, seed):
+    """[(RECIPIENT, placeholders), ...] - na objednávku autor + 1-3 schvalovatelé, ~20 % urgentních"""
+    rng = random.Random(seed)
+    recipients = []
+    order_id = 0
+    while len(recipients) < count:
+        order_id += 1
+        order = {
+            'order_id': str(order_id),
+            'order_number': f"O-{order_id:04d}/2025",
+            'predmet': rng.choice(SUBJECTS),
+            'strediska': ', '.join(rng.sample(CENTRES, rng.randint(1, 3))),
+            'financovani': rng.choice(FUNDING),
+            'financovani_poznamka': rng.choice(('', 'Nutné schválit do konce měsíce', 'Čerpání z rezervy')),
+            'amount': f"{rng.randint(1_000, 2_000_000):,} Kč".replace(',', ' '),
+            'date': f"{rng.randint(1, 28)}.{rng.randint(1, 12)}.2025",
+            'user_name': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        }
+        urgent = rng.random() < 0.2
+        recipients.append(('SUBMITTER', order))
+        for _ in range(rng.randint(1, 3)):
+            approver = dict(order, approver_name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}")
+            recipients.append(('APPROVER_URGENT' if urgent else 'APPROVER_NORMAL', approver))
+    return recipients[:count]
+
+
+def extract_section(email_body, recipient):
+    """Sekce příjemce stejným postupem jako get_email_template_by_recipient (PHP)"""
+    marker = f"<!-- RECIPIENT: {recipient} -->"
+    pos = email_body.find(marker)
+    if pos < 0:
+        return email_body
+    after = email_body[pos + len(marker):]
+    ends = [after.find(f"<!-- RECIPIENT: {other} -->") for other in RECIPIENT_MARKERS if other != recipient]
+    ends = [end for end in ends if end >= 0]
+    return (after[:min(ends)] if ends else after).strip(templates.PHP_TRIM_CHARS)
+
+
+def render_naive(email_body, recipients):
+    out = []
+    for recipient, placeholders in recipients:
+        html = extract_section(email_body, recipient)
+        for key, value in placeholders.items():
+            html = html.replace('{' + key + '}', value)
+        out.append(html)
+    return out
+
+
+def render_compiled(email_body, recipients):
+    # Nová cache na každé měření - první příjemce platí rozložení těla
+    return render.EmailRenderCache().render_many(TEMPLATE_TYPE, email_body, recipients)
+
+
+def best_of(repeat, fn):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def measure_memory(fn):
+    """(špička alokací během běhu, paměť držených výsledků) v bajtech"""
+    tracemalloc.start()
+    try:
+        result = fn()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak, current
+
+
+def check_equivalence(label, email_body, recipients):
+    """Ověří, že obě varianty vykreslí stejné e-maily (jinak se výsledky neporovnávají)"""
+    expected = render_naive(email_body, recipients)
+    actual = render_compiled(email_body, recipients)
+    mismatches = [i for i, (a, b) in enumerate(zip(actual, expected)) if a != b]
+    if len(actual) != len(expected) or mismatches:
+        first = mismatches[0] if mismatches else min(len(actual), len(expected))
+        print(f"❌ {label}: compiled != naive ({len(mismatches)} e-mails differ, first at recipient {first})",
+              file=sys.stderr)
+        return False
+    return True
+
+
+def bench_body(label, email_body, recipients, repeat):
+    results = []
+    for name, fn in (('naive', render_naive), ('compiled', render_compiled)):
+        seconds = best_of(repeat, lambda: fn(email_body, recipients))
+        peak, retained = measure_memory(lambda: fn(email_body, recipients))
+        result = {
+            'body': label,
+            'renderer': name,
+            'body_bytes': len(email_body.encode('utf-8')),
+            'seconds': seconds,
+            'emails_per_s': len(recipients) / seconds,
+            'peak_alloc_kb': peak / 1024,
+            'retained_kb': retained / 1024,
+            'transient_kb': (peak - retained) / 1024,
+        }
+        print(f"  {label:>8} {name:>9}: {seconds * 1000:8.1f} ms  {result['emails_per_s']:>10,.0f} e-mails/s"
+              f"  peak {result['peak_alloc_kb']:7,.0f} KB  retained {result['retained_kb']:7,.0f} KB"
+              f"  transient {result['transient_kb']:5,.0f} KB")
+        results.append(result)
+    print(f"  {label:>8}   speedup: {results[0]['seconds'] / results[1]['seconds']:.1f}x")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark hromadného vykreslení notifikačních e-mailů')
+    parser.add_argument('--recipients', type=int, default=500, help='Počet příjemců (výchozí 500)')
+    parser.add_argument('--repeat', type=int, default=5, help='Počet opakování, bere se nejlepší čas')
+    parser.add_argument('--seed', type=int, default=42, help='Seed generátoru dat příjemců')
+    parser.add_argument('--body', help='Fixture: soubor se spojeným email_body místo vestavěné šablony')
+    parser.add_argument('--json', help='Zapsat výsledky do JSON souboru')
+    args = parser.parse_args()
+
+    if args.body:
+        email_body = Path(args.body).read_text(encoding='utf-8')
+    else:
+        email_body = templates.BUILTIN_TEMPLATES[TEMPLATE_TYPE]
+    bodies = {'raw': email_body, 'minified': templates.minify_template(email_body, TEMPLATE_TYPE)}
+    recipients = make_recipients(args.recipients, args.seed)
+
+    print(f"E-mail render benchmark: {len(recipients)} recipients, best of {args.repeat}, seed {args.seed}")
+    print("=" * 60)
+    # Explicitní kontrola místo assert - python -O asserty přeskakuje
+    if not all([check_equivalence(label, body, recipients) for label, body in bodies.items()]):
+        return 1
+
+    results = []
+    for label, body in bodies.items():
+        results.extend(bench_body(label, body, recipients, args.repeat))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'recipients': len(recipients), 'seed': args.seed, 'results': results}, f, indent=2)
+        print(f"\nResults written to {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
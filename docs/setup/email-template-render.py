@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vykreslení vícevariantních email šablon (25_notification_templates.email_body)
+
+email_body obsahuje více variant pro různé příjemce oddělených značkami
+<!-- RECIPIENT: X -->. Modul rozloží tělo jednou na předkompilované šablony
+pro jednotlivé příjemce a drží je v cache podle (type, hash obsahu) - hromadné
+odeslání (např. všem schvalovatelům dávky objednávek) pak jen skládá
+předem rozdělené segmenty bez opakovaného hledání značek a placeholderů.
+
+Rozdělení těla (split_recipients) a předkompilovaná šablona (CompiledTemplate)
+jsou v email_template_common.py, sdíleném s update-email-templates.py.
+
+Chování odpovídá lib/email-template-helper.php:
+  - sekce se ořezávají (trim)
+  - neznámý příjemce -> APPROVER_NORMAL
+  - tělo bez značek (starý formát) -> celé tělo pro všechny příjemce
+  - neznámé placeholdery zůstávají v textu beze změny
+
+Použití z Pythonu (název souboru není platný identifikátor; docs/setup
+musí být v sys.path kvůli email_template_common):
+    spec = importlib.util.spec_from_file_location('email_template_render', PATH)
+    ...
+    cache = module.EmailRenderCache()
+    html = cache.render('order_status_ke_schvaleni', email_body, 'SUBMITTER', placeholders)
+
+Náhled z příkazové řádky:
+    python3 email-template-render.py --body body.html --recipient SUBMITTER --data data.json
+"""
+
+from collections import OrderedDict
+import argparse
+import hashlib
+import json
+import logging
+import sys
+
+from email_template_common import CompiledTemplate, split_recipients
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RECIPIENT = 'APPROVER_NORMAL'
+CACHE_MAX_ENTRIES = 256
+
+
+def content_hash(email_body):
+    """SHA-256 obsahu - stejná hodnota jako SHA2(email_body, 256) v MySQL"""
+    return hashlib.sha256(email_body.encode('utf-8')).hexdigest()
+
+
+class CompiledEmailBody:
+    """Jedno email_body rozložené na předkompilované varianty podle příjemce"""
+
+    __slots__ = ('template_type', 'content_hash', 'variants', '_default')
+
+    def __init__(self, template_type, email_body, body_hash=None):
+        self.template_type = template_type
+        self.content_hash = body_hash or content_hash(email_body)
+        sections = split_recipients(email_body)
+        self.variants = {recipient: CompiledTemplate(html) for recipient, html in sections.items()}
+        if not self.variants:
+            # Starý formát bez značek - celé tělo pro všechny příjemce
+            self._default = CompiledTemplate(email_body)
+        else:
+            self._default = self.variants.get(DEFAULT_RECIPIENT) or next(iter(self.variants.values()))
+
+    def variant(self, recipient):
+        """Předkompilovaná varianta pro příjemce (neznámý -> APPROVER_NORMAL)"""
+        template = self.variants.get(recipient.upper())
+        if template is None:
+            if self.variants:
+                logger.warning("Unknown recipient %s for %s, using %s", recipient, self.template_type, DEFAULT_RECIPIENT)
+            return self._default
+        return template
+
+    def render(self, recipient, placeholders):
+        return self.variant(recipient).render(placeholders)
+
+
+class EmailRenderCache:
+    """
+    Cache rozložených email_body podle (type, hash obsahu).
+
+    Změna šablony v DB dá nový hash -> nový záznam; starší verze stejného
+    typu se zahodí. Počet záznamů je omezený (LRU).
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._latest = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, template_type, email_body, body_hash=None):
+        """Rozložené tělo; body_hash lze předat z DB (SHA2) a ušetřit hashování"""
+        key = (template_type, body_hash or content_hash(email_body))
+        compiled = self._entries.get(key)
+        if compiled is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return compiled
+
+        self.misses += 1
+        compiled = CompiledEmailBody(template_type, email_body, key[1])
+        previous = self._latest.get(template_type)
+        if previous is not None and previous != key:
+            self._entries.pop(previous, None)
+        self._latest[template_type] = key
+        self._entries[key] = compiled
+        while len(self._entries) > self.max_entries:
+            (evicted_type, evicted_hash), _ = self._entries.popitem(last=False)
+            if self._latest.get(evicted_type) == (evicted_type, evicted_hash):
+                del self._latest[evicted_type]
+        return compiled
+
+    def render(self, template_type, email_body, recipient, placeholders, body_hash=None):
+        return self.get(template_type, email_body, body_hash).render(recipient, placeholders)
+
+    def render_many(self, template_type, email_body, recipients, body_hash=None):
+        """Hromadné vykreslení: recipients = [(RECIPIENT, placeholders), ...]"""
+        compiled = self.get(template_type, email_body, body_hash)
+        return [compiled.render(recipient, placeholders) for recipient, placeholders in recipients]
+
+    def clear(self):
+        self._entries.clear()
+        self._latest.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Náhled vykreslené email šablony pro příjemce')
+    parser.add_argument('--body', required=True, help='Soubor s celým email_body (se značkami RECIPIENT)')
+    parser.add_argument('--recipient', default=DEFAULT_RECIPIENT, help='Typ příjemce (výchozí APPROVER_NORMAL)')
+    parser.add_argument('--data', help='JSON soubor s hodnotami placeholderů')
+    parser.add_argument('--type', default='preview', help='Typ šablony (jen pro log)')
+    args = parser.parse_args()
+
+    with open(args.body, encoding='utf-8') as f:
+        email_body = f.read()
+    placeholders = {}
+    if args.data:
+        with open(args.data, encoding='utf-8') as f:
+            placeholders = {key: str(value) for key, value in json.load(f).items()}
+
+    compiled = CompiledEmailBody(args.type, email_body)
+    template = compiled.variant(args.recipient)
+    missing = sorted(template.placeholders - placeholders.keys())
+    if missing:
+        print(f"⚠️  Chybí hodnoty placeholderů: {', '.join(missing)}", file=sys.stderr)
+    sys.stdout.write(template.render(placeholders))
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+    sys.exit(main())
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Společné části email šablon pro update-email-templates.py a email-template-render.py
+
+Ostatní skripty v docs/setup mají pomlčky v názvu a nedají se importovat;
+tento modul ano (spouštěný skript má svůj adresář v sys.path).
+"""
+
+import re
+
+# Znaky, které ořezává PHP trim() - sekce se ořezávají stejně jako v lib/email-template-helper.php
+PHP_TRIM_CHARS = ' \t\n\r\0\x0b'
+
+RECIPIENT_MARKER_RE = re.compile(r'<!-- RECIPIENT: (\w+) -->')
+
+PLACEHOLDER_RE = re.compile(r'\{(\w+)\}')
+
+
+def split_recipients(body):
+    """
+    Inverze combine_recipients: email_body -> {RECIPIENT: html}; bez značek {}
+
+    Sekce se ořezávají jako get_email_template_by_recipient v PHP (značka
+    nemusí končit novým řádkem).
+    """
+    parts = RECIPIENT_MARKER_RE.split(body)
+    return {recipient: html.strip(PHP_TRIM_CHARS) for recipient, html in zip(parts[1::2], parts[2::2])}
+
+
+class CompiledTemplate:
+    """
+    Šablona rozložená jednou předem na literály a názvy placeholderů {name}.
+
+    render() poskládá části v jednom průchodu; neznámé placeholdery zůstávají
+    v textu beze změny.
+    """
+
+    __slots__ = ('source', '_literals', '_keys')
+
+    def __init__(self, source):
+        self.source = source
+        parts = PLACEHOLDER_RE.split(source)
+        # parts = [literál, klíč, literál, klíč, ..., literál]
+        self._literals = parts[0::2]
+        self._keys = parts[1::2]
+
+    @property
+    def placeholders(self):
+        """Názvy placeholderů v šabloně"""
+        return set(self._keys)
+
+    def render(self, placeholders):
+        """Dosadí placeholdery do šablony"""
+        literals = self._literals
+        out = [literals[0]]
+        for i, key in enumerate(self._keys, 1):
+            value = placeholders.get(key)
+            out.append('{' + key + '}' if value is None else value)
+            out.append(literals[i])
+        return ''.join(out)
@@ -5,8 +5,19 @@ Dávkový import uživatelů ze starého systému do erdms_users
 Zachování původních ID (NUTNÉ)
 """
 
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from itertools import islice
+import argparse
+import csv
+import json
+import os
+import queue
+import random
+import re
 import subprocess
 import sys
+import time
 
 # Databázové přihlašovací údaje
 DB_HOST = "10.3.172.11"
@@ -14,6 +25,13 @@ DB_USER = "erdms_user"
 DB_PASS = "AhchohTahnoh7eim"
 DB_NAME = "erdms"
 
+# Opakování dávky při deadlocku/timeoutu (exponenciální backoff s jitterem)
+RETRY_ATTEMPTS = 5
+RETRY_BASE_DELAY = 0.5  # s
+# 1205 lock wait timeout, 1213 deadlock, 2006 server has gone away, 2013 lost connection
+RETRYABLE_ERRORS = {1205, 1213, 2006, 2013}
+CONNECTION_ERRORS = {2006, 2013}
+
 # Data uživatelů (id, username, titul_pred, jmeno, prijmeni, titul_za, email, telefon, pozice_id, lokalita_id, organizace_id, usek_id, aktivni, dt_vytvoreni, dt_aktualizace, dt_posledni_aktivita)
 # Mapování: entra_id=NULL, upn=NULL, auth_source='database', role='user'|'admin', opravneni=NULL, password_hash=NULL, entra_sync_at=NULL
 
@@ -30,6 +48,48 @@ users_data = [
     (10, 'nologin_1985', None, 'Věra', 'Zemanová', None, '', '', None, 40, 1, 1, 0, '2025-10-18 21:09:41', '2025-10-18 21:09:41', '2009-06-24 15:52:11', 'user'),
 ]
 
+# Pole jednoho záznamu (pořadí jako v users_data; hlavička CSV / klíče JSONL)
+USER_FIELDS = (
+    'id', 'username', 'titul_pred', 'jmeno', 'prijmeni', 'titul_za', 'email', 'telefon',
+    'pozice_id', 'lokalita_id', 'organizace_id', 'usek_id', 'aktivni',
+    'dt_vytvoreni', 'dt_aktualizace', 'dt_posledni_aktivita', 'role',
+)
+
+INT_FIELDS = {'id', 'pozice_id', 'lokalita_id', 'organizace_id', 'usek_id', 'aktivni'}
+DATETIME_FIELDS = ('dt_vytvoreni', 'dt_aktualizace', 'dt_posledni_aktivita')
+
+# Číselníky pro kontrolu cizích klíčů před importem (jeden dotaz na tabulku)
+FK_TABLES = {
+    'pozice_id': '25_pozice',
+    'lokalita_id': '25_lokality',
+    'organizace_id': '25_organizace_vizitka',
+    'usek_id': '25_useky',
+}
+
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+PHONE_RE = re.compile(r'^\+?[0-9 ]{6,20}$')
+
+FIELD_INDEX = {field: i for i, field in enumerate(USER_FIELDS)}
+INT_INDEXES = tuple(FIELD_INDEX[field] for field in USER_FIELDS if field in INT_FIELDS)
+
+# Pořadí sloupců erdms_users pro INSERT
+USER_COLUMNS = (
+    'id', 'username', 'titul_pred', 'jmeno', 'prijmeni', 'titul_za', 'email', 'telefon',
+    'pozice_id', 'lokalita_id', 'organizace_id', 'usek_id', 'aktivni',
+    'dt_vytvoreni', 'dt_aktualizace', 'dt_posledni_aktivita',
+    'entra_id', 'upn', 'auth_source', 'role', 'opravneni', 'password_hash', 'entra_sync_at',
+)
+
+# Upsert - opakovaný import stejných ID jen přepíše data (idempotentní rerun).
+# ON DUPLICATE KEY se spustí i na UNIQUE username - IF(id = VALUES(id), ...)
+# přepíše jen řádek se stejným ID, jiný uživatel se stejným username zůstane
+# beze změny a záznam se nezapíše (odhalí check_written / import_batch).
+UPSERT_CLAUSE = "ON DUPLICATE KEY UPDATE " + ', '.join(
+    f"{c} = IF(id = VALUES(id), VALUES({c}), {c})" for c in USER_COLUMNS if c != 'id'
+)
+
+INSERT_SQL = f"INSERT INTO erdms_users ({', '.join(USER_COLUMNS)}) VALUES ({', '.join(['%s'] * len(USER_COLUMNS))}) {UPSERT_CLAUSE}"
+
 def format_value(v):
     """Formátuje hodnotu pro SQL"""
     if v is None:
@@ -49,7 +109,8 @@ def import_batch(batch, batch_num):
         value_str = f"({user_id}, {format_value(username)}, {format_value(titul_pred)}, {format_value(jmeno)}, {format_value(prijmeni)}, {format_value(titul_za)}, {format_value(email)}, {format_value(telefon)}, {format_value(pozice_id)}, {format_value(lokalita_id)}, {format_value(organizace_id)}, {format_value(usek_id)}, {aktivni}, {format_value(dt_vytvoreni)}, {format_value(dt_aktualizace)}, {format_value(dt_posledni_aktivita)}, NULL, NULL, 'database', {format_value(role)}, NULL, NULL, NULL)"
         values.append(value_str)
     
-    sql = f"SET FOREIGN_KEY_CHECKS = 0; SET sql_mode = 'NO_AUTO_VALUE_ON_ZERO'; INSERT INTO erdms_users (id, username, titul_pred, jmeno, prijmeni, titul_za, email, telefon, pozice_id, lokalita_id, organizace_id, usek_id, aktivni, dt_vytvoreni, dt_aktualizace, dt_posledni_aktivita, entra_id, upn, auth_source, role, opravneni, password_hash, entra_sync_at) VALUES {', '.join(values)}; SELECT LAST_INSERT_ID();"
+    ids = ', '.join(str(row[0]) for row in batch)
+    sql = f"SET FOREIGN_KEY_CHECKS = 0; SET sql_mode = 'NO_AUTO_VALUE_ON_ZERO'; INSERT INTO erdms_users ({', '.join(USER_COLUMNS)}) VALUES {', '.join(values)} {UPSERT_CLAUSE}; SELECT id, username FROM erdms_users WHERE id IN ({ids});"
     
     cmd = [
         'mysql',
@@ -64,6 +125,13 @@ def import_batch(batch, batch_num):
     try:
         result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
         if result.returncode == 0:
+            # Výstup mysql v dávkovém režimu: hlavička, pak "id<TAB>username" po řádcích
+            fields = (line.split('\t', 1) for line in result.stdout.splitlines())
+            written = {int(f[0]): f[1] for f in fields if len(f) == 2 and f[0].isdigit()}
+            conflicts = find_conflicts(batch, written)
+            if conflicts:
+                print(f"✗ Dávka {batch_num}: CHYBA - {format_conflicts(conflicts)}")
+                return False
             print(f"✓ Dávka {batch_num}: Importováno {len(batch)} uživatelů")
             return True
         else:
@@ -73,26 +141,646 @@ def import_batch(batch, batch_num):
         print(f"✗ Dávka {batch_num}: VÝJIMKA - {str(e)}")
         return False
 
-def main():
-    print(f"Import uživatelů do erdms_users (celkem {len(users_data)} záznamů)")
-    print("="*60)
-    
-    batch_size = 5  # Po 5 záznamech
-    total = len(users_data)
+# ============================================================
+# VSTUPNÍ ZDROJE (streamované - soubor se čte po řádcích)
+# ============================================================
+
+def read_csv(path):
+    """Záznamy z CSV s hlavičkou USER_FIELDS (prázdná buňka = NULL)"""
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        for values in reader:
+            yield {key: value or None for key, value in zip(header, values)}
+
+def read_jsonl(path):
+    """Záznamy z JSONL (jeden JSON objekt na řádek)"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+# Výpis `SELECT * FROM erdms_users` (apps/eeo-v2/api/erdms_users_full_dump.txt)
+DUMP_HEADER_RE = re.compile(r'^--- \[\d+\] ID: (\d+) ---$')
+DUMP_FIELDS = {
+    'Username': 'username',
+    'Jméno': 'cele_jmeno',
+    'Email': 'email',
+    'Telefon': 'telefon',
+    'Pozice ID': 'pozice_id',
+    'Lokalita ID': 'lokalita_id',
+    'Organizace ID': 'organizace_id',
+    'Úsek ID': 'usek_id',
+    'Role': 'role',
+    'Aktivní': 'aktivni',
+    'Vytvořeno': 'dt_vytvoreni',
+    'Aktualizováno': 'dt_aktualizace',
+    'Poslední akt.': 'dt_posledni_aktivita',
+}
+DUMP_EMPTY = {'', '(neuvedeno)', '(není)', '(nikdy)', 'N/A'}
+POSTNOMINALS = {'MBA', 'MPH', 'DiS', 'PhD', 'CSc', 'DrSc', 'LL.M'}
+
+def split_full_name(full_name):
+    """
+    Rozdělí 'Ing. Jan Novák MBA' na (titul_pred, jmeno, prijmeni, titul_za).
+
+    Tituly se poznají podle tečky / známých zkratek, zbytek: první slovo
+    = jméno, ostatní = příjmení (dvojitá příjmení, poznámky v závorce).
+    """
+    words = full_name.split()
+    before = []
+    while len(words) > 2 and words[0].endswith('.'):
+        before.append(words.pop(0))
+    after = []
+    while len(words) > 2 and (words[-1].endswith('.') or words[-1] in POSTNOMINALS):
+        after.insert(0, words.pop())
+    return (
+        ' '.join(before) or None,
+        words[0] if words else None,
+        ' '.join(words[1:]) or None,
+        ' '.join(after) or None,
+    )
+
+def parse_dump_datetime(value):
+    """'Sat Oct 04 2025 11:27:30 GMT+0200 (...)' -> '2025-10-04 11:27:30'"""
+    return datetime.strptime(value[:24], '%a %b %d %Y %H:%M:%S').strftime('%Y-%m-%d %H:%M:%S')
+
+def read_dump(path):
+    """Záznamy z textového výpisu erdms_users (blok '--- [NNN] ID: x ---' na uživatele)"""
+    record = None
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            header = DUMP_HEADER_RE.match(line)
+            if header:
+                if record:
+                    yield record
+                record = {'id': header.group(1)}
+                continue
+            if record is None or ':' not in line:
+                continue
+
+            label, _, value = line.partition(':')
+            field = DUMP_FIELDS.get(label.strip())
+            if not field:
+                continue
+            value = value.strip()
+            if value in DUMP_EMPTY:
+                record[field] = None
+            elif field == 'aktivni':
+                record[field] = 1 if 'ANO' in value else 0
+            elif field.startswith('dt_'):
+                record[field] = parse_dump_datetime(value)
+            elif field == 'cele_jmeno':
+                titul_pred, jmeno, prijmeni, titul_za = split_full_name(value)
+                record.update(titul_pred=titul_pred, jmeno=jmeno, prijmeni=prijmeni, titul_za=titul_za)
+            else:
+                record[field] = value
+    if record:
+        yield record
+
+READERS = {'csv': read_csv, 'jsonl': read_jsonl, 'dump': read_dump}
+
+def detect_format(path):
+    """Formát podle přípony (.csv, .jsonl/.ndjson, jinak textový výpis)"""
+    if path.endswith('.csv'):
+        return 'csv'
+    if path.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return 'dump'
+
+def to_user_row(record):
+    """
+    Validuje a převede záznam (dict) na tuple v pořadí USER_FIELDS.
+
+    Raises:
+        ValueError: chybí id/username nebo číselné pole není číslo
+    """
+    get = record.get
+    if get('id') in (None, '') or not get('username'):
+        raise ValueError("chybí id nebo username")
+    if not isinstance(get('username'), str):
+        raise ValueError(f"username není text: {get('username')!r}")
+
+    row = [get(field) for field in USER_FIELDS]
+    for i in INT_INDEXES:
+        if row[i] is not None:
+            row[i] = int(row[i])
+
+    if row[FIELD_INDEX['aktivni']] is None:
+        row[FIELD_INDEX['aktivni']] = 0
+    if not row[FIELD_INDEX['role']]:
+        row[FIELD_INDEX['role']] = 'user'
+    return tuple(row)
+
+def iter_user_rows(records, stats, rejected=frozenset(), start=0):
+    """
+    Validní záznamy jako (číslo záznamu ve vstupu, tuple); nevalidní se
+    vypíšou a přeskočí (stats['skipped']).
+
+    Záznamy s číslem v rejected (vyřazené předběžnou validací) a záznamy
+    do čísla start včetně (už commitnuté, --resume) se tiše přeskočí.
+    """
+    for number, record in enumerate(records, 1):
+        if number <= start or number in rejected:
+            continue
+        try:
+            yield number, to_user_row(record)
+        except (ValueError, TypeError) as e:
+            stats['skipped'] += 1
+            print(f"⚠️  Záznam {number} přeskočen: {e}")
+
+def open_records(args):
+    """Nový proud záznamů (dict) ze vstupu - validace i import čtou vstup každý zvlášť"""
+    if args.input:
+        return READERS[args.format or detect_format(args.input)](args.input)
+    return (dict(zip(USER_FIELDS, row)) for row in users_data)
+
+# ============================================================
+# PŘEDBĚŽNÁ VALIDACE (celý vstup před prvním zápisem)
+# ============================================================
+
+def fetch_key_sets(loader):
+    """Načte ID číselníků z FK_TABLES - jeden dotaz na tabulku"""
+    key_sets = {}
+    if loader == 'driver':
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            for field, table in FK_TABLES.items():
+                cursor.execute(f"SELECT id FROM `{table}`")
+                key_sets[field] = {row[0] for row in cursor.fetchall()}
+        finally:
+            conn.close()
+        return key_sets
+
+    for field, table in FK_TABLES.items():
+        result = subprocess.run(
+            ['mysql', '-h', DB_HOST, '-u', DB_USER, f'-p{DB_PASS}', '--skip-ssl', '-N', '-B',
+             DB_NAME, '-e', f"SELECT id FROM `{table}`"],
+            capture_output=True, text=True, timeout=60, check=True
+        )
+        key_sets[field] = {int(line) for line in result.stdout.split()}
+    return key_sets
+
+def check_row(row, key_sets, seen_ids, seen_usernames):
+    """Vrátí seznam (kategorie, detail) problémů jednoho záznamu"""
+    problems = []
+    user_id, username = row[0], row[1]
+
+    if user_id < 0:
+        problems.append(('záporné id', str(user_id)))
+    if user_id in seen_ids:
+        problems.append(('duplicitní id', str(user_id)))
+    seen_ids.add(user_id)
+
+    # UNIQUE KEY username - kolace je case-insensitive
+    username_key = username.lower()
+    if username_key in seen_usernames:
+        problems.append(('duplicitní username', username))
+    seen_usernames.add(username_key)
+    if len(username) > 50:
+        problems.append(('username > 50 znaků', username))
+
+    email = row[FIELD_INDEX['email']]
+    if email and not EMAIL_RE.match(email):
+        problems.append(('neplatný email', email))
+    telefon = row[FIELD_INDEX['telefon']]
+    if telefon and not PHONE_RE.match(telefon):
+        problems.append(('neplatný telefon', telefon))
+
+    if row[FIELD_INDEX['usek_id']] is None:
+        problems.append(('chybí usek_id', ''))
+    for field, keys in key_sets.items():
+        value = row[FIELD_INDEX[field]]
+        if value is not None and value not in keys:
+            problems.append((f'neexistující {field}', str(value)))
+
+    for field in DATETIME_FIELDS:
+        value = row[FIELD_INDEX[field]]
+        if value:
+            try:
+                datetime.fromisoformat(value)
+            except (ValueError, TypeError):
+                problems.append((f'neplatné {field}', str(value)))
+
+    return problems
+
+def validate_records(records, key_sets, rejected_path):
+    """
+    Projde celý vstup jedním průchodem a vyřadí záznamy, které by DB odmítla.
+
+    Vyřazené záznamy se zapíší do rejected_path (CSV: číslo záznamu,
+    důvody, původní pole). Pokud tam první výskyt duplicity projde,
+    vyřadí se až další výskyty.
+
+    Returns:
+        Tuple (čísla vyřazených záznamů, {kategorie: počet}, počet záznamů)
+    """
+    rejected = set()
+    counts = {}
+    seen_ids = set()
+    seen_usernames = set()
+    total = 0
+
+    rejected_file = None
+    writer = None
+    try:
+        for number, record in enumerate(records, 1):
+            total = number
+            try:
+                problems = check_row(to_user_row(record), key_sets, seen_ids, seen_usernames)
+            except (ValueError, TypeError) as e:
+                problems = [('neplatný záznam', str(e))]
+            if not problems:
+                continue
+
+            rejected.add(number)
+            for category, _ in problems:
+                counts[category] = counts.get(category, 0) + 1
+
+            if writer is None:
+                rejected_file = open(rejected_path, 'w', newline='', encoding='utf-8')
+                writer = csv.writer(rejected_file)
+                writer.writerow(('cislo_zaznamu', 'duvody') + USER_FIELDS)
+            writer.writerow(
+                (number, '; '.join(f"{category}: {detail}" if detail else category for category, detail in problems))
+                + tuple(record.get(field) for field in USER_FIELDS)
+            )
+    finally:
+        if rejected_file:
+            rejected_file.close()
+
+    return rejected, counts, total
+
+def print_validation_report(rejected, counts, total, rejected_path, elapsed):
+    print(f"🔍 Validace: {total} záznamů za {elapsed:.2f} s, vyřazeno {len(rejected)}")
+    for category, count in sorted(counts.items(), key=lambda item: -item[1]):
+        print(f"   - {category}: {count}")
+    if rejected:
+        print(f"   Vyřazené záznamy: {rejected_path}")
+
+def batched(rows, batch_size):
+    """Rozdělí proud záznamů na dávky (v paměti je vždy jen jedna dávka)"""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def to_db_row(row):
+    """Převede záznam users_data na hodnoty v pořadí USER_COLUMNS"""
+    user_id, username, titul_pred, jmeno, prijmeni, titul_za, email, telefon, pozice_id, lokalita_id, organizace_id, usek_id, aktivni, dt_vytvoreni, dt_aktualizace, dt_posledni_aktivita, role = row
+    return (
+        user_id, username, titul_pred, jmeno, prijmeni, titul_za, email, telefon,
+        pozice_id, lokalita_id, organizace_id, usek_id, aktivni,
+        dt_vytvoreni, dt_aktualizace, dt_posledni_aktivita,
+        None, None, 'database', role, None, None, None,
+    )
+
+# ============================================================
+# CHECKPOINT (navázání přerušeného importu přes --resume)
+# ============================================================
+
+def source_id(input_path):
+    """Identita vstupu uložená v checkpointu (soubor = cesta + velikost)"""
+    if not input_path:
+        return f"users_data:{len(users_data)}"
+    return f"{os.path.abspath(input_path)}:{os.path.getsize(input_path)}"
+
+def load_checkpoint(path):
+    """Načte stav importu, nebo None pokud neexistuje"""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def save_checkpoint(path, state):
+    """Zapíše stav atomicky (tmp + rename) - pád uprostřed zápisu nepoškodí checkpoint"""
+    state['updated_at'] = datetime.now().isoformat(timespec='seconds')
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+def record_batch(checkpoint, batch):
+    """
+    Zapíše do checkpointu dávku (číslo záznamu, tuple), která je už commitnutá v DB.
+
+    --resume navazuje za číslem posledního záznamu ve vstupu ('record'), ne za
+    počtem zapsaných řádků - ten by se posunul, kdyby se při navázání vyřadilo
+    jiné množství záznamů (--skip-validation, změněné číselníky).
+    """
+    checkpoint['rows'] += len(batch)
+    checkpoint['batches'] += 1
+    checkpoint['record'], last_row = batch[-1]
+    checkpoint['last_id'] = last_row[0]
+    save_checkpoint(checkpoint['path'], checkpoint)
+
+def resume_hint(checkpoint):
+    print(f"Commitnuto {checkpoint['rows']} záznamů (poslední záznam vstupu {checkpoint['record']}, "
+          f"ID {checkpoint['last_id']}), stav v {checkpoint['path']} - pokračujte spuštěním s --resume")
+
+def get_connection():
+    """Jedno pymysql připojení pro celý import (bez autocommitu)"""
+    import pymysql
+    return pymysql.connect(
+        host=DB_HOST, user=DB_USER, password=DB_PASS, database=DB_NAME,
+        charset='utf8mb4', autocommit=False
+    )
+
+def prepare_session(cursor):
+    """Nastavení session jednou na začátku importu (místo v každé dávce)"""
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+    # id=0 (system) se musí vložit jako 0, ne jako nové AUTO_INCREMENT ID
+    cursor.execute("SET sql_mode = 'NO_AUTO_VALUE_ON_ZERO'")
+
+class ConnectionPool:
+    """
+    Pevný pool pymysql připojení, každé s připravenou session (prepare_session).
+
+    Rozbité připojení se v poolu nahradí prázdným slotem (None) a znovu se
+    otevře až při dalším acquire() - release() tak nikdy nevyhodí výjimku,
+    nepřekryje chybu dávky a pool nepřijde o slot, i když je DB zrovna dole.
+    """
+
+    def __init__(self, size):
+        self._free = queue.Queue()
+        self._all = []
+        for _ in range(size):
+            self._free.put(self._open())
+
+    def _open(self):
+        conn = get_connection()
+        try:
+            prepare_session(conn.cursor())
+        except BaseException:
+            conn.close()
+            raise
+        self._all.append(conn)
+        return conn
+
+    def acquire(self):
+        conn = self._free.get()
+        if conn is None:
+            try:
+                conn = self._open()
+            except BaseException:
+                # Slot se vrátí prázdný - další acquire() zkusí připojení znovu
+                self._free.put(None)
+                raise
+        return conn
+
+    def release(self, conn, broken=False):
+        """Vrátí připojení do poolu; rozbité zavře a uvolní jeho slot"""
+        if broken:
+            self._all.remove(conn)
+            try:
+                conn.close()
+            except Exception:
+                pass
+            conn = None
+        self._free.put(conn)
+
+    def close(self):
+        for conn in self._all:
+            conn.close()
+
+class UniqueKeyConflict(Exception):
+    """Záznam narazil na UNIQUE klíč jiného uživatele - upsert ho nezapsal"""
+
+def format_conflicts(conflicts):
+    shown = ', '.join(f"{row[1]} (ID {row[0]})" for row in conflicts[:10])
+    more = f" a dalších {len(conflicts) - 10}" if len(conflicts) > 10 else ""
+    return f"username už v DB patří jinému ID: {shown}{more}"
+
+def find_conflicts(batch, written):
+    """Záznamy dávky, jejichž ID v DB chybí nebo má jiný username (written = {id: username})"""
+    return [row for row in batch if written.get(row[0]) != row[1]]
+
+def check_written(cursor, batch):
+    """
+    Ověří, že je každý záznam dávky v DB i s username (v transakci dávky, před commitem).
+
+    Guarded upsert (UPSERT_CLAUSE) záznam, jehož username patří jinému ID,
+    tiše vynechá - nové ID pak v DB chybí, existující ID si ponechá původní
+    username. Bez kontroly by obojí prošlo bez hlášení.
+
+    Raises:
+        UniqueKeyConflict: některý záznam se nezapsal
+    """
+    ids = [row[0] for row in batch]
+    cursor.execute(f"SELECT id, username FROM erdms_users WHERE id IN ({', '.join(['%s'] * len(ids))})", ids)
+    conflicts = find_conflicts(batch, dict(cursor.fetchall()))
+    if conflicts:
+        raise UniqueKeyConflict(format_conflicts(conflicts))
+
+def error_code(e):
+    """MySQL kód chyby z pymysql výjimky (args = (kód, zpráva)), jinak None"""
+    return e.args[0] if e.args and isinstance(e.args[0], int) else None
+
+def write_batch(pool, batch, batch_num):
+    """
+    Zapíše a commitne jednu dávku; deadlock/timeout/ztrátu spojení zkusí
+    znovu (až RETRY_ATTEMPTS krát s exponenciálním backoffem).
+
+    Nepovedené znovupřipojení (DB je dole) se počítá jako další pokus - po
+    vyčerpání pokusů se vyhodí chyba samotné dávky, ne chyba připojení.
+    """
+    values = [to_db_row(row) for row in batch]
+    batch_error = connect_error = last_error = None
+    for attempt in range(RETRY_ATTEMPTS + 1):
+        if attempt:
+            delay = RETRY_BASE_DELAY * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+            print(f"↻ Dávka {batch_num}: {last_error} - opakuji za {delay:.1f} s ({attempt}/{RETRY_ATTEMPTS})")
+            time.sleep(delay)
+        try:
+            conn = pool.acquire()
+        except Exception as e:
+            connect_error = last_error = e
+            continue
+        broken = False
+        try:
+            cursor = conn.cursor()
+            cursor.executemany(INSERT_SQL, values)
+            check_written(cursor, batch)
+            conn.commit()
+            return
+        except Exception as e:
+            code = error_code(e)
+            broken = code in CONNECTION_ERRORS
+            if not broken:
+                try:
+                    conn.rollback()
+                except Exception:
+                    broken = True
+            if code not in RETRYABLE_ERRORS:
+                raise
+            batch_error = last_error = e
+        finally:
+            pool.release(conn, broken)
+    raise batch_error or connect_error
+
+def import_with_driver(rows, batch_size, checkpoint, workers=1):
+    """
+    Importuje všechny záznamy přes pool pymysql připojení.
+
+    rows je proud (číslo záznamu ve vstupu, tuple) z iter_user_rows() -
+    může to být generátor, dávky se posílají průběžně, takže první řádky
+    jsou v DB dřív, než se dočte celý vstup. Dávky jdou
+    přes parametrizovaný executemany (pymysql je spojí do multi-row
+    INSERTu), každá ve vlastní transakci, a zapisuje je `workers` vláken
+    paralelně (dávky jsou disjunktní, ID se zachovávají).
+
+    Dávky se mohou dokončit mimo pořadí - checkpoint se posouvá jen přes
+    souvislý úsek hotových dávek, takže --resume nikdy nepřeskočí
+    nezapsaná data (případný překryv pokryje upsert).
+    """
+    started = time.perf_counter()
+    done = 0
+
+    next_num = checkpoint['batches'] + 1      # číslo další čtené dávky
+    next_record = next_num                    # první dávka, která ještě není v checkpointu
+    finished = {}                             # hotové dávky mimo pořadí: číslo -> dávka
+    in_flight = {}                            # future -> (číslo, dávka)
+    failure = None
+
+    def collect(futures):
+        nonlocal next_record, done, failure
+        for future in futures:
+            batch_num, batch = in_flight.pop(future)
+            try:
+                future.result()
+            except Exception as e:
+                print(f"✗ Dávka {batch_num}: CHYBA - {e}")
+                failure = failure or e
+                continue
+            finished[batch_num] = batch
+        while next_record in finished:
+            batch = finished.pop(next_record)
+            record_batch(checkpoint, batch)
+            done += len(batch)
+            next_record += 1
+            elapsed = time.perf_counter() - started
+            print(f"✓ Dávka {checkpoint['batches']}: {checkpoint['rows']} záznamů "
+                  f"({done / elapsed:,.0f} řádků/s, {workers} workerů)")
+
+    pool = ConnectionPool(workers)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for batch in batched(rows, batch_size):
+                # Nejvýš 2 dávky na worker v paměti
+                while len(in_flight) >= 2 * workers:
+                    collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+                if failure:
+                    break
+                rows_only = [row for _, row in batch]
+                in_flight[executor.submit(write_batch, pool, rows_only, next_num)] = (next_num, batch)
+                next_num += 1
+            while in_flight:
+                collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+    finally:
+        pool.close()
+
+    if failure:
+        resume_hint(checkpoint)
+        sys.exit(1)
+
+    elapsed = time.perf_counter() - started
+    print(f"⏱️  {done} záznamů za {elapsed:.2f} s ({done / elapsed:,.0f} řádků/s)")
+    return done
+
+def import_with_cli(rows, batch_size, checkpoint):
+    """Původní cesta přes mysql CLI (pro servery bez pymysql)"""
     success = 0
-    
-    for i in range(0, total, batch_size):
-        batch = users_data[i:i+batch_size]
-        batch_num = (i // batch_size) + 1
-        
-        if import_batch(batch, batch_num):
+    for batch in batched(rows, batch_size):
+        batch_num = checkpoint['batches'] + 1
+        if import_batch([row for _, row in batch], batch_num):
+            record_batch(checkpoint, batch)
             success += len(batch)
         else:
             print(f"\nPřerušeno po chybě v dávce {batch_num}")
+            resume_hint(checkpoint)
             sys.exit(1)
+    return success
+
+def main():
+    parser = argparse.ArgumentParser(description='Import uživatelů do erdms_users')
+    parser.add_argument('--loader', choices=['driver', 'cli'], default='driver',
+                        help='driver = jedno pymysql připojení (výchozí), cli = mysql CLI po dávkách')
+    parser.add_argument('--batch-size', type=int,
+                        help='Počet záznamů v dávce (výchozí 5000 pro driver, 5 pro cli)')
+    parser.add_argument('--input', help='Vstupní soubor (CSV, JSONL nebo textový výpis erdms_users); bez něj users_data')
+    parser.add_argument('--format', choices=sorted(READERS), help='Formát vstupu (výchozí podle přípony)')
+    parser.add_argument('--state-file', help='Soubor se stavem importu (výchozí <vstup>.import-state.json)')
+    parser.add_argument('--resume', action='store_true', help='Navázat na poslední commitnutou dávku ze stavu')
+    parser.add_argument('--workers', type=int, default=1, help='Driver: počet paralelních připojení (výchozí 1)')
+    parser.add_argument('--rejected-file', help='CSV s vyřazenými záznamy (výchozí <vstup>.rejected.csv)')
+    parser.add_argument('--validate-only', action='store_true', help='Jen předběžná validace, bez zápisu')
+    parser.add_argument('--skip-fk-check', action='store_true', help='Validovat bez kontroly číselníků v DB')
+    parser.add_argument('--skip-validation', action='store_true', help='Přeskočit předběžnou validaci')
+    args = parser.parse_args()
+
+    state_file = args.state_file or f"{args.input or 'users_data'}.import-state.json"
+    checkpoint = {'path': state_file, 'source': source_id(args.input), 'rows': 0, 'batches': 0,
+                  'record': 0, 'last_id': None, 'completed': False}
+
+    if args.resume:
+        state = load_checkpoint(state_file)
+        if state is None:
+            print(f"⚠️  Stav {state_file} neexistuje - import začne od začátku")
+        elif state['source'] != checkpoint['source']:
+            print(f"✗ Stav {state_file} patří k jinému vstupu ({state['source']})")
+            sys.exit(2)
+        elif state.get('completed'):
+            print(f"✓ Import podle {state_file} už je dokončen ({state['rows']} záznamů)")
+            return
+        elif 'record' not in state:
+            # Starší stav bez čísla záznamu - počet řádků po vyřazení nelze bezpečně použít
+            print(f"⚠️  Stav {state_file} neobsahuje číslo záznamu - import začne od začátku (upsert kryje překryv)")
+        else:
+            checkpoint.update(state, path=state_file)
+            print(f"↻ Navazuji za záznamem {state['record']} vstupu (poslední ID {state['last_id']})")
+
+    batch_size = args.batch_size or (5000 if args.loader == 'driver' else 5)
+    stats = {'skipped': 0}
+
+    if args.input:
+        source = f"{args.input} ({args.format or detect_format(args.input)})"
+    else:
+        source = f"users_data ({len(users_data)} záznamů)"
+
+    # Předběžná validace - do DB jdou jen záznamy, které projdou, dávka tak nespadne uprostřed
+    rejected = set()
+    if not args.skip_validation:
+        rejected_path = args.rejected_file or f"{args.input or 'users_data'}.rejected.csv"
+        key_sets = {} if args.skip_fk_check else fetch_key_sets(args.loader)
+        started = time.perf_counter()
+        rejected, counts, total = validate_records(open_records(args), key_sets, rejected_path)
+        print_validation_report(rejected, counts, total, rejected_path, time.perf_counter() - started)
+        if args.validate_only:
+            sys.exit(1 if rejected else 0)
+
+    # Už commitnuté záznamy se přeskočí podle čísla ve vstupu (upsert kryje překryv)
+    rows = iter_user_rows(open_records(args), stats, rejected, checkpoint['record'])
+
+    print(f"Import uživatelů do erdms_users ze {source}, loader={args.loader}, dávka {batch_size}"
+          + (f", {args.workers} workerů" if args.loader == 'driver' and args.workers > 1 else ""))
+    print("="*60)
+    
+    if args.loader == 'driver':
+        success = import_with_driver(rows, batch_size, checkpoint, max(1, args.workers))
+    else:
+        success = import_with_cli(rows, batch_size, checkpoint)
+
+    checkpoint['completed'] = True
+    save_checkpoint(state_file, checkpoint)
     
     print("="*60)
-    print(f"✓ Import dokončen: {success}/{total} záznamů")
+    skipped = stats['skipped'] + len(rejected)
+    print(f"✓ Import dokončen: {success} záznamů (celkem {checkpoint['rows']})"
+          + (f", přeskočeno {skipped}" if skipped else ""))
 
 if __name__ == '__main__':
     main()
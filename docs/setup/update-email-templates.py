@@ -1,16 +1,46 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Update email šablon do DB - order_status_ke_schvaleni
-Spojuje 3 varianty (APPROVER_NORMAL, APPROVER_URGENT, SUBMITTER) do jednoho pole
+Synchronizace email šablon do DB (25_notification_templates)
+
+Zdroje šablon:
+  - vestavěné TEMPLATE_VARIANTS - základní HTML + mapa náhrad pro každého
+    příjemce (order_status_ke_schvaleni: APPROVER_NORMAL, APPROVER_URGENT,
+    SUBMITTER spojené do jednoho pole)
+  - --dir DIR: <type>.html nebo <type>/<RECIPIENT>.html
+  - --js FILE: export const DB_TEMPLATE_* = `...` z klientských zdrojů
+
+Vygenerované HTML se minifikuje (odsazení, komentáře, mezery ve stylech;
+placeholdery a značky RECIPIENT zůstávají) a ověří se velikostní rozpočet.
+Každé tělo se zahashuje (SHA-256), aktuální hashe se načtou z DB jedním
+dotazem a změněné řádky se zapíší jedním hromadným UPDATE v jedné transakci.
+--dry-run nic nezapisuje a vypíše diff změněných šablon.
+
+Použití:
+    python3 update-email-templates.py --dry-run
+    python3 update-email-templates.py --export templates/
+    python3 update-email-templates.py --js apps/eeo-v2/client/src/pages/emailTemplatesFromDB.js
 """
 
+from pathlib import Path
+import argparse
+import difflib
+import hashlib
+import re
 import sys
-sys.path.insert(0, '/var/www/erdms-dev/apps/eeo-v2/client/src/pages')
 
-# Načtení šablon z emailTemplatesFromDB.js
-import subprocess
-import pymysql
+from email_template_common import PHP_TRIM_CHARS, split_recipients
+
+# Databázové přihlašovací údaje
+DB_HOST = '10.3.172.11'
+DB_USER = 'erdms_user'
+DB_PASS = 'AhchohTahnoh7eim'
+DB_NAME = 'eeo2025'
+
+# Velikostní rozpočet (bajty UTF-8): email_body je sloupec TEXT (max 65 535 B),
+# jednotlivá varianta = jeden e-mail - Gmail ořezává zprávy nad 102 KB
+BODY_BUDGET_BYTES = 65535
+VARIANT_BUDGET_BYTES = 102 * 1024
 
 # Definice 3 variant šablon
 APPROVER_NORMAL = """<!DOCTYPE html>
@@ -111,31 +141,464 @@ APPROVER_NORMAL = """<!DOCTYPE html>
 </body>
 </html>"""
 
-# Spojení všech 3 variant
-combined_email_body = f"""<!-- RECIPIENT: APPROVER_NORMAL -->
-{APPROVER_NORMAL}
 
-<!-- RECIPIENT: APPROVER_URGENT -->
-{APPROVER_NORMAL.replace('#f97316', '#dc2626').replace('#fb923c', '#b91c1c').replace('❗ Nová objednávka ke schválení', '<span style="display: inline-block; font-family: \\'Segoe UI Symbol\\', \\'Apple Color Emoji\\', sans-serif; font-style: normal; color: #dc2626; font-size: 32px; font-weight: bold; text-shadow: -2px -2px 0 #fff, 2px -2px 0 #fff, -2px 2px 0 #fff, 2px 2px 0 #fff, -1px -1px 0 #fff, 1px -1px 0 #fff, -1px 1px 0 #fff, 1px 1px 0 #fff, -3px 0 0 #fff, 3px 0 0 #fff, 0 -3px 0 #fff, 0 3px 0 #fff;">⚡</span> Nová objednávka ke schválení').replace('249, 115, 22', '220, 38, 38')}
+# Varianty šablon: základní HTML + mapa náhrad {hledaný text: náhrada} pro
+# každého příjemce. Náhrady se aplikují v jednom průchodu a každá musí
+# v základu alespoň jednou najít shodu (překlep = chyba, ne tichý no-op).
+TEMPLATE_VARIANTS = {
+    'order_status_ke_schvaleni': {
+        'base': APPROVER_NORMAL,
+        'recipients': {
+            'APPROVER_NORMAL': {},
+            'APPROVER_URGENT': {
+                '#f97316': '#dc2626',
+                '#fb923c': '#b91c1c',
+                '❗ Nová objednávka ke schválení': '<span style="display: inline-block; font-family: \'Segoe UI Symbol\', \'Apple Color Emoji\', sans-serif; font-style: normal; color: #dc2626; font-size: 32px; font-weight: bold; text-shadow: -2px -2px 0 #fff, 2px -2px 0 #fff, -2px 2px 0 #fff, 2px 2px 0 #fff, -1px -1px 0 #fff, 1px -1px 0 #fff, -1px 1px 0 #fff, 1px 1px 0 #fff, -3px 0 0 #fff, 3px 0 0 #fff, 0 -3px 0 #fff, 0 3px 0 #fff;">⚡</span> Nová objednávka ke schválení',
+                '249, 115, 22': '220, 38, 38',
+            },
+            'SUBMITTER': {
+                '#f97316': '#059669',
+                '#fb923c': '#047857',
+                '❗ Nová objednávka ke schválení': '✅ Objednávka odeslána ke schválení',
+                'Dobrý den <strong>{approver_name}</strong>': 'Dobrý den <strong>{user_name}</strong>',
+                'byla vytvořena <strong>nová objednávka</strong>, která vyžaduje vaše schválení': 'vaše objednávka byla <strong>úspěšně odeslána ke schválení</strong>. O jejím schválení nebo zamítnutí budete informováni e-mailem',
+                'Detaily objednávky': 'Detaily vaší objednávky',
+                '249, 115, 22': '5, 150, 105',
+                'Zobrazit a schválit objednávku': 'Zobrazit objednávku',
+                'Pro schválení nebo zamítnutí objednávky prosím použijte tlačítko výše': 'Jakmile bude objednávka schválena nebo zamítnuta, dostanete další e-mail s informací o výsledku',
+            },
+        },
+    },
+}
+
+
+def compile_substitutions(substitutions):
+    """Jeden regex se všemi hledanými texty (delší dřív - při shodě na stejné pozici vyhraje delší)"""
+    keys = sorted(substitutions, key=len, reverse=True)
+    return re.compile('|'.join(re.escape(key) for key in keys))
+
+
+def apply_substitutions(base, substitutions, name='variant'):
+    """Aplikuje všechny náhrady v jednom průchodu; ValueError, pokud některá nenašla shodu
+
+    Na rozdíl od řetězených .replace() se náhrady navzájem neovlivňují -
+    text vložený jednou náhradou už není vstupem pro další.
+    """
+    if not substitutions:
+        return base
+    hits = dict.fromkeys(substitutions, 0)
+
+    def replace(match):
+        key = match.group(0)
+        hits[key] += 1
+        return substitutions[key]
 
-<!-- RECIPIENT: SUBMITTER -->
-{APPROVER_NORMAL.replace('#f97316', '#059669').replace('#fb923c', '#047857').replace('❗ Nová objednávka ke schválení', '✅ Objednávka odeslána ke schválení').replace('Dobrý den <strong>{approver_name}</strong>', 'Dobrý den <strong>{user_name}</strong>').replace('byla vytvořena <strong>nová objednávka</strong>, která vyžaduje vaše schválení', 'vaše objednávka byla <strong>úspěšně odeslána ke schválení</strong>. O jejím schválení nebo zamítnutí budete informováni e-mailem').replace('Detaily objednávky', 'Detaily vaší objednávky').replace('249, 115, 22', '5, 150, 105').replace('Zobrazit a schválit objednávku', 'Zobrazit objednávku').replace('Pro schválení nebo zamítnutí objednávky prosím použijte tlačítko výše', 'Jakmile bude objednávka schválena nebo zamítnuta, dostanete další e-mail s informací o výsledku')}"""
+    result = compile_substitutions(substitutions).sub(replace, base)
+    unmatched = [key for key, count in hits.items() if not count]
+    if unmatched:
+        raise ValueError(f"{name}: náhrady bez shody v základní šabloně: {unmatched}")
+    return result
 
-# DB připojení
-try:
-    connection = pymysql.connect(
-        host='10.3.172.11',
-        user='erdms_user',
-        password='AhchohTahnoh7eim',
-        database='eeo2025',
-        charset='utf8mb4'
+
+def combine_recipients(sections):
+    """Spojí varianty {RECIPIENT: html} do jednoho email_body (odděleno značkami, sekce ořezané)"""
+    return '\n\n'.join(
+        f"<!-- RECIPIENT: {recipient} -->\n{html.strip(PHP_TRIM_CHARS)}" for recipient, html in sections.items()
     )
-    
+
+
+def build_variants(definition, template_type='template'):
+    """{RECIPIENT: html} pro jeden typ šablony"""
+    base = definition['base']
+    return {
+        recipient: apply_substitutions(base, substitutions, f"{template_type}/{recipient}")
+        for recipient, substitutions in definition['recipients'].items()
+    }
+
+
+def build_templates(variants):
+    """Vygeneruje email_body se všemi RECIPIENT sekcemi pro všechny typy najednou"""
+    return {
+        template_type: combine_recipients(build_variants(definition, template_type))
+        for template_type, definition in variants.items()
+    }
+
+
+# Vestavěné šablony {type: email_body}
+BUILTIN_TEMPLATES = build_templates(TEMPLATE_VARIANTS)
+combined_email_body = BUILTIN_TEMPLATES['order_status_ke_schvaleni']
+
+# Klientské JS konstanty -> (type, RECIPIENT); ostatní DB_TEMPLATE_* se přeskočí,
+# dokud nemají jisté mapování na typ notifikace
+JS_TEMPLATES = {
+    'DB_TEMPLATE_APPROVER_NORMAL': ('order_status_ke_schvaleni', 'APPROVER_NORMAL'),
+    'DB_TEMPLATE_APPROVER_URGENT': ('order_status_ke_schvaleni', 'APPROVER_URGENT'),
+    'DB_TEMPLATE_SUBMITTER': ('order_status_ke_schvaleni', 'SUBMITTER'),
+}
+
+JS_EXPORT_RE = re.compile(r'export const (\w+) = `(.*?)`;', re.S)
+
+
+# ============================================================================
+# NAČTENÍ ŠABLON
+# ============================================================================
+
+def load_template_dir(path):
+    """Šablony z adresáře: <type>.html, nebo <type>/<RECIPIENT>.html (spojí se značkami)"""
+    templates = {}
+    for entry in sorted(Path(path).iterdir()):
+        if entry.is_file() and entry.suffix == '.html':
+            templates[entry.stem] = entry.read_text(encoding='utf-8')
+        elif entry.is_dir():
+            sections = {f.stem: f.read_text(encoding='utf-8') for f in sorted(entry.glob('*.html'))}
+            if sections:
+                templates[entry.name] = combine_recipients(sections)
+    return templates
+
+
+def load_js_templates(paths):
+    """Šablony z klientských JS souborů (template literaly bez ${...})"""
+    sections = {}
+    skipped = []
+    for path in paths:
+        for name, html in JS_EXPORT_RE.findall(Path(path).read_text(encoding='utf-8')):
+            if name not in JS_TEMPLATES:
+                skipped.append(name)
+                continue
+            if '${' in html:
+                raise ValueError(f"{path}: {name} obsahuje JS interpolaci ${{...}}")
+            template_type, recipient = JS_TEMPLATES[name]
+            sections.setdefault(template_type, {})[recipient] = html
+    return {t: combine_recipients(s) for t, s in sections.items()}, skipped
+
+
+def collect_templates(args):
+    """Vestavěné šablony přepsané šablonami z --dir/--js (pozdější zdroj vyhrává)"""
+    templates = dict(BUILTIN_TEMPLATES)
+    if args.dir:
+        templates.update(load_template_dir(args.dir))
+    if args.js:
+        js_templates, skipped = load_js_templates(args.js)
+        templates.update(js_templates)
+        if skipped:
+            print(f"⚠️  Přeskočeno {len(skipped)} JS šablon bez mapování na typ: {', '.join(skipped)}")
+    if args.only:
+        templates = {t: body for t, body in templates.items() if t in args.only}
+    return templates
+
+
+def export_template_dir(templates, path):
+    """Zapíše šablony ve formátu pro --dir: <type>/<RECIPIENT>.html, bez značek <type>.html"""
+    root = Path(path)
+    root.mkdir(parents=True, exist_ok=True)
+    for template_type, body in templates.items():
+        sections = split_recipients(body)
+        if not sections:
+            (root / f"{template_type}.html").write_text(body, encoding='utf-8')
+            continue
+        (root / template_type).mkdir(exist_ok=True)
+        for recipient, html in sections.items():
+            (root / template_type / f"{recipient}.html").write_text(html + '\n', encoding='utf-8')
+    print(f"✓ {len(templates)} šablon vyexportováno do {root}")
+
+
+# ============================================================================
+# MINIFIKACE A VELIKOSTNÍ ROZPOČET
+# ============================================================================
+
+# Komentáře, které se musí zachovat (značky příjemců, podmíněné komentáře pro Outlook):
+#   <!--[if mso]>...<![endif]-->              obsah jen pro Outlook (celý je jeden komentář)
+#   <!--[if !mso]><!--> ... <!--<![endif]-->  obsah mimo Outlook - dva samostatné komentáře
+PRESERVED_COMMENT_RE = re.compile(
+    r'<!--\s*RECIPIENT:.*?-->'
+    r'|<!--\[if\b.*?<!\[endif\]-->'
+    r'|<!--\[if\b[^\]]*\]><!--(?:\s*--)?>'
+    r'|<!--<!\[endif\]-->',
+    re.S
+)
+
+HTML_TOKEN_RE = re.compile(
+    r'(?P<comment><!--.*?-->)'
+    r'|(?P<raw><(?P<raw_tag>pre|textarea|style)\b[^>]*>.*?</(?P=raw_tag)\s*>)'
+    r'|(?P<tag><[^>]+>)'
+    r'|(?P<text>[^<]+)',
+    re.S | re.I
+)
+TAG_NAME_RE = re.compile(r'</?\s*([a-zA-Z0-9]+)')
+STYLE_ATTR_RE = re.compile(r'(\bstyle=")([^"]*)(")', re.I)
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+CSS_SPACE_RE = re.compile(r'\s*([{}:;,>])\s*')
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Mezery u těchto tagů nejsou vidět - nahradí se jedním \n (ne '', aby řádky
+# zůstaly pod limitem 998 znaků pro SMTP a diff v --dry-run byl čitelný)
+BLOCK_TAGS = {
+    'html', 'head', 'body', 'meta', 'title', 'style', 'link', 'table', 'thead', 'tbody',
+    'tfoot', 'tr', 'td', 'th', 'div', 'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol',
+    'li', 'br', 'hr', 'center',
+}
+
+PLACEHOLDER_RE = re.compile(r'\{\w+\}')
+
+
+def minify_css(css):
+    css = CSS_COMMENT_RE.sub('', css)
+    css = CSS_SPACE_RE.sub(r'\1', WHITESPACE_RE.sub(' ', css)).strip()
+    return css.replace(';}', '}').rstrip(';')
+
+
+def minify_tag(tag):
+    tag = WHITESPACE_RE.sub(' ', tag).replace(' >', '>').replace(' />', '/>')
+    return STYLE_ATTR_RE.sub(lambda m: m.group(1) + minify_css(m.group(2)) + m.group(3), tag)
+
+
+def is_block_token(token):
+    """Začátek/konec, komentář nebo blokový tag - mezera vedle něj není vidět"""
+    if token is None or token.startswith('<!'):
+        return True
+    if not token.startswith('<'):
+        return False
+    match = TAG_NAME_RE.match(token)
+    return bool(match) and match.group(1).lower() in BLOCK_TAGS
+
+
+def minify_html(html):
+    """Odstraní odsazení, běžné komentáře a nadbytečné mezery v tazích a stylech
+
+    Zachovává {placeholder} tokeny, značky RECIPIENT, podmíněné komentáře
+    a obsah <pre>/<textarea>. Mezery mezi inline elementy zůstávají (jedna).
+    """
+    tokens = []
+    for match in HTML_TOKEN_RE.finditer(html):
+        if match.group('comment'):
+            if PRESERVED_COMMENT_RE.fullmatch(match.group('comment')):
+                tokens.append(match.group('comment'))
+            continue
+        if match.group('raw'):
+            token = match.group('raw')
+            if match.group('raw_tag').lower() == 'style':
+                open_end = token.index('>') + 1
+                close_start = token.lower().rindex('</style')
+                token = minify_tag(token[:open_end]) + minify_css(token[open_end:close_start]) + '</style>'
+        elif match.group('tag'):
+            token = minify_tag(match.group('tag'))
+        else:
+            token = match.group('text')
+            if tokens and not tokens[-1].startswith('<'):
+                # Text kolem odstraněného komentáře - spojit do jednoho tokenu
+                token = tokens.pop() + token
+            token = WHITESPACE_RE.sub(' ', token)
+        tokens.append(token)
+
+    out = []
+    last = len(tokens) - 1
+    for i, token in enumerate(tokens):
+        if token.startswith('<'):
+            out.append(token)
+            continue
+        before_block = is_block_token(tokens[i - 1] if i else None)
+        after_block = is_block_token(tokens[i + 1] if i < last else None)
+        if token == ' ':
+            out.append('\n' if before_block or after_block else ' ')
+            continue
+        if before_block and token.startswith(' '):
+            token = token[1:]
+        if after_block and token.endswith(' '):
+            token = token[:-1]
+        out.append(token)
+    return ''.join(out).strip()
+
+
+def minify_template(body, name='template'):
+    """Minifikuje každou RECIPIENT sekci zvlášť; ValueError, pokud by se ztratil placeholder"""
+    sections = split_recipients(body)
+    minified = combine_recipients({r: minify_html(html) for r, html in sections.items()}) if sections else minify_html(body)
+    if sorted(PLACEHOLDER_RE.findall(minified)) != sorted(PLACEHOLDER_RE.findall(body)) \
+            or split_recipients(minified).keys() != sections.keys():
+        raise ValueError(f"{name}: minifikace změnila placeholdery nebo značky RECIPIENT")
+    return minified
+
+
+def minify_templates(templates):
+    """Minifikuje všechny šablony a vypíše úsporu bajtů pro každou"""
+    result = {}
+    total_before = total_after = 0
+    for template_type, body in templates.items():
+        result[template_type] = minify_template(body, template_type)
+        before = len(body.encode('utf-8'))
+        after = len(result[template_type].encode('utf-8'))
+        total_before += before
+        total_after += after
+        print(f"📦 {template_type}: {before:,} B -> {after:,} B (-{(before - after) / before:.0%})")
+    if len(templates) > 1:
+        print(f"📦 Celkem: {total_before:,} B -> {total_after:,} B (-{(total_before - total_after) / total_before:.0%})")
+    return result
+
+
+def check_budget(templates, body_budget=BODY_BUDGET_BYTES, variant_budget=VARIANT_BUDGET_BYTES):
+    """Seznam překročení rozpočtu (celé email_body i jednotlivé varianty) v bajtech UTF-8"""
+    violations = []
+    for template_type, body in templates.items():
+        size = len(body.encode('utf-8'))
+        if size > body_budget:
+            violations.append(f"{template_type}: email_body {size:,} B > {body_budget:,} B")
+        for recipient, html in split_recipients(body).items():
+            size = len(html.encode('utf-8'))
+            if size > variant_budget:
+                violations.append(f"{template_type}/{recipient}: {size:,} B > {variant_budget:,} B")
+    return violations
+
+
+# ============================================================================
+# SYNCHRONIZACE S DB
+# ============================================================================
+
+def body_hash(body):
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
+def get_connection():
+    """pymysql připojení bez autocommitu - celý sync je jedna transakce"""
+    import pymysql
+    return pymysql.connect(
+        host=DB_HOST, user=DB_USER, password=DB_PASS, database=DB_NAME,
+        charset='utf8mb4', autocommit=False
+    )
+
+
+def fetch_db_hashes(cursor, types):
+    """Aktuální hashe email_body jedním dotazem; {type: sha256 | None}"""
+    placeholders = ', '.join(['%s'] * len(types))
+    cursor.execute(
+        f"SELECT type, SHA2(email_body, 256) FROM 25_notification_templates WHERE type IN ({placeholders})",
+        list(types)
+    )
+    return {row[0]: row[1] for row in cursor.fetchall()}
+
+
+def fetch_db_bodies(cursor, types):
+    """Celá těla jen pro změněné typy (pro diff v --dry-run)"""
+    placeholders = ', '.join(['%s'] * len(types))
+    cursor.execute(
+        f"SELECT type, email_body FROM 25_notification_templates WHERE type IN ({placeholders})",
+        list(types)
+    )
+    return {row[0]: row[1] or '' for row in cursor.fetchall()}
+
+
+def plan_changes(templates, db_hashes):
+    """Rozdělí šablony na (changed, unchanged, missing) podle porovnání hashů"""
+    changed, unchanged, missing = [], [], []
+    for template_type in sorted(templates):
+        if template_type not in db_hashes:
+            missing.append(template_type)
+        elif db_hashes[template_type] == body_hash(templates[template_type]):
+            unchanged.append(template_type)
+        else:
+            changed.append(template_type)
+    return changed, unchanged, missing
+
+
+def build_bulk_update(templates, types):
+    """Jeden UPDATE ... SET email_body = CASE type ... pro všechny změněné typy"""
+    cases = ' '.join(['WHEN %s THEN %s'] * len(types))
+    placeholders = ', '.join(['%s'] * len(types))
+    sql = (
+        f"UPDATE 25_notification_templates SET email_body = CASE type {cases} END, dt_updated = NOW() "
+        f"WHERE type IN ({placeholders})"
+    )
+    params = []
+    for template_type in types:
+        params.extend((template_type, templates[template_type]))
+    params.extend(types)
+    return sql, params
+
+
+def print_diff(template_type, old_body, new_body):
+    diff = difflib.unified_diff(
+        old_body.splitlines(), new_body.splitlines(),
+        fromfile=f"db:{template_type}", tofile=f"new:{template_type}", lineterm=''
+    )
+    for line in diff:
+        print(line)
+
+
+def sync_templates(connection, templates, dry_run=False):
+    """Zapíše jen změněné šablony jedním UPDATE; vrací počet změněných typů"""
     with connection.cursor() as cursor:
-        sql = "UPDATE 25_notification_templates SET email_body = %s WHERE type = 'order_status_ke_schvaleni'"
-        cursor.execute(sql, (combined_email_body,))
-        connection.commit()
-        print(f"✓ Email šablony byly úspěšně aktualizovány ({cursor.rowcount} záznamů)")
-        
-finally:
-    connection.close()
+        db_hashes = fetch_db_hashes(cursor, templates)
+        changed, unchanged, missing = plan_changes(templates, db_hashes)
+
+        print(f"📋 Šablon: {len(templates)}, beze změny: {len(unchanged)}, změněno: {len(changed)}, chybí v DB: {len(missing)}")
+        for template_type in missing:
+            print(f"⚠️  {template_type}: řádek v 25_notification_templates neexistuje - přeskočeno")
+        for template_type in changed:
+            print(f"✏️  {template_type}")
+
+        if not changed:
+            print("✓ Všechny šablony jsou aktuální, nic se nezapisuje")
+            return 0
+
+        if dry_run:
+            old_bodies = fetch_db_bodies(cursor, changed)
+            for template_type in changed:
+                print_diff(template_type, old_bodies.get(template_type, ''), templates[template_type])
+            print(f"🔍 Dry-run: {len(changed)} šablon by se aktualizovalo")
+            return len(changed)
+
+        sql, params = build_bulk_update(templates, changed)
+        try:
+            cursor.execute(sql, params)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        print(f"✓ Email šablony byly úspěšně aktualizovány ({len(changed)} typů, {cursor.rowcount} záznamů)")
+        return len(changed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Synchronizace email šablon do 25_notification_templates')
+    parser.add_argument('--dir', help='Adresář se šablonami (<type>.html nebo <type>/<RECIPIENT>.html)')
+    parser.add_argument('--js', nargs='+', help='Klientské JS soubory s DB_TEMPLATE_* konstantami')
+    parser.add_argument('--only', nargs='+', help='Synchronizovat jen uvedené typy')
+    parser.add_argument('--dry-run', action='store_true', help='Nic nezapisovat, vypsat diff změněných šablon')
+    parser.add_argument('--export', metavar='DIR', help='Jen vygenerovat šablony do adresáře (bez DB)')
+    parser.add_argument('--no-minify', action='store_true', help='Nezmenšovat HTML (zapsat šablony tak, jak jsou)')
+    parser.add_argument('--budget', type=int, default=BODY_BUDGET_BYTES,
+                        help=f'Max. velikost email_body v B (výchozí {BODY_BUDGET_BYTES})')
+    parser.add_argument('--variant-budget', type=int, default=VARIANT_BUDGET_BYTES,
+                        help=f'Max. velikost jedné varianty v B (výchozí {VARIANT_BUDGET_BYTES})')
+    args = parser.parse_args()
+
+    try:
+        templates = collect_templates(args)
+        if templates and not args.no_minify:
+            templates = minify_templates(templates)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    if not templates:
+        print("❌ Žádné šablony k synchronizaci")
+        return 1
+
+    violations = check_budget(templates, args.budget, args.variant_budget)
+    if violations:
+        for violation in violations:
+            print(f"❌ Překročen velikostní rozpočet - {violation}")
+        return 1
+
+    if args.export:
+        export_template_dir(templates, args.export)
+        return 0
+
+    connection = get_connection()
+    try:
+        sync_templates(connection, templates, dry_run=args.dry_run)
+    finally:
+        connection.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())